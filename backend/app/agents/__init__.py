@@ -3,3 +3,4 @@
 from app.agents.lead_scorer import LeadScorerAgent
 from app.agents.enrichment_agent import EnrichmentAgent
 from app.agents.intent_analyzer import IntentAnalyzerAgent
+from app.agents.registry import AgentRegistry, agent_registry
@@ -0,0 +1,200 @@
+"""Compact, token-budgeted prompt context.
+
+Lead context used to reach the prompts as Python reprs, full of None
+fields, empty lists and quotes, with event lists of any length. Here it is
+rendered as indented `key: value` lines without empty or default values.
+Long event lists become counts by type plus the most recent events, and
+each agent's context is trimmed to a token budget, estimated at about four
+characters per token.
+"""
+
+import math
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+
+CHARS_PER_TOKEN = 4
+
+EVENT_TYPE_KEYS = ("type", "event_type", "event", "action", "signal_type", "channel")
+EVENT_TIME_KEYS = ("timestamp", "occurred_at", "created_at", "date", "time", "ts")
+
+EMPTY = "None"
+TRIMMED = "…"
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of text."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _is_empty(value: Any) -> bool:
+    # None, False and empty values are the defaults of the enrichment and
+    # intent models; they carry nothing for the model.
+    return value is None or value is False or value == "" or value == [] or value == {}
+
+
+def _scalar(value: Any) -> str:
+    if isinstance(value, bool):
+        return "yes" if value else "no"
+    if isinstance(value, float):
+        return f"{value:.3g}"
+    if hasattr(value, "value"):
+        value = value.value
+    return " ".join(str(value).split())
+
+
+def _inline(item: dict) -> str:
+    parts = []
+    for key, value in item.items():
+        if _is_empty(value):
+            continue
+        if isinstance(value, dict):
+            value = "{" + _inline(value) + "}"
+        elif isinstance(value, list):
+            value = ",".join(_scalar(v) if not isinstance(v, dict) else "{" + _inline(v) + "}" for v in value)
+        else:
+            value = _scalar(value)
+        parts.append(f"{key}: {value}")
+    return ", ".join(parts)
+
+
+def _lines(value: Any, indent: str = "") -> List[str]:
+    if isinstance(value, dict):
+        lines = []
+        for key, item in value.items():
+            if _is_empty(item):
+                continue
+            if isinstance(item, dict) or (isinstance(item, list) and any(isinstance(v, dict) for v in item)):
+                nested = _lines(item, indent + "  ")
+                if nested:
+                    lines.append(f"{indent}{key}:")
+                    lines.extend(nested)
+            elif isinstance(item, list):
+                lines.append(f"{indent}{key}: {', '.join(_scalar(v) for v in item if not _is_empty(v))}")
+            else:
+                lines.append(f"{indent}{key}: {_scalar(item)}")
+        return lines
+    if isinstance(value, list):
+        lines = []
+        for item in value:
+            if _is_empty(item):
+                continue
+            text = _inline(item) if isinstance(item, dict) else _scalar(item)
+            if text:
+                lines.append(f"{indent}- {text}")
+        return lines
+    return [] if _is_empty(value) else [indent + _scalar(value)]
+
+
+def serialize(value: Any) -> str:
+    """Render a value as compact `key: value` lines ("None" when empty)."""
+    return "\n".join(_lines(value)) or EMPTY
+
+
+def _field(event: dict, keys) -> Optional[Any]:
+    for key in keys:
+        if not _is_empty(event.get(key)):
+            return event[key]
+    return None
+
+
+def summarize_events(events: Optional[list], recent: Optional[int] = None) -> str:
+    """Render an event list, summarizing it when it is long.
+
+    Up to `recent` events are listed newest first. Beyond that the list is
+    reduced to counts by event type and the `recent` newest events. Events
+    are ordered by their timestamp field when they have one, otherwise the
+    list order is taken as chronological.
+    """
+    recent = settings.context_recent_events if recent is None else recent
+    events = [event for event in events or [] if not _is_empty(event)]
+    if not events:
+        return EMPTY
+
+    if all(isinstance(event, dict) and _field(event, EVENT_TIME_KEYS) is not None for event in events):
+        events = sorted(events, key=lambda event: str(_field(event, EVENT_TIME_KEYS)))
+    newest = events[::-1]
+    if len(events) <= recent:
+        return serialize(newest)
+
+    counts = Counter(
+        str(_field(event, EVENT_TYPE_KEYS) or "other") if isinstance(event, dict) else "other"
+        for event in events
+    )
+    lines = [
+        f"total: {len(events)}",
+        "by type: " + ", ".join(f"{name} x{count}" for name, count in counts.most_common()),
+    ]
+    if recent:
+        lines.append(f"most recent {recent}:")
+        lines.extend(_lines(newest[:recent], "  "))
+    return "\n".join(lines)
+
+
+def truncate_to_tokens(text: str, tokens: int) -> str:
+    """Cut text to about `tokens` tokens at a line boundary."""
+    if estimate_tokens(text) <= tokens:
+        return text
+    limit = max(0, tokens * CHARS_PER_TOKEN - len(TRIMMED) - 1)
+    cut = text[:limit]
+    if "\n" in cut:
+        cut = cut[:cut.rindex("\n")]
+    return f"{cut}\n{TRIMMED}" if cut else TRIMMED
+
+
+def token_budget(agent: str) -> int:
+    return settings.context_token_budgets.get(agent, settings.context_token_budget)
+
+
+class ContextStats:
+    """Per-agent estimated context tokens and how often the budget trimmed it."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._agents: Dict[str, Dict[str, int]] = {}
+
+    def record(self, agent: str, tokens: int, trimmed: bool) -> None:
+        with self._lock:
+            counts = self._agents.setdefault(agent, {"calls": 0, "tokens": 0, "max_tokens": 0, "trimmed": 0})
+            counts["calls"] += 1
+            counts["tokens"] += tokens
+            counts["max_tokens"] = max(counts["max_tokens"], tokens)
+            counts["trimmed"] += int(trimmed)
+
+    def stats(self) -> dict:
+        with self._lock:
+            agents = {agent: dict(counts) for agent, counts in self._agents.items()}
+        for agent, counts in agents.items():
+            counts["budget"] = token_budget(agent)
+            counts["avg_tokens"] = round(counts.pop("tokens") / counts["calls"], 1) if counts["calls"] else 0.0
+        return {"agents": agents}
+
+
+context_stats = ContextStats()
+
+
+def fit_budget(agent: str, sections: Dict[str, str]) -> Dict[str, str]:
+    """Trim rendered context sections to the agent's token budget.
+
+    Sections are given most important first; the least important ones are
+    cut first.
+    """
+    budget = token_budget(agent)
+    sizes = {name: estimate_tokens(text) for name, text in sections.items()}
+    total = sum(sizes.values())
+    trimmed = False
+    if budget and total > budget:
+        trimmed = True
+        sections = dict(sections)
+        excess = total - budget
+        for name in reversed(list(sections)):
+            if excess <= 0:
+                break
+            keep = max(0, sizes[name] - excess)
+            sections[name] = truncate_to_tokens(sections[name], keep)
+            excess -= sizes[name] - estimate_tokens(sections[name])
+        total = sum(estimate_tokens(text) for text in sections.values())
+    context_stats.record(agent, total, trimmed)
+    return sections
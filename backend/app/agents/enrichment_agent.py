@@ -1,19 +1,22 @@
 """Lead enrichment agent."""
 
 from typing import Optional
+from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import JsonOutputParser
 
+from app.agents.context import fit_budget, serialize
+from app.agents.parsing import TolerantJsonOutputParser, ainvoke_json, fix_chain, recover_model
 from app.core.llm import get_llm
+from app.core.metrics import agent_callbacks
 from app.models.enrichment import EnrichmentData, CompanyData, ContactData
 
 
 class EnrichmentAgent:
     """Agent for enriching lead data."""
 
-    def __init__(self):
-        self.llm = get_llm()
-        self.parser = JsonOutputParser(pydantic_object=EnrichmentData)
+    def __init__(self, llm: Optional[BaseChatModel] = None):
+        self.llm = llm or get_llm()
+        self.parser = TolerantJsonOutputParser(pydantic_object=EnrichmentData, agent="enrichment")
         self.prompt = ChatPromptTemplate.from_messages([
             ("system", """You are a data enrichment specialist. Based on the provided lead information and any available data, infer and enrich the lead profile.
 
@@ -42,7 +45,98 @@ LinkedIn: {linkedin_url}
 
 Additional Data:
 {additional_data}""")
-        ])
+        ]).partial(format_instructions=self.parser.get_format_instructions())
+        self.chain = (self.prompt | self.llm | self.parser).with_config(
+            callbacks=agent_callbacks("enrichment")
+        )
+        self.fixer = fix_chain(self.llm, self.parser)
+
+        self.company_parser = TolerantJsonOutputParser(pydantic_object=CompanyData, agent="enrichment_company")
+        self.company_prompt = ChatPromptTemplate.from_messages([
+            ("system", """You are a data enrichment specialist. Based on the provided company domain and any available data, infer and enrich the company profile.
+
+Estimate:
+- Industry based on domain/company name
+- Employee range (1-10, 11-50, 51-200, 201-500, 501-1000, 1000+)
+- Location based on any available signals
+- Likely technologies used
+
+Be conservative with estimates. Mark as null if insufficient data.
+
+{format_instructions}"""),
+            ("human", """Enrich this company:
+
+Domain: {domain}
+Company: {company}
+Website: {website}""")
+        ]).partial(format_instructions=self.company_parser.get_format_instructions())
+        self.company_chain = (self.company_prompt | self.llm | self.company_parser).with_config(
+            callbacks=agent_callbacks("enrichment")
+        )
+        self.company_fixer = fix_chain(self.llm, self.company_parser)
+
+        self.contact_parser = TolerantJsonOutputParser(pydantic_object=ContactData, agent="enrichment_contact")
+        self.contact_prompt = ChatPromptTemplate.from_messages([
+            ("system", """You are a data enrichment specialist. Based on the provided contact information, infer and enrich the contact profile.
+
+Infer:
+- Seniority level (entry, mid, senior, executive, c-level)
+- Department (sales, marketing, engineering, product, operations, hr, finance, executive)
+- Decision-making authority
+
+Be conservative with estimates. Mark as null if insufficient data.
+
+{format_instructions}"""),
+            ("human", """Enrich this contact:
+
+Email: {email}
+Name: {first_name} {last_name}
+Company: {company}
+Job Title: {job_title}
+LinkedIn: {linkedin_url}""")
+        ]).partial(format_instructions=self.contact_parser.get_format_instructions())
+        self.contact_chain = (self.contact_prompt | self.llm | self.contact_parser).with_config(
+            callbacks=agent_callbacks("enrichment")
+        )
+        self.contact_fixer = fix_chain(self.llm, self.contact_parser)
+
+    async def enrich_company(
+        self,
+        domain: str,
+        company: str = "",
+        website: str = ""
+    ) -> CompanyData:
+        """Enrich the company behind a domain."""
+        result = await ainvoke_json(self.company_chain, self.company_fixer, {
+            "domain": domain,
+            "company": company or "",
+            "website": website or ""
+        }, "enrichment_company")
+
+        company_data = recover_model(CompanyData, result)
+        company_data.domain = company_data.domain or domain
+        return company_data
+
+    async def enrich_contact(
+        self,
+        email: str,
+        first_name: str = "",
+        last_name: str = "",
+        company: str = "",
+        job_title: str = "",
+        linkedin_url: str = ""
+    ) -> ContactData:
+        """Enrich the per-lead contact data only."""
+        result = await ainvoke_json(self.contact_chain, self.contact_fixer, {
+            "email": email,
+            "first_name": first_name or "",
+            "last_name": last_name or "",
+            "company": company or "",
+            "job_title": job_title or "",
+            "linkedin_url": linkedin_url or ""
+        }, "enrichment_contact")
+
+        return recover_model(ContactData, result)
 
     async def enrich(
         self,
@@ -56,9 +150,7 @@ Additional Data:
         additional_data: dict = None
     ) -> EnrichmentData:
         """Enrich lead data."""
-        chain = self.prompt | self.llm | self.parser
-
-        result = await chain.ainvoke({
+        result = await ainvoke_json(self.chain, self.fixer, {
             "email": email,
             "first_name": first_name or "",
             "last_name": last_name or "",
@@ -66,17 +158,16 @@ Additional Data:
             "job_title": job_title or "",
             "website": website or "",
             "linkedin_url": linkedin_url or "",
-            "additional_data": str(additional_data or {}),
-            "format_instructions": self.parser.get_format_instructions()
-        })
+            **fit_budget("enrichment", {"additional_data": serialize(additional_data)})
+        }, "enrichment")
 
         company_data = None
         if result.get("company"):
-            company_data = CompanyData(**result["company"])
+            company_data = recover_model(CompanyData, result["company"])
 
         contact_data = None
         if result.get("contact"):
-            contact_data = ContactData(**result["contact"])
+            contact_data = recover_model(ContactData, result["contact"])
 
         return EnrichmentData(
             company=company_data,
@@ -1,11 +1,14 @@
 """Intent analysis agent."""
 
-from typing import List
+from typing import List, Optional
+from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import JsonOutputParser
 from pydantic import BaseModel, Field
 
+from app.agents.context import fit_budget, serialize, summarize_events
+from app.agents.parsing import TolerantJsonOutputParser, ainvoke_json, fix_chain
 from app.core.llm import get_llm
+from app.core.metrics import agent_callbacks
 
 
 class IntentSignal(BaseModel):
@@ -26,9 +29,11 @@ class IntentAnalysisResult(BaseModel):
 class IntentAnalyzerAgent:
     """Agent for analyzing lead intent signals."""
 
-    def __init__(self):
-        self.llm = get_llm()
-        self.parser = JsonOutputParser(pydantic_object=IntentAnalysisResult)
+    def __init__(self, llm: Optional[BaseChatModel] = None):
+        self.llm = llm or get_llm()
+        self.parser = TolerantJsonOutputParser(
+            pydantic_object=IntentAnalysisResult, agent="intent_analyzer", required=["overall_intent_score"]
+        )
         self.prompt = ChatPromptTemplate.from_messages([
             ("system", """You are an intent analysis expert. Analyze the provided lead behavior and signals to determine buying intent.
 
@@ -52,28 +57,38 @@ Determine:
 Lead Info:
 {lead_info}
 
+Activity Summary (aggregated from the event log):
+{activity}
+
 Behavior Data:
 {behavior_data}
 
 Engagement History:
 {engagement_history}""")
-        ])
+        ]).partial(format_instructions=self.parser.get_format_instructions())
+        self.chain = (self.prompt | self.llm | self.parser).with_config(
+            callbacks=agent_callbacks("intent_analyzer")
+        )
+        self.fixer = fix_chain(self.llm, self.parser)
 
     async def analyze(
         self,
         lead_info: dict,
         behavior_data: list = None,
-        engagement_history: list = None
+        engagement_history: list = None,
+        activity: dict = None
     ) -> IntentAnalysisResult:
-        """Analyze lead intent."""
-        chain = self.prompt | self.llm | self.parser
-
-        result = await chain.ainvoke({
-            "lead_info": str(lead_info),
-            "behavior_data": str(behavior_data or []),
-            "engagement_history": str(engagement_history or []),
-            "format_instructions": self.parser.get_format_instructions()
-        })
+        """Analyze lead intent.
+
+        `activity` is the lead's event aggregate summary; behavior_data and
+        engagement_history are optional raw events on top of it.
+        """
+        result = await ainvoke_json(self.chain, self.fixer, fit_budget("intent_analyzer", {
+            "lead_info": serialize(lead_info),
+            "activity": serialize(activity),
+            "behavior_data": summarize_events(behavior_data),
+            "engagement_history": summarize_events(engagement_history)
+        }), "intent_analyzer")
 
         signals = []
         for signal_data in result.get("signals", []):
@@ -1,21 +1,17 @@
 """Lead scoring agent."""
 
-from typing import Optional
+from typing import Dict, List, Optional
+from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import JsonOutputParser
+from pydantic import BaseModel
 
+from app.agents.context import fit_budget, serialize
+from app.agents.parsing import TolerantJsonOutputParser, ainvoke_json, fix_chain
 from app.core.llm import get_llm
+from app.core.metrics import agent_callbacks
 from app.models.lead import LeadScore
 
-
-class LeadScorerAgent:
-    """Agent for scoring leads based on multiple factors."""
-
-    def __init__(self):
-        self.llm = get_llm()
-        self.parser = JsonOutputParser(pydantic_object=LeadScore)
-        self.prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are an expert sales lead analyst. Score the provided lead based on:
+SCORING_CRITERIA = """You are an expert sales lead analyst. Score the provided lead based on:
 
 1. **Firmographic Score (0-100)**: Company size, industry fit, revenue potential
 2. **Behavioral Score (0-100)**: Website visits, content downloads, email engagement
@@ -33,12 +29,9 @@ Assign tier:
 - warm: score 40-69
 - cold: score < 40
 
-Provide reasoning and actionable recommendations.
-
-{format_instructions}"""),
-            ("human", """Score this lead:
+Provide reasoning and actionable recommendations."""
 
-Contact Info:
+LEAD_BLOCK = """Contact Info:
 - Email: {email}
 - Name: {first_name} {last_name}
 - Job Title: {job_title}
@@ -51,9 +44,100 @@ Enrichment Data:
 Intent Signals:
 {intent_signals}
 
+Behavioral Activity:
+{activity}
+
 Additional Context:
-{additional_context}""")
-        ])
+{additional_context}"""
+
+
+class PackedLeadScore(LeadScore):
+    lead_id: str
+
+
+class PackedLeadScores(BaseModel):
+    scores: List[PackedLeadScore]
+
+
+def _lead_variables(
+    email: str,
+    first_name: str = "",
+    last_name: str = "",
+    job_title: str = "",
+    company: str = "",
+    source: str = "",
+    enrichment_data: dict = None,
+    intent_signals: list = None,
+    additional_context: str = "",
+    activity: dict = None
+) -> dict:
+    context = fit_budget("lead_scorer", {
+        "activity": serialize(activity),
+        "enrichment_data": serialize(enrichment_data),
+        "intent_signals": serialize(intent_signals),
+        "additional_context": additional_context or "No additional context"
+    })
+    return {
+        "email": email,
+        "first_name": first_name or "Unknown",
+        "last_name": last_name or "",
+        "job_title": job_title or "Unknown",
+        "company": company or "Unknown",
+        "source": source or "Unknown",
+        **context
+    }
+
+
+def _to_lead_score(result: dict) -> LeadScore:
+    tier = result.get("tier", "cold")
+    if tier not in ["hot", "warm", "cold"]:
+        score = result.get("overall_score", 0)
+        tier = "hot" if score >= 70 else "warm" if score >= 40 else "cold"
+
+    return LeadScore(
+        overall_score=min(100, max(0, result.get("overall_score", 0))),
+        tier=tier,
+        firmographic_score=min(100, max(0, result.get("firmographic_score", 0))),
+        behavioral_score=min(100, max(0, result.get("behavioral_score", 0))),
+        engagement_score=min(100, max(0, result.get("engagement_score", 0))),
+        fit_score=min(100, max(0, result.get("fit_score", 0))),
+        reasoning=result.get("reasoning", ""),
+        recommendations=result.get("recommendations", [])
+    )
+
+
+class LeadScorerAgent:
+    """Agent for scoring leads based on multiple factors."""
+
+    def __init__(self, llm: Optional[BaseChatModel] = None):
+        self.llm = llm or get_llm()
+        self.parser = TolerantJsonOutputParser(
+            pydantic_object=LeadScore, agent="lead_scorer", required=["overall_score"]
+        )
+        self.prompt = ChatPromptTemplate.from_messages([
+            ("system", SCORING_CRITERIA + "\n\n{format_instructions}"),
+            ("human", "Score this lead:\n\n" + LEAD_BLOCK)
+        ]).partial(format_instructions=self.parser.get_format_instructions())
+        self.chain = (self.prompt | self.llm | self.parser).with_config(
+            callbacks=agent_callbacks("lead_scorer")
+        )
+        self.fixer = fix_chain(self.llm, self.parser)
+
+        self.packed_parser = TolerantJsonOutputParser(
+            pydantic_object=PackedLeadScores, agent="lead_scorer_packed", allow_list=True
+        )
+        self.packed_prompt = ChatPromptTemplate.from_messages([
+            ("system", SCORING_CRITERIA + """
+
+You will receive several leads, each introduced by its lead_id. Score every lead independently and return one entry per lead in "scores", copying its lead_id exactly.
+
+{format_instructions}"""),
+            ("human", "Score these leads:\n\n{leads}")
+        ]).partial(format_instructions=self.packed_parser.get_format_instructions())
+        self.packed_chain = (self.packed_prompt | self.llm | self.packed_parser).with_config(
+            callbacks=agent_callbacks("lead_scorer")
+        )
+        self.packed_fixer = fix_chain(self.llm, self.packed_parser)
 
     async def score(
         self,
@@ -65,36 +149,46 @@ Additional Context:
         source: str = "",
         enrichment_data: dict = None,
         intent_signals: list = None,
-        additional_context: str = ""
+        additional_context: str = "",
+        activity: dict = None
     ) -> LeadScore:
-        """Score a lead."""
-        chain = self.prompt | self.llm | self.parser
-
-        result = await chain.ainvoke({
-            "email": email,
-            "first_name": first_name or "Unknown",
-            "last_name": last_name or "",
-            "job_title": job_title or "Unknown",
-            "company": company or "Unknown",
-            "source": source or "Unknown",
-            "enrichment_data": str(enrichment_data or {}),
-            "intent_signals": str(intent_signals or []),
-            "additional_context": additional_context or "No additional context",
-            "format_instructions": self.parser.get_format_instructions()
-        })
-
-        tier = result.get("tier", "cold")
-        if tier not in ["hot", "warm", "cold"]:
-            score = result.get("overall_score", 0)
-            tier = "hot" if score >= 70 else "warm" if score >= 40 else "cold"
-
-        return LeadScore(
-            overall_score=min(100, max(0, result.get("overall_score", 0))),
-            tier=tier,
-            firmographic_score=min(100, max(0, result.get("firmographic_score", 0))),
-            behavioral_score=min(100, max(0, result.get("behavioral_score", 0))),
-            engagement_score=min(100, max(0, result.get("engagement_score", 0))),
-            fit_score=min(100, max(0, result.get("fit_score", 0))),
-            reasoning=result.get("reasoning", ""),
-            recommendations=result.get("recommendations", [])
+        """Score a lead.
+
+        `activity` is the lead's event aggregate summary (see
+        services.events.activity_summary).
+        """
+        result = await ainvoke_json(self.chain, self.fixer, _lead_variables(
+            email, first_name, last_name, job_title, company, source,
+            enrichment_data, intent_signals, additional_context, activity
+        ), "lead_scorer")
+        return _to_lead_score(result)
+
+    async def score_many(self, leads: Dict[str, dict]) -> Dict[str, LeadScore]:
+        """Score several leads in a single LLM call.
+
+        `leads` maps lead ids to score() keyword arguments. Each returned
+        element is validated on its own; leads that are missing from the
+        response or whose entry is invalid are left out of the result so
+        the caller can retry them individually.
+        """
+        blocks = [
+            f"### lead_id: {lead_id}\n" + LEAD_BLOCK.format(**_lead_variables(**inputs))
+            for lead_id, inputs in leads.items()
+        ]
+        result = await ainvoke_json(
+            self.packed_chain, self.packed_fixer, {"leads": "\n\n".join(blocks)}, "lead_scorer_packed"
         )
+
+        entries = result.get("scores", []) if isinstance(result, dict) else result
+        scores = {}
+        for entry in entries if isinstance(entries, list) else []:
+            if not isinstance(entry, dict):
+                continue
+            lead_id = str(entry.get("lead_id", ""))
+            if lead_id not in leads or lead_id in scores or "overall_score" not in entry:
+                continue
+            try:
+                scores[lead_id] = _to_lead_score(entry)
+            except (TypeError, ValueError):
+                continue
+        return scores
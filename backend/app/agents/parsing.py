@@ -0,0 +1,287 @@
+"""Tolerant JSON output parsing.
+
+Models often wrap the JSON in prose, leave a trailing comma or stop
+mid-object. TolerantJsonOutputParser first tries the strict parser, then
+extracts the outermost JSON value from the text (skipping bracketed prose
+before it), drops trailing commas and closes whatever was left open,
+keeping every field that was terminated.
+A truncated last field is dropped, not completed: a required field lost
+that way makes the output unusable and goes to the fix re-prompt. The agents
+fill the fields that could not be recovered with their usual defaults.
+
+Only when nothing usable can be recovered does `ainvoke_json` send the
+broken output back with a short "fix this JSON" prompt, so a bad answer
+costs a small correction call instead of a failed item and a full retry.
+"""
+
+import json
+import re
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, TypeVar
+
+from langchain_core.exceptions import OutputParserException
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.output_parsers import JsonOutputParser
+from langchain_core.outputs import Generation
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import Runnable
+from langchain_core.utils.json import parse_json_markdown, parse_partial_json
+from pydantic import BaseModel, ValidationError
+
+from app.core.config import settings
+from app.core.metrics import LLM_OUTPUTS, agent_callbacks
+
+# Only the tail of very long broken outputs is sent back for fixing.
+FIX_MAX_CHARS = 8000
+# Bracketed spans tried as the JSON value before giving up.
+MAX_JSON_CANDIDATES = 8
+
+FIX_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """The text below was meant to be a single JSON value but could not be parsed. Return only the corrected JSON, without commentary, keeping every value that is present.
+
+{format_instructions}"""),
+    ("human", "{output}")
+])
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+_FENCE_RE = re.compile(r"```(?:json)?", re.IGNORECASE)
+_OPENER_RE = re.compile(r"[{\[]")
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+def _extract(text: str, start: int) -> Tuple[str, int]:
+    """The JSON object or array starting at text[start], without trailing
+    commas, and the index just past it.
+
+    Text after the value is ignored. An unterminated value is cut back to
+    the last member terminated by a comma or a closer and then closed, so a
+    truncated trailing member (e.g. `"score": 8` cut from 85) is dropped
+    rather than completed.
+    """
+    out: List[str] = []
+    stack: List[str] = []
+    # Last position where everything before it is complete, with the
+    # closers still needed there.
+    safe = (0, [])
+    in_string = escaped = False
+    for index in range(start, len(text)):
+        char = text[index]
+        if in_string:
+            out.append(char)
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+        if char == '"':
+            in_string = True
+        elif char in _CLOSERS:
+            stack.append(_CLOSERS[char])
+            out.append(char)
+            safe = (len(out), list(stack))
+            continue
+        elif char in "}]":
+            # Drop a trailing comma before the closer.
+            while out and out[-1].isspace():
+                out.pop()
+            if out and out[-1] == ",":
+                out.pop()
+            if stack:
+                stack.pop()
+            out.append(char)
+            if not stack:
+                return "".join(out), index + 1
+            safe = (len(out), list(stack))
+            continue
+        elif char == ",":
+            safe = (len(out), list(stack))
+        out.append(char)
+
+    length, closers = safe
+    return "".join(out[:length]) + "".join(reversed(closers)), len(text)
+
+
+def repair_json(text: str, accept: Optional[Callable[[Any], bool]] = None) -> Any:
+    """Recover a JSON value from malformed model output.
+
+    Prose before the value may hold brackets of its own ("see [1]"), so when
+    a candidate does not parse, or `accept` rejects it, the next one starts
+    at the first `{` or `[` after it, up to MAX_JSON_CANDIDATES. Returns the
+    first accepted value, else the first one that parsed; raises ValueError
+    when nothing can be recovered.
+    """
+    text = _FENCE_RE.sub("", text)
+    first = None
+    position = 0
+    for _ in range(MAX_JSON_CANDIDATES):
+        match = _OPENER_RE.search(text, position)
+        if match is None:
+            break
+        candidate, position = _extract(text, match.start())
+        try:
+            value = json.loads(candidate)
+        except json.JSONDecodeError:
+            try:
+                value = parse_partial_json(candidate)
+            except json.JSONDecodeError:
+                continue
+        if value is None:
+            continue
+        if accept is None or accept(value):
+            return value
+        if first is None:
+            first = value
+    if first is None:
+        raise ValueError("No JSON value found" if position == 0 else "Unrecoverable JSON")
+    return first
+
+
+def recover_model(model: Type[ModelT], data: Any) -> ModelT:
+    """Build `model` from the valid fields of `data`.
+
+    Invalid values are dropped so their defaults apply; raises
+    ValidationError only if a required field is missing or invalid.
+    """
+    data = {key: value for key, value in data.items() if key in model.model_fields} if isinstance(data, dict) else {}
+    while True:
+        try:
+            return model(**data)
+        except ValidationError as e:
+            invalid = {error["loc"][0] for error in e.errors() if error["loc"]} & data.keys()
+            if not invalid:
+                raise
+            for key in invalid:
+                del data[key]
+
+
+class ParseStats:
+    """Per-agent counts of how LLM outputs ended up parsed.
+
+    Each agent call has one outcome; `fix_calls` counts the extra "fix this
+    JSON" inferences, including ones that did not help.
+    """
+
+    OUTCOMES = ("parsed", "repaired", "reprompted", "failed")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Dict[str, Dict[str, int]] = {}
+
+    def _agent(self, agent: str) -> Dict[str, int]:
+        return self._counts.setdefault(agent, {**dict.fromkeys(self.OUTCOMES, 0), "fix_calls": 0})
+
+    def record(self, agent: str, outcome: str) -> None:
+        with self._lock:
+            self._agent(agent)[outcome] += 1
+        if settings.metrics_enabled:
+            LLM_OUTPUTS.labels(agent, outcome).inc()
+
+    def record_fix_call(self, agent: str) -> None:
+        with self._lock:
+            self._agent(agent)["fix_calls"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            agents = {agent: dict(counts) for agent, counts in self._counts.items()}
+        for counts in agents.values():
+            total = sum(counts[outcome] for outcome in self.OUTCOMES)
+            counts["repair_rate"] = round(counts["repaired"] / total, 4) if total else 0.0
+            counts["reinference_rate"] = round(counts["fix_calls"] / total, 4) if total else 0.0
+        return {"agents": agents}
+
+
+parse_stats = ParseStats()
+
+
+class TolerantJsonOutputParser(JsonOutputParser):
+    """JsonOutputParser that repairs malformed output before giving up.
+
+    A value is usable when it is an object containing the `required` keys,
+    or a list if `allow_list` is set; a repaired value must also keep at
+    least one schema field (or list entry). Outcomes are recorded under
+    `agent` unless it is empty.
+    """
+
+    agent: str = ""
+    required: List[str] = []
+    allow_list: bool = False
+
+    def _usable(self, value: Any) -> bool:
+        if isinstance(value, dict):
+            return all(key in value for key in self.required)
+        return isinstance(value, list) and self.allow_list
+
+    def _recovered(self, value: Any) -> bool:
+        # A repair that kept none of the schema's fields (e.g. `{"k": "v"`
+        # cut back to `{}`) recovered nothing and goes to the re-prompt.
+        if not self._usable(value):
+            return False
+        if isinstance(value, dict):
+            fields = self.pydantic_object.model_fields if self.pydantic_object else value
+            return any(key in fields for key in value)
+        return any(value)
+
+    def parse_result(self, result: List[Generation], *, partial: bool = False) -> Any:
+        if partial:
+            return super().parse_result(result, partial=True)
+        text = result[0].text
+        try:
+            # Strict json.loads: the default parser silently completes
+            # truncated output, which should count as a repair.
+            value = parse_json_markdown(text.strip(), parser=json.loads)
+            if self._usable(value):
+                self._record("parsed")
+                return value
+        except json.JSONDecodeError:
+            pass
+        try:
+            value = repair_json(text, accept=self._recovered)
+        except ValueError as e:
+            raise OutputParserException(f"Invalid json output: {e}", llm_output=text)
+        if not self._recovered(value):
+            raise OutputParserException("Incomplete json output", llm_output=text)
+        self._record("repaired")
+        return value
+
+    def _record(self, outcome: str) -> None:
+        if self.agent:
+            parse_stats.record(self.agent, outcome)
+
+
+def fix_chain(llm: BaseChatModel, parser: TolerantJsonOutputParser) -> Runnable:
+    """Chain asking the model to correct its own broken JSON."""
+    return (
+        FIX_PROMPT.partial(format_instructions=parser.get_format_instructions())
+        | llm
+        | parser.model_copy(update={"agent": ""})
+    ).with_config(callbacks=agent_callbacks(parser.agent))
+
+
+async def ainvoke_json(chain: Runnable, fixer: Runnable, inputs: dict, agent: str) -> Any:
+    """Invoke a chain ending in a TolerantJsonOutputParser.
+
+    When the output cannot be recovered it is sent to `fixer` (see
+    fix_chain) up to LLM_JSON_FIX_ATTEMPTS times.
+    """
+    try:
+        return await chain.ainvoke(inputs)
+    except OutputParserException as e:
+        error = e
+
+    for _ in range(settings.llm_json_fix_attempts):
+        if not error.llm_output:
+            break
+        parse_stats.record_fix_call(agent)
+        try:
+            value = await fixer.ainvoke({"output": error.llm_output[-FIX_MAX_CHARS:]})
+        except OutputParserException as e:
+            error = e
+            continue
+        parse_stats.record(agent, "reprompted")
+        return value
+
+    parse_stats.record(agent, "failed")
+    raise error
@@ -0,0 +1,88 @@
+"""Process-wide agent registry.
+
+Agents and their runnable chains are built once (normally in the FastAPI
+lifespan) and shared by every request, so no request pays for prompt
+construction or, with llamacpp, for loading the model.
+"""
+
+import logging
+import time
+from typing import Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+
+from app.agents.lead_scorer import LeadScorerAgent
+from app.agents.enrichment_agent import EnrichmentAgent
+from app.agents.intent_analyzer import IntentAnalyzerAgent
+from app.core.llm import get_llm
+
+logger = logging.getLogger(__name__)
+
+
+class AgentRegistry:
+    """Holds one prebuilt instance of each agent."""
+
+    def __init__(self):
+        self._scorer: Optional[LeadScorerAgent] = None
+        self._enricher: Optional[EnrichmentAgent] = None
+        self._intent_analyzer: Optional[IntentAnalyzerAgent] = None
+        self.timings: dict = {}
+
+    def build(self, llm: Optional[BaseChatModel] = None) -> None:
+        """Build the LLM client and all agents, recording timings in ms."""
+        start = time.perf_counter()
+        llm = llm or get_llm()
+        self.timings["llm_init_ms"] = _elapsed_ms(start)
+
+        for name, agent_class in (
+            ("scorer", LeadScorerAgent),
+            ("enricher", EnrichmentAgent),
+            ("intent_analyzer", IntentAnalyzerAgent),
+        ):
+            start = time.perf_counter()
+            setattr(self, f"_{name}", agent_class(llm=llm))
+            self.timings[f"{name}_build_ms"] = _elapsed_ms(start)
+
+        self.llm = llm
+
+    async def warm_up(self) -> None:
+        """Send one tiny inference so the first real request is warm."""
+        if self._scorer is None:
+            self.build()
+
+        start = time.perf_counter()
+        try:
+            await self.llm.ainvoke("Reply with the single word: ready")
+            self.timings["warmup_ms"] = _elapsed_ms(start)
+        except Exception as e:
+            logger.warning("LLM warm-up failed: %s", e)
+            self.timings["warmup_error"] = str(e)
+
+    @property
+    def built(self) -> bool:
+        return self._scorer is not None
+
+    @property
+    def scorer(self) -> LeadScorerAgent:
+        if self._scorer is None:
+            self.build()
+        return self._scorer
+
+    @property
+    def enricher(self) -> EnrichmentAgent:
+        if self._enricher is None:
+            self.build()
+        return self._enricher
+
+    @property
+    def intent_analyzer(self) -> IntentAnalyzerAgent:
+        if self._intent_analyzer is None:
+            self.build()
+        return self._intent_analyzer
+
+
+def _elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 2)
+
+
+agent_registry = AgentRegistry()
@@ -2,10 +2,9 @@
 
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
 
 from app.core.database import get_db
-from app.models.lead import Lead, LeadStatus, LeadSource
+from app.services.stats import read_stats, dimension_counts, rebuild_stats, SCORE_RANGES
 
 router = APIRouter()
 
@@ -13,28 +12,15 @@ router = APIRouter()
 @router.get("/stats")
 async def get_dashboard_stats(db: AsyncSession = Depends(get_db)):
     """Get dashboard statistics."""
-    total_leads = await db.execute(select(func.count(Lead.id)))
-    total = total_leads.scalar() or 0
+    stats = await read_stats(db)
+    total = stats.get(("total", "all"), (0, 0.0))[0]
+    tiers = dimension_counts(stats, "tier")
+    hot = tiers.get("hot", 0)
+    warm = tiers.get("warm", 0)
 
-    hot_leads = await db.execute(
-        select(func.count(Lead.id)).where(Lead.score_tier == "hot")
-    )
-    hot = hot_leads.scalar() or 0
-
-    warm_leads = await db.execute(
-        select(func.count(Lead.id)).where(Lead.score_tier == "warm")
-    )
-    warm = warm_leads.scalar() or 0
-
-    avg_score = await db.execute(
-        select(func.avg(Lead.score)).where(Lead.score > 0)
-    )
-    avg = avg_score.scalar() or 0
-
-    enriched = await db.execute(
-        select(func.count(Lead.id)).where(Lead.enriched_at.isnot(None))
-    )
-    enriched_count = enriched.scalar() or 0
+    scored_count, scored_sum = stats.get(("scored", "positive"), (0, 0.0))
+    avg = scored_sum / scored_count if scored_count else 0
+    enriched_count = stats.get(("enriched", "yes"), (0, 0.0))[0]
 
     return {
         "total_leads": total,
@@ -50,37 +36,33 @@ async def get_dashboard_stats(db: AsyncSession = Depends(get_db)):
 @router.get("")
 async def get_analytics(db: AsyncSession = Depends(get_db)):
     """Get comprehensive analytics."""
+    stats = await read_stats(db)
+
     # Leads by source
-    by_source = await db.execute(
-        select(Lead.source, func.count(Lead.id).label("count"))
-        .group_by(Lead.source)
-    )
-    source_data = [{"source": r[0].value if r[0] else "unknown", "count": r[1]} for r in by_source.all()]
+    source_data = [
+        {"source": source, "count": count}
+        for source, count in dimension_counts(stats, "source").items() if count > 0
+    ]
 
     # Leads by status
-    by_status = await db.execute(
-        select(Lead.status, func.count(Lead.id).label("count"))
-        .group_by(Lead.status)
-    )
-    status_data = [{"status": r[0].value if r[0] else "unknown", "count": r[1]} for r in by_status.all()]
+    status_data = [
+        {"status": status, "count": count}
+        for status, count in dimension_counts(stats, "status").items() if count > 0
+    ]
 
     # Score distribution
-    score_ranges = [
-        ("0-20", 0, 20),
-        ("21-40", 21, 40),
-        ("41-60", 41, 60),
-        ("61-80", 61, 80),
-        ("81-100", 81, 100)
-    ]
-    score_dist = []
-    for label, min_s, max_s in score_ranges:
-        count = await db.execute(
-            select(func.count(Lead.id)).where(Lead.score >= min_s, Lead.score <= max_s)
-        )
-        score_dist.append({"range": label, "count": count.scalar() or 0})
+    buckets = dimension_counts(stats, "bucket")
+    score_dist = [{"range": label, "count": buckets.get(label, 0)} for label, _, _ in SCORE_RANGES]
 
     return {
         "leads_by_source": source_data,
         "leads_by_status": status_data,
         "score_distribution": score_dist
     }
+
+
+@router.post("/rebuild")
+async def rebuild_analytics(db: AsyncSession = Depends(get_db)):
+    """Recompute the materialized aggregates from the leads table."""
+    total = await rebuild_stats(db)
+    return {"message": "Statistics rebuilt", "total_leads": total}
@@ -1,15 +1,17 @@
 """Enrichment API endpoints."""
 
 from typing import List
-from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 from pydantic import BaseModel
 
+from app.api.jobs import enqueue
 from app.core.database import get_db
-from app.models.lead import Lead, LeadResponse
-from app.agents.enrichment_agent import EnrichmentAgent
+from app.models.job import JobKind
+from app.models.lead import BatchItemError
+from app.services.enrichment import enrich_leads
+from app.services.loading import load_leads
+from app.services.write_behind import lead_writer
 
 router = APIRouter()
 
@@ -21,41 +23,21 @@ class BatchEnrichRequest(BaseModel):
 @router.post("/batch")
 async def batch_enrich_leads(
     request: BatchEnrichRequest,
+    background: bool = Query(False, description="Queue as a job and return 202"),
     db: AsyncSession = Depends(get_db)
 ):
     """Batch enrich multiple leads."""
-    enricher = EnrichmentAgent()
-    enriched_count = 0
-    failed_count = 0
-
-    for lead_id in request.lead_ids:
-        result = await db.execute(select(Lead).where(Lead.id == lead_id))
-        lead = result.scalar_one_or_none()
-        
-        if not lead:
-            failed_count += 1
-            continue
-
-        try:
-            enrichment = await enricher.enrich(
-                email=lead.email,
-                first_name=lead.first_name or "",
-                last_name=lead.last_name or "",
-                company=lead.company or "",
-                job_title=lead.job_title or "",
-                website=lead.website or "",
-                linkedin_url=lead.linkedin_url or ""
-            )
-
-            lead.enrichment_data = enrichment.model_dump()
-            lead.enriched_at = datetime.utcnow()
-            enriched_count += 1
-        except Exception:
-            failed_count += 1
-
-    await db.commit()
+    if background:
+        return await enqueue(db, JobKind.ENRICH, request.lead_ids)
+
+    leads, missing = await load_leads(db, request.lead_ids)
+    enriched_leads, errors = await enrich_leads(leads)
+    errors = [BatchItemError(lead_id=lead_id, error="Lead not found") for lead_id in missing] + errors
+
+    await lead_writer.write_leads(enriched_leads)
 
     return {
-        "enriched": enriched_count,
-        "failed": failed_count
+        "enriched": len(enriched_leads),
+        "failed": len(errors),
+        "errors": [e.model_dump() for e in errors]
     }
@@ -0,0 +1,22 @@
+"""Behaviour event API endpoints."""
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.models.event import EventBatch, EventIngestResult
+from app.services.events import event_ingestor
+
+router = APIRouter()
+
+
+@router.post("", response_model=EventIngestResult)
+async def ingest_events(batch: EventBatch, db: AsyncSession = Depends(get_db)):
+    """Record a batch of behaviour events and update lead activity.
+
+    Events for unknown leads are rejected and their ids returned.
+    """
+    if len(batch.events) > settings.event_batch_max:
+        raise HTTPException(413, f"At most {settings.event_batch_max} events per batch")
+    return await event_ingestor.ingest(db, batch.events)
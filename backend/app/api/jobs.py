@@ -0,0 +1,55 @@
+"""Background job API endpoints."""
+
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
+from app.models.job import Job, JobCreate, JobKind, JobResponse
+from app.services.jobs import submit_job, job_response, cancel_job
+
+router = APIRouter()
+
+
+async def enqueue(
+    db: AsyncSession,
+    kind: JobKind,
+    lead_ids: List[str],
+    params: Optional[dict] = None
+) -> JSONResponse:
+    """Submit a job and return a 202 response pointing at it."""
+    job = await submit_job(db, kind, lead_ids, params)
+    response = await job_response(db, job)
+    return JSONResponse(
+        status_code=202,
+        content=jsonable_encoder(response),
+        headers={"Location": f"/api/jobs/{job.id}"}
+    )
+
+
+@router.post("", response_model=JobResponse, status_code=202)
+async def create_job(request: JobCreate, db: AsyncSession = Depends(get_db)):
+    """Queue a scoring, enrichment or intent job."""
+    job = await submit_job(db, request.kind, request.lead_ids, request.params)
+    return await job_response(db, job)
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str, items: bool = True, db: AsyncSession = Depends(get_db)):
+    """Get job status, progress counts and per-item results."""
+    job = await db.get(Job, job_id)
+    if not job:
+        raise HTTPException(404, "Job not found")
+    return await job_response(db, job, include_items=items)
+
+
+@router.post("/{job_id}/cancel", response_model=JobResponse)
+async def cancel(job_id: str, db: AsyncSession = Depends(get_db)):
+    """Cancel a job's pending items."""
+    job = await db.get(Job, job_id)
+    if not job:
+        raise HTTPException(404, "Job not found")
+    job = await cancel_job(db, job)
+    return await job_response(db, job)
@@ -2,27 +2,71 @@
 
 from typing import List, Optional
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import delete, select
 
 from app.core.database import get_db
+from app.models.event import LeadActivity, LeadActivityResponse, LeadEvent
 from app.models.lead import Lead, LeadCreate, LeadResponse, LeadStatus, LeadSource
-from app.agents.lead_scorer import LeadScorerAgent
-from app.agents.enrichment_agent import EnrichmentAgent
-from app.agents.intent_analyzer import IntentAnalyzerAgent
+from app.api.jobs import enqueue
+from app.models.job import JobKind
+from app.services import scoring, enrichment
+from app.services.duplicates import DuplicateCandidate, find_duplicates
+from app.services.events import get_activity, recent_events
+from app.services.exporter import stream_leads
+from app.services.fieldsets import parse_fields, select_fields, render_rows
+from app.services.importer import LeadImporter, ImportResult, iter_lines, iter_csv, iter_ndjson
+from app.services.loading import filter_leads
+from app.services.pagination import order_by_keyset, after_cursor, encode_cursor
+from app.services.intent import analyze_intent, apply_intent
+from app.services.write_behind import lead_writer
 
 router = APIRouter()
 
 
+async def _save(lead: Lead) -> Lead:
+    # Agent results and status changes go through the write-behind so
+    # concurrent requests share commits.
+    saved = await lead_writer.write_lead(lead)
+    if saved is None:
+        raise HTTPException(404, "Lead not found")
+    return saved
+
+
 @router.post("", response_model=LeadResponse)
-async def create_lead(lead_data: LeadCreate, db: AsyncSession = Depends(get_db)):
-    """Create a new lead."""
+async def create_lead(
+    lead_data: LeadCreate,
+    response: Response,
+    reject_duplicates: bool = Query(False, description="Return 409 instead of creating when similar leads exist"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Create a new lead.
+
+    Ids of likely fuzzy duplicates are returned in the X-Possible-Duplicates
+    header (see GET /duplicates?lead_id= for details). With
+    reject_duplicates the lead is not created and 409 lists the candidates.
+    """
     # Check for duplicate
     existing = await db.execute(select(Lead).where(Lead.email == lead_data.email))
     if existing.scalar_one_or_none():
         raise HTTPException(400, "Lead with this email already exists")
 
+    candidates = await find_duplicates(
+        db,
+        email=lead_data.email,
+        first_name=lead_data.first_name,
+        last_name=lead_data.last_name,
+        company=lead_data.company,
+        website=lead_data.website
+    )
+    if candidates and reject_duplicates:
+        raise HTTPException(409, {
+            "message": "Lead looks like a duplicate of existing leads",
+            "candidates": [candidate.model_dump() for candidate in candidates]
+        })
+
     lead = Lead(
         email=lead_data.email,
         first_name=lead_data.first_name,
@@ -39,34 +83,126 @@ async def create_lead(lead_data: LeadCreate, db: AsyncSession = Depends(get_db))
     db.add(lead)
     await db.commit()
     await db.refresh(lead)
+    if candidates:
+        response.headers["X-Possible-Duplicates"] = ",".join(candidate.lead_id for candidate in candidates)
     return lead
 
 
+@router.post("/import", response_model=ImportResult)
+async def import_leads(
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$", description="Defaults from Content-Type"),
+    skip_possible_duplicates: bool = Query(False, description="Skip rows similar to existing leads"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Bulk import leads from a streamed CSV or NDJSON request body."""
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "ndjson" if "json" in content_type else "csv"
+
+    lines = iter_lines(request.stream())
+    records = iter_ndjson(lines) if format == "ndjson" else iter_csv(lines)
+    return await LeadImporter(db, skip_possible_duplicates=skip_possible_duplicates).run(records)
+
+
 @router.get("", response_model=List[LeadResponse])
 async def list_leads(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
     status: Optional[LeadStatus] = None,
     source: Optional[LeadSource] = None,
     tier: Optional[str] = None,
     min_score: Optional[float] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated subset of lead fields to return"),
     db: AsyncSession = Depends(get_db)
 ):
-    """List leads with optional filtering."""
-    query = select(Lead).order_by(Lead.score.desc())
+    """List leads with optional filtering.
+
+    Pass the X-Next-Cursor header of a page as `cursor` to fetch the next
+    page by keyset; `skip` is ignored then. Offset paging still works.
+    With `fields`, only those columns are read and returned (`id` is
+    always included).
+    """
+    projection = None
+    if fields:
+        try:
+            projection = parse_fields(fields)
+        except ValueError as e:
+            raise HTTPException(400, str(e))
+
+    base = select_fields(projection) if projection else select(Lead)
+    query = filter_leads(order_by_keyset(base), status, source, tier, min_score)
+
+    if cursor:
+        try:
+            query = after_cursor(query, cursor)
+        except ValueError:
+            raise HTTPException(400, "Invalid cursor")
+    else:
+        query = query.offset(skip)
+
+    result = await db.execute(query.limit(limit))
+    if projection:
+        rows = result.mappings().all()
+        headers = {}
+        if len(rows) == limit:
+            headers["X-Next-Cursor"] = encode_cursor(rows[-1]["score"], rows[-1]["id"])
+        return Response(render_rows(rows, projection), media_type="application/json", headers=headers)
+
+    leads = result.scalars().all()
+    if len(leads) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(leads[-1].score, leads[-1].id)
+    return leads
+
+
+@router.get("/export")
+async def export_leads(
+    format: str = Query("ndjson", pattern="^(csv|ndjson)$"),
+    status: Optional[LeadStatus] = None,
+    source: Optional[LeadSource] = None,
+    tier: Optional[str] = None,
+    min_score: Optional[float] = None,
+    updated_since: Optional[datetime] = Query(None, description="Only leads updated at or after this time"),
+):
+    """Stream all matching leads as NDJSON or CSV."""
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        stream_leads(format, status, source, tier, min_score, updated_since),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=leads.{format}"}
+    )
 
-    if status:
-        query = query.where(Lead.status == status)
-    if source:
-        query = query.where(Lead.source == source)
-    if tier:
-        query = query.where(Lead.score_tier == tier)
-    if min_score is not None:
-        query = query.where(Lead.score >= min_score)
 
-    query = query.offset(skip).limit(limit)
-    result = await db.execute(query)
-    return result.scalars().all()
+@router.get("/duplicates", response_model=List[DuplicateCandidate])
+async def list_duplicates(
+    lead_id: Optional[str] = Query(None, description="Find duplicates of an existing lead"),
+    email: Optional[str] = None,
+    first_name: Optional[str] = None,
+    last_name: Optional[str] = None,
+    company: Optional[str] = None,
+    website: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_db)
+):
+    """Find likely duplicates of a lead, or of the given contact fields."""
+    fields = {
+        "email": email,
+        "first_name": first_name,
+        "last_name": last_name,
+        "company": company,
+        "website": website
+    }
+    if lead_id:
+        lead = await db.get(Lead, lead_id)
+        if not lead:
+            raise HTTPException(404, "Lead not found")
+        fields = {field: getattr(lead, field) for field in fields}
+    elif not any(fields.values()):
+        raise HTTPException(400, "Pass lead_id or at least one contact field")
+
+    return await find_duplicates(db, exclude_id=lead_id, limit=limit, **fields)
 
 
 @router.get("/{lead_id}", response_model=LeadResponse)
@@ -79,68 +215,65 @@ async def get_lead(lead_id: str, db: AsyncSession = Depends(get_db)):
     return lead
 
 
+@router.get("/{lead_id}/activity", response_model=LeadActivityResponse)
+async def get_lead_activity(lead_id: str, db: AsyncSession = Depends(get_db)):
+    """Get a lead's behaviour event aggregates."""
+    if not await db.get(Lead, lead_id):
+        raise HTTPException(404, "Lead not found")
+    return await get_activity(db, lead_id)
+
+
+@router.get("/{lead_id}/events")
+async def list_lead_events(
+    lead_id: str,
+    limit: int = Query(50, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get a lead's most recent behaviour events."""
+    if not await db.get(Lead, lead_id):
+        raise HTTPException(404, "Lead not found")
+    return await recent_events(db, lead_id, limit)
+
+
 @router.post("/{lead_id}/score", response_model=LeadResponse)
-async def score_lead(lead_id: str, db: AsyncSession = Depends(get_db)):
+async def score_lead(
+    lead_id: str,
+    background: bool = Query(False, description="Queue as a job and return 202"),
+    db: AsyncSession = Depends(get_db)
+):
     """Score a lead using AI."""
     result = await db.execute(select(Lead).where(Lead.id == lead_id))
     lead = result.scalar_one_or_none()
     if not lead:
         raise HTTPException(404, "Lead not found")
 
-    scorer = LeadScorerAgent()
-    score_result = await scorer.score(
-        email=lead.email,
-        first_name=lead.first_name or "",
-        last_name=lead.last_name or "",
-        job_title=lead.job_title or "",
-        company=lead.company or "",
-        source=lead.source.value if lead.source else "",
-        enrichment_data=lead.enrichment_data,
-        intent_signals=lead.intent_signals
-    )
+    if background:
+        return await enqueue(db, JobKind.SCORE, [lead_id])
 
-    lead.score = score_result.overall_score
-    lead.score_tier = score_result.tier
-    lead.score_breakdown = {
-        "firmographic": score_result.firmographic_score,
-        "behavioral": score_result.behavioral_score,
-        "engagement": score_result.engagement_score,
-        "fit": score_result.fit_score,
-        "reasoning": score_result.reasoning,
-        "recommendations": score_result.recommendations
-    }
-    lead.last_scored_at = datetime.utcnow()
+    await scoring.score_lead(lead)
 
-    await db.commit()
-    await db.refresh(lead)
-    return lead
+    return await _save(lead)
 
 
 @router.post("/{lead_id}/enrich", response_model=LeadResponse)
-async def enrich_lead(lead_id: str, db: AsyncSession = Depends(get_db)):
+async def enrich_lead(
+    lead_id: str,
+    background: bool = Query(False, description="Queue as a job and return 202"),
+    db: AsyncSession = Depends(get_db)
+):
     """Enrich lead data using AI."""
     result = await db.execute(select(Lead).where(Lead.id == lead_id))
     lead = result.scalar_one_or_none()
     if not lead:
         raise HTTPException(404, "Lead not found")
 
-    enricher = EnrichmentAgent()
-    enrichment = await enricher.enrich(
-        email=lead.email,
-        first_name=lead.first_name or "",
-        last_name=lead.last_name or "",
-        company=lead.company or "",
-        job_title=lead.job_title or "",
-        website=lead.website or "",
-        linkedin_url=lead.linkedin_url or ""
-    )
+    if background:
+        return await enqueue(db, JobKind.ENRICH, [lead_id])
 
-    lead.enrichment_data = enrichment.model_dump()
-    lead.enriched_at = datetime.utcnow()
+    enrichment_data = await enrichment.enrich_lead(lead)
+    enrichment.apply_enrichment(lead, enrichment_data)
 
-    await db.commit()
-    await db.refresh(lead)
-    return lead
+    return await _save(lead)
 
 
 @router.post("/{lead_id}/analyze-intent", response_model=LeadResponse)
@@ -148,6 +281,7 @@ async def analyze_lead_intent(
     lead_id: str,
     behavior_data: List[dict] = [],
     engagement_history: List[dict] = [],
+    background: bool = Query(False, description="Queue as a job and return 202"),
     db: AsyncSession = Depends(get_db)
 ):
     """Analyze lead intent."""
@@ -156,24 +290,20 @@ async def analyze_lead_intent(
     if not lead:
         raise HTTPException(404, "Lead not found")
 
-    analyzer = IntentAnalyzerAgent()
-    intent_result = await analyzer.analyze(
-        lead_info={
-            "email": lead.email,
-            "company": lead.company,
-            "job_title": lead.job_title,
-            "source": lead.source.value if lead.source else None
-        },
+    if background:
+        return await enqueue(db, JobKind.INTENT, [lead_id], {
+            "behavior_data": behavior_data,
+            "engagement_history": engagement_history
+        })
+
+    intent_result = await analyze_intent(
+        lead,
         behavior_data=behavior_data,
         engagement_history=engagement_history
     )
+    apply_intent(lead, intent_result)
 
-    lead.intent_signals = [s.model_dump() for s in intent_result.signals]
-    lead.intent_score = intent_result.overall_intent_score
-
-    await db.commit()
-    await db.refresh(lead)
-    return lead
+    return await _save(lead)
 
 
 @router.patch("/{lead_id}/status", response_model=LeadResponse)
@@ -189,9 +319,7 @@ async def update_lead_status(
         raise HTTPException(404, "Lead not found")
 
     lead.status = status
-    await db.commit()
-    await db.refresh(lead)
-    return lead
+    return await _save(lead)
 
 
 @router.delete("/{lead_id}")
@@ -203,5 +331,7 @@ async def delete_lead(lead_id: str, db: AsyncSession = Depends(get_db)):
         raise HTTPException(404, "Lead not found")
 
     await db.delete(lead)
+    await db.execute(delete(LeadEvent).where(LeadEvent.lead_id == lead_id))
+    await db.execute(delete(LeadActivity).where(LeadActivity.lead_id == lead_id))
     await db.commit()
     return {"message": "Lead deleted successfully"}
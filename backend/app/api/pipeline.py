@@ -0,0 +1,90 @@
+"""Pipeline API endpoints."""
+
+from typing import Dict, List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import BaseModel
+
+from app.api.jobs import enqueue
+from app.core.database import get_db
+from app.models.job import JobKind
+from app.models.lead import Lead, LeadResponse, BatchItemError
+from app.services.loading import load_leads
+from app.services.pipeline import run_pipeline, run_pipeline_batch, summarize_timings
+from app.services.write_behind import lead_writer
+
+router = APIRouter()
+
+
+class PipelineRequest(BaseModel):
+    behavior_data: List[dict] = []
+    engagement_history: List[dict] = []
+
+
+class BatchPipelineRequest(BaseModel):
+    lead_ids: List[str]
+    # Raw events per lead id, on top of each lead's stored activity.
+    behavior_data: Dict[str, List[dict]] = {}
+    engagement_history: Dict[str, List[dict]] = {}
+
+
+class PipelineResult(BaseModel):
+    lead: LeadResponse
+    timings: dict
+
+
+class BatchPipelineResult(BaseModel):
+    processed: int
+    failed: int
+    leads: List[LeadResponse]
+    errors: List[BatchItemError] = []
+    timings: dict
+
+
+@router.post("/batch", response_model=BatchPipelineResult)
+async def run_batch_pipeline(
+    request: BatchPipelineRequest,
+    background: bool = Query(False, description="Queue as a job and return 202"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Enrich, analyze intent and score many leads in one call."""
+    if background:
+        return await enqueue(db, JobKind.PIPELINE, request.lead_ids, {
+            "behavior_data": request.behavior_data,
+            "engagement_history": request.engagement_history
+        })
+
+    leads, missing = await load_leads(db, request.lead_ids)
+    processed, errors, timings = await run_pipeline_batch(
+        leads, request.behavior_data, request.engagement_history
+    )
+    errors = [BatchItemError(lead_id=lead_id, error="Lead not found") for lead_id in missing] + errors
+
+    await lead_writer.write_leads(processed)
+
+    return BatchPipelineResult(
+        processed=len(processed),
+        failed=len(errors),
+        leads=[LeadResponse.model_validate(l) for l in processed],
+        errors=errors,
+        timings=summarize_timings(timings)
+    )
+
+
+@router.post("/{lead_id}", response_model=PipelineResult)
+async def run_lead_pipeline(
+    lead_id: str,
+    request: PipelineRequest = PipelineRequest(),
+    db: AsyncSession = Depends(get_db)
+):
+    """Enrich, analyze intent and score a lead in one call."""
+    lead = await db.get(Lead, lead_id)
+    if not lead:
+        raise HTTPException(404, "Lead not found")
+
+    timings = await run_pipeline(lead, request.behavior_data, request.engagement_history)
+
+    lead = await lead_writer.write_lead(lead)
+    if lead is None:
+        raise HTTPException(404, "Lead not found")
+    return PipelineResult(lead=LeadResponse.model_validate(lead), timings=timings)
@@ -1,15 +1,19 @@
 """Scoring API endpoints."""
 
 from typing import List
-from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 from pydantic import BaseModel
 
+from app.api.jobs import enqueue
 from app.core.database import get_db
-from app.models.lead import Lead, LeadResponse
-from app.agents.lead_scorer import LeadScorerAgent
+from app.models.job import JobKind
+from app.models.lead import LeadResponse, BatchItemError
+from app.services.loading import load_leads
+from app.services.rescoring import rescore_sweep, SweepResult
+from app.services.scoring import score_leads
+from app.services.stats import read_stats, dimension_counts
+from app.services.write_behind import lead_writer
 
 router = APIRouter()
 
@@ -22,73 +26,45 @@ class BatchScoreResult(BaseModel):
     scored: int
     failed: int
     leads: List[LeadResponse]
+    errors: List[BatchItemError] = []
 
 
 @router.post("/batch", response_model=BatchScoreResult)
 async def batch_score_leads(
     request: BatchScoreRequest,
+    background: bool = Query(False, description="Queue as a job and return 202"),
     db: AsyncSession = Depends(get_db)
 ):
     """Batch score multiple leads."""
-    scorer = LeadScorerAgent()
-    scored_leads = []
-    failed_count = 0
-
-    for lead_id in request.lead_ids:
-        result = await db.execute(select(Lead).where(Lead.id == lead_id))
-        lead = result.scalar_one_or_none()
-        
-        if not lead:
-            failed_count += 1
-            continue
-
-        try:
-            score_result = await scorer.score(
-                email=lead.email,
-                first_name=lead.first_name or "",
-                last_name=lead.last_name or "",
-                job_title=lead.job_title or "",
-                company=lead.company or "",
-                source=lead.source.value if lead.source else "",
-                enrichment_data=lead.enrichment_data,
-                intent_signals=lead.intent_signals
-            )
-
-            lead.score = score_result.overall_score
-            lead.score_tier = score_result.tier
-            lead.score_breakdown = {
-                "firmographic": score_result.firmographic_score,
-                "behavioral": score_result.behavioral_score,
-                "engagement": score_result.engagement_score,
-                "fit": score_result.fit_score,
-                "reasoning": score_result.reasoning,
-                "recommendations": score_result.recommendations
-            }
-            lead.last_scored_at = datetime.utcnow()
-            scored_leads.append(lead)
-        except Exception:
-            failed_count += 1
-
-    await db.commit()
+    if background:
+        return await enqueue(db, JobKind.SCORE, request.lead_ids)
+
+    leads, missing = await load_leads(db, request.lead_ids)
+    scored_leads, errors = await score_leads(leads)
+    errors = [BatchItemError(lead_id=lead_id, error="Lead not found") for lead_id in missing] + errors
+
+    await lead_writer.write_leads(scored_leads)
 
     return BatchScoreResult(
         scored=len(scored_leads),
-        failed=failed_count,
-        leads=[LeadResponse.model_validate(l) for l in scored_leads]
+        failed=len(errors),
+        leads=[LeadResponse.model_validate(l) for l in scored_leads],
+        errors=errors
     )
 
 
+@router.post("/rescore", response_model=SweepResult, status_code=202)
+async def rescore_changed_leads(
+    force: bool = Query(False, description="Re-score every lead, changed or not"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Queue re-scoring for leads whose scoring inputs changed."""
+    return await rescore_sweep(db, force=force)
+
+
 @router.get("/tiers")
 async def get_leads_by_tier(db: AsyncSession = Depends(get_db)):
     """Get lead counts by tier."""
-    result = await db.execute(select(Lead))
-    leads = result.scalars().all()
-
     tiers = {"hot": 0, "warm": 0, "cold": 0, "unscored": 0}
-    for lead in leads:
-        if lead.score_tier:
-            tiers[lead.score_tier] = tiers.get(lead.score_tier, 0) + 1
-        else:
-            tiers["unscored"] += 1
-
+    tiers.update(dimension_counts(await read_stats(db), "tier"))
     return tiers
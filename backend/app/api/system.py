@@ -0,0 +1,103 @@
+"""System and runtime status endpoints."""
+
+from fastapi import APIRouter
+
+from app.agents.context import context_stats
+from app.agents.parsing import parse_stats
+from app.agents.registry import agent_registry
+from app.core.llamacpp_pool import llamacpp_pools
+from app.core.llm import get_llm, get_llm_cache, route_names
+from app.services.companies import company_cache
+from app.services.duplicates import duplicate_index
+from app.services.events import event_ingestor
+from app.services.scheduler import reanalysis_scheduler
+from app.services.similarity import neighbour_scorer
+from app.services.write_behind import lead_writer
+
+router = APIRouter()
+
+
+@router.get("/llm-cache")
+async def get_llm_cache_stats():
+    """Get LLM response cache statistics."""
+    cache = get_llm_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+@router.delete("/llm-cache")
+async def clear_llm_cache():
+    """Drop all cached LLM responses."""
+    cache = get_llm_cache()
+    if cache is not None:
+        await cache.aclear()
+    return {"message": "LLM cache cleared"}
+
+
+@router.get("/llm-gateway")
+async def get_llm_gateway_stats():
+    """Get per-route in-flight, retry and failover counts of the LLM gateway."""
+    return get_llm().stats()
+
+
+@router.get("/llm-parsing")
+async def get_llm_parsing_stats():
+    """Get per-agent JSON repair and re-prompt rates."""
+    return parse_stats.stats()
+
+
+@router.get("/prompt-context")
+async def get_prompt_context_stats():
+    """Get estimated lead-context tokens per agent call and budget trims."""
+    return context_stats.stats()
+
+
+@router.get("/llamacpp")
+async def get_llamacpp_pool_stats():
+    """Get llama.cpp worker health and queue depth per model."""
+    if not any(name.split(":", 1)[0].lower() == "llamacpp" for name in route_names()):
+        return {"enabled": False}
+    return {"enabled": True, "pools": [pool.stats() for pool in llamacpp_pools()]}
+
+
+@router.get("/company-enrichment")
+async def get_company_enrichment_stats():
+    """Get company enrichment reuse statistics."""
+    return company_cache.stats()
+
+
+@router.get("/agents")
+async def get_agent_timings():
+    """Get agent registry startup and warm-up timings."""
+    return {"built": agent_registry.built, "timings": agent_registry.timings}
+
+
+@router.get("/neighbour-scoring")
+async def get_neighbour_scoring_stats():
+    """Get nearest-neighbour score reuse hit rate and shadow error."""
+    return neighbour_scorer.stats()
+
+
+@router.get("/duplicate-index")
+async def get_duplicate_index_stats():
+    """Get duplicate detection index size and block statistics."""
+    return duplicate_index.stats()
+
+
+@router.get("/write-behind")
+async def get_write_behind_stats():
+    """Get group-commit counts of the lead write-behind."""
+    return lead_writer.stats()
+
+
+@router.get("/events")
+async def get_event_ingest_stats():
+    """Get behaviour event ingest counts and throughput."""
+    return event_ingestor.stats()
+
+
+@router.get("/scheduler")
+async def get_scheduler_stats():
+    """Get re-analysis queue depth, debounce savings and staleness."""
+    return reanalysis_scheduler.stats()
@@ -0,0 +1,25 @@
+"""Concurrency helpers."""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Iterable, List, TypeVar
+
+T = TypeVar("T")
+
+
+async def gather_bounded(
+    func: Callable[[T], Awaitable[Any]],
+    items: Iterable[T],
+    limit: int
+) -> List[Any]:
+    """Run func over items concurrently with at most `limit` in flight.
+
+    Results are returned in input order; exceptions are returned in place
+    of results instead of being raised, like gather(return_exceptions=True).
+    """
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def run(item: T):
+        async with semaphore:
+            return await func(item)
+
+    return await asyncio.gather(*(run(item) for item in items), return_exceptions=True)
@@ -1,13 +1,23 @@
 """Application configuration."""
 
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, Optional
 
 
 class Settings(BaseSettings):
     app_name: str = "Lead Scoring Agent"
     debug: bool = False
+    metrics_enabled: bool = True
     database_url: str = "sqlite+aiosqlite:///./leads.db"
+    # SQLite only: WAL journal, and how long a writer waits for the lock.
+    sqlite_wal: bool = True
+    sqlite_busy_timeout_ms: int = 5000
+
+    # Lead updates from the agents are merged per lead and committed
+    # together every write_behind_delay_ms or once max_batch leads wait.
+    write_behind_enabled: bool = True
+    write_behind_delay_ms: float = 5.0
+    write_behind_max_batch: int = 200
 
     llm_provider: str = "ollama"
     openai_api_key: Optional[str] = None
@@ -18,9 +28,98 @@ class Settings(BaseSettings):
     ollama_model: str = "llama3.2"
     llamacpp_model_path: Optional[str] = None
     llamacpp_n_ctx: int = 4096
+    # Worker processes for the llamacpp provider (0 = cpu_count // threads)
+    llamacpp_workers: int = 0
+    llamacpp_threads: int = 4
+    llamacpp_max_tokens: int = 1024
+
+    # LLM gateway: comma-separated routes in failover order, each "provider"
+    # or "provider:model" (defaults to llm_provider). The limits below apply
+    # to every route; LLM_ROUTE_LIMITS overrides them per provider or route
+    # as JSON, e.g. {"openai": {"max_in_flight": 16, "requests_per_second": 5}}.
+    llm_routes: str = ""
+    llm_max_in_flight: int = 8
+    llm_requests_per_second: float = 0  # 0 disables rate limiting
+    llm_timeout: float = 60.0
+    llm_max_retries: int = 2
+    llm_retry_backoff: float = 1.0
+    llm_failover_cooldown: float = 30.0
+    llm_route_limits: Dict[str, dict] = {}
+
+    llm_warmup: bool = False
+
+    llm_cache_enabled: bool = True
+    llm_cache_path: str = "./llm_cache.db"
+    llm_cache_ttl_seconds: int = 7 * 24 * 3600
+    llm_cache_max_entries: int = 50000
+
+    # "Fix this JSON" re-prompts when an output cannot be repaired locally.
+    llm_json_fix_attempts: int = 1
+
+    # Prompt context: event lists longer than context_recent_events are
+    # summarized as counts by type plus the newest events, and each agent's
+    # context is trimmed to its estimated token budget (0 disables).
+    # CONTEXT_TOKEN_BUDGETS overrides it per agent as JSON, e.g.
+    # {"intent_analyzer": 2000}.
+    context_recent_events: int = 10
+    context_token_budget: int = 1500
+    context_token_budgets: Dict[str, int] = {}
+
+    batch_concurrency: int = 8
+    # Leads packed into one scoring prompt for batch scoring (1 disables).
+    score_pack_size: int = 10
+
+    import_chunk_size: int = 1000
+    export_batch_size: int = 1000
+
+    company_enrichment_ttl_days: int = 30
+
+    job_workers: int = 4
+    job_poll_interval: float = 1.0
+
+    rescore_chunk_size: int = 5000
+
+    # Behaviour events: max events per ingest request, and the half-life of
+    # the decayed per-lead activity score. Leads whose activity score reaches
+    # activity_llm_threshold skip the rule and neighbour short-circuits.
+    event_batch_max: int = 5000
+    activity_half_life_hours: float = 72.0
+    activity_llm_threshold: float = 5.0
+
+    # Background re-analysis: signals (enrichment, status, intent, events)
+    # add up per lead relative to their thresholds; a lead is queued once it
+    # reaches 1 and has had no new signal for debounce_seconds (at most
+    # max_delay_seconds). Dispatch stops while LLM calls made through the
+    # gateway in the last minute plus queued job items reach
+    # llm_calls_per_minute (0 = unlimited); other traffic is not throttled.
+    reanalysis_enabled: bool = True
+    reanalysis_debounce_seconds: float = 60.0
+    reanalysis_max_delay_seconds: float = 300.0
+    reanalysis_llm_calls_per_minute: int = 30
+    reanalysis_intent_delta: float = 0.1  # intent score change worth a re-score
+    reanalysis_activity_threshold: float = 5.0  # weighted events worth an intent analysis
+
+    # Rule-based pre-scoring: leads at or above hot_min / at or below
+    # cold_max are scored without the LLM.
+    prescore_enabled: bool = True
+    prescore_hot_min: float = 80.0
+    prescore_cold_max: float = 15.0
+
+    # Fuzzy duplicate detection: candidates at or above the threshold are
+    # reported; blocks larger than max_block_size are skipped at lookup.
+    duplicate_threshold: float = 0.75
+    duplicate_max_block_size: int = 1000
 
     chroma_persist_dir: str = "./chroma_db"
 
+    # Nearest-neighbour score reuse: a lead whose k nearest scored leads all
+    # have similarity >= threshold and share a tier gets their interpolated
+    # score. shadow_rate of those still go to the LLM to measure the error.
+    neighbour_scoring_enabled: bool = True
+    neighbour_k: int = 5
+    neighbour_similarity_threshold: float = 0.9
+    neighbour_shadow_rate: float = 0.1
+
     clearbit_api_key: Optional[str] = None
     hubspot_api_key: Optional[str] = None
 
@@ -1,5 +1,6 @@
 """Database configuration."""
 
+from sqlalchemy import event, inspect, make_url, text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 
@@ -9,6 +10,38 @@ engine = create_async_engine(settings.database_url, echo=settings.debug)
 async_session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 
+def _is_memory_database(url: str) -> bool:
+    return make_url(url).database in (None, "", ":memory:")
+
+
+# The lead write-behind (services.write_behind) commits through its own
+# single connection, so group commits never wait for a pooled connection
+# behind request sessions. An in-memory database cannot be shared that way.
+if _is_memory_database(settings.database_url):
+    write_engine = engine
+else:
+    write_engine = create_async_engine(settings.database_url, echo=settings.debug, pool_size=1, max_overflow=0)
+write_session_maker = async_sessionmaker(write_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets readers run alongside the writer; synchronous=NORMAL is
+    # durable across application crashes and only fsyncs at checkpoints.
+    cursor = dbapi_connection.cursor()
+    if settings.sqlite_wal:
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA cache_size=-65536")
+    cursor.close()
+
+
+if engine.dialect.name == "sqlite":
+    for _engine in {engine, write_engine}:
+        event.listen(_engine.sync_engine, "connect", _sqlite_pragmas)
+
+
 class Base(DeclarativeBase):
     pass
 
@@ -21,6 +54,28 @@ async def get_db():
             await session.close()
 
 
+def _add_missing_columns(conn):
+    # There are no migrations; add nullable columns introduced after the
+    # table was first created.
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing and column.nullable:
+                column_type = column.type.compile(dialect=conn.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN "{column.name}" {column_type}'))
+
+
+def _create_missing_indexes(conn):
+    # create_all skips tables that already exist, so add indexes introduced
+    # after the table was first created.
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
 async def init_db():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_add_missing_columns)
+        await conn.run_sync(_create_missing_indexes)
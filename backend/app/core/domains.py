@@ -0,0 +1,52 @@
+"""Email and website domain helpers."""
+
+FREE_EMAIL_DOMAINS = frozenset({
+    "gmail.com", "googlemail.com", "yahoo.com", "yahoo.co.uk", "ymail.com",
+    "hotmail.com", "hotmail.co.uk", "outlook.com", "live.com", "msn.com",
+    "aol.com", "icloud.com", "me.com", "mac.com", "proton.me", "protonmail.com",
+    "gmx.com", "gmx.de", "mail.com", "yandex.com", "yandex.ru", "zoho.com",
+    "qq.com", "163.com", "web.de", "fastmail.com",
+})
+
+
+def email_domain(email: str) -> str:
+    """Return the lower-cased domain part of an email address."""
+    if not email or "@" not in email:
+        return ""
+    return email.rsplit("@", 1)[1].strip().lower()
+
+
+def is_free_email(email: str) -> bool:
+    """Check whether an email address uses a free mail provider."""
+    return email_domain(email) in FREE_EMAIL_DOMAINS
+
+
+def normalize_domain(value: str) -> str:
+    """Reduce a URL, host or email address to a bare lower-case domain."""
+    if not value:
+        return ""
+    value = value.strip().lower()
+    if "@" in value and "/" not in value:
+        value = value.rsplit("@", 1)[1]
+    if "://" in value:
+        value = value.split("://", 1)[1]
+    value = value.split("/", 1)[0].split("?", 1)[0].split("#", 1)[0]
+    value = value.rsplit("@", 1)[-1].split(":", 1)[0].strip(".")
+    if value.startswith("www."):
+        value = value[4:]
+    return value if "." in value else ""
+
+
+def company_domain(website: str = "", email: str = "") -> str:
+    """Pick the domain identifying a lead's company.
+
+    The website wins; otherwise the email domain is used unless it belongs
+    to a free mail provider. Returns "" when no company domain is known.
+    """
+    domain = normalize_domain(website or "")
+    if domain:
+        return domain
+    domain = email_domain(email)
+    if domain and domain not in FREE_EMAIL_DOMAINS:
+        return normalize_domain(domain)
+    return ""
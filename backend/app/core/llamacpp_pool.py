@@ -0,0 +1,350 @@
+"""Multi-process llama.cpp inference pool.
+
+Each worker process loads the GGUF model once with its own thread count.
+llama.cpp maps the model file with mmap, so the weights are shared through
+the OS page cache instead of being copied per worker. Requests go through
+one shared multiprocessing queue, so an idle worker picks up the next
+prompt. A reader thread in the API process resolves the waiting futures
+as responses come back, and restarts workers that die, failing their
+in-flight request.
+
+ChatLlamaCppPool is the chat model the gateway uses for the llamacpp
+provider; agents await it like any other model. Every model path gets its
+own pool, so a `llamacpp:/path/to/other.gguf` route is served by that
+model.
+"""
+
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, convert_to_openai_messages
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# A worker that dies this many times in a row before loading the model is
+# given up on (e.g. a bad model path).
+MAX_START_FAILURES = 3
+
+
+def _worker_main(worker_id: int, model_path: str, n_ctx: int, n_threads: int, requests, responses) -> None:
+    """Worker process loop: load the model once, then serve prompts."""
+    from llama_cpp import Llama
+
+    llm = Llama(model_path=model_path, n_ctx=n_ctx, n_threads=n_threads, use_mmap=True, verbose=False)
+    responses.put(("ready", worker_id, None, None))
+
+    while True:
+        item = requests.get()
+        if item is None:
+            break
+        request_id, messages, params = item
+        responses.put(("start", worker_id, request_id, None))
+        try:
+            completion = llm.create_chat_completion(messages=messages, **params)
+            responses.put(("done", worker_id, request_id, {
+                "content": completion["choices"][0]["message"]["content"] or "",
+                "usage": completion.get("usage") or {},
+            }))
+        except Exception as e:
+            responses.put(("error", worker_id, request_id, f"{type(e).__name__}: {e}"))
+
+
+class WorkerState:
+    def __init__(self, worker_id: int, process):
+        self.worker_id = worker_id
+        self.process = process
+        self.ready = False
+        self.current: Optional[int] = None
+        self.completed = 0
+        self.restarts = 0
+        self.start_failures = 0
+
+    @property
+    def failed(self) -> bool:
+        return self.start_failures >= MAX_START_FAILURES
+
+
+class LlamaCppPool:
+    """Pool of llama.cpp worker processes behind a request/response queue."""
+
+    def __init__(
+        self,
+        model_path: str,
+        workers: int,
+        threads_per_worker: int,
+        n_ctx: int
+    ):
+        if not model_path:
+            raise ValueError("LLAMACPP_MODEL_PATH is required for the llamacpp provider")
+        self.model_path = model_path
+        self.workers = workers
+        self.threads_per_worker = threads_per_worker
+        self.n_ctx = n_ctx
+
+        self._context = multiprocessing.get_context("spawn")
+        self._requests = self._context.Queue()
+        self._responses = self._context.Queue()
+        self._pending: Dict[int, Future] = {}
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self._workers: List[WorkerState] = []
+        self._reader: Optional[threading.Thread] = None
+        self._stopping = False
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self._latency_total = 0.0
+        self._started_at: Dict[int, float] = {}
+
+    def _spawn(self, worker_id: int):
+        process = self._context.Process(
+            target=_worker_main,
+            args=(worker_id, self.model_path, self.n_ctx, self.threads_per_worker, self._requests, self._responses),
+            name=f"llamacpp-worker-{worker_id}",
+            daemon=True
+        )
+        process.start()
+        return process
+
+    def start(self) -> None:
+        if self._reader is not None:
+            return
+        self._workers = [WorkerState(worker_id, self._spawn(worker_id)) for worker_id in range(self.workers)]
+        self._reader = threading.Thread(target=self._read_responses, name="llamacpp-pool-reader", daemon=True)
+        self._reader.start()
+
+    def stop(self) -> None:
+        self._stopping = True
+        for _ in self._workers:
+            self._requests.put(None)
+        for worker in self._workers:
+            worker.process.join(timeout=5)
+            if worker.process.is_alive():
+                worker.process.terminate()
+        with self._lock:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(RuntimeError("llama.cpp pool stopped"))
+            self._pending.clear()
+
+    def submit(self, messages: List[dict], params: dict) -> Future:
+        """Queue a chat completion; the future resolves to {content, usage}."""
+        if self._workers and all(worker.failed for worker in self._workers):
+            raise RuntimeError("No llama.cpp worker could load the model")
+        future: Future = Future()
+        request_id = next(self._ids)
+        with self._lock:
+            self._pending[request_id] = future
+            self._started_at[request_id] = time.perf_counter()
+            self.submitted += 1
+        self._requests.put((request_id, messages, params))
+        return future
+
+    def _resolve(self, request_id: int, result: Any = None, error: Optional[str] = None) -> None:
+        with self._lock:
+            future = self._pending.pop(request_id, None)
+            started = self._started_at.pop(request_id, None)
+            if error is None:
+                self.completed += 1
+                if started is not None:
+                    self._latency_total += time.perf_counter() - started
+            else:
+                self.failed += 1
+        if future is None or future.done():
+            return
+        if error is None:
+            future.set_result(result)
+        else:
+            future.set_exception(RuntimeError(error))
+
+    def _read_responses(self) -> None:
+        last_check = time.monotonic()
+        while not self._stopping:
+            if time.monotonic() - last_check >= 1:
+                self._check_workers()
+                last_check = time.monotonic()
+            try:
+                kind, worker_id, request_id, payload = self._responses.get(timeout=1)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                break
+
+            worker = self._workers[worker_id]
+            if kind == "ready":
+                worker.ready = True
+                worker.start_failures = 0
+            elif kind == "start":
+                worker.current = request_id
+            elif kind == "done":
+                worker.current = None
+                worker.completed += 1
+                self._resolve(request_id, payload)
+            elif kind == "error":
+                worker.current = None
+                self._resolve(request_id, error=payload)
+
+    def _check_workers(self) -> None:
+        for worker in self._workers:
+            if self._stopping or worker.failed or worker.process.is_alive():
+                continue
+            logger.warning("llama.cpp worker %s exited with %s", worker.worker_id, worker.process.exitcode)
+            if worker.current is not None:
+                self._resolve(worker.current, error="llama.cpp worker died")
+            if not worker.ready:
+                worker.start_failures += 1
+            worker.current = None
+            worker.ready = False
+            if worker.failed:
+                logger.error("llama.cpp worker %s failed to load the model; not restarting", worker.worker_id)
+                continue
+            worker.restarts += 1
+            worker.process = self._spawn(worker.worker_id)
+
+        if self._workers and all(worker.failed for worker in self._workers):
+            with self._lock:
+                request_ids = list(self._pending)
+            for request_id in request_ids:
+                self._resolve(request_id, error="No llama.cpp worker could load the model")
+
+    def stats(self) -> dict:
+        with self._lock:
+            in_flight = len(self._pending)
+        busy = sum(1 for worker in self._workers if worker.current is not None)
+        return {
+            "model_path": self.model_path,
+            "workers": [
+                {
+                    "id": worker.worker_id,
+                    "pid": worker.process.pid,
+                    "alive": worker.process.is_alive(),
+                    "ready": worker.ready,
+                    "busy": worker.current is not None,
+                    "completed": worker.completed,
+                    "restarts": worker.restarts,
+                    "failed": worker.failed,
+                }
+                for worker in self._workers
+            ],
+            "threads_per_worker": self.threads_per_worker,
+            "in_flight": in_flight,
+            "queue_depth": max(0, in_flight - busy),
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "avg_latency_ms": round(self._latency_total / self.completed * 1000, 1) if self.completed else None,
+        }
+
+
+def _default_workers() -> int:
+    return max(1, (os.cpu_count() or 1) // max(1, settings.llamacpp_threads))
+
+
+_pools: Dict[str, LlamaCppPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_llamacpp_pool(model_path: Optional[str] = None) -> LlamaCppPool:
+    """The started pool serving a model (default LLAMACPP_MODEL_PATH).
+
+    Each model path has its own LLAMACPP_WORKERS processes.
+    """
+    model_path = model_path or settings.llamacpp_model_path
+    with _pools_lock:
+        pool = _pools.get(model_path)
+        if pool is None:
+            pool = LlamaCppPool(
+                model_path=model_path,
+                workers=settings.llamacpp_workers or _default_workers(),
+                threads_per_worker=settings.llamacpp_threads,
+                n_ctx=settings.llamacpp_n_ctx
+            )
+            pool.start()
+            _pools[model_path] = pool
+    return pool
+
+
+def llamacpp_pools() -> List[LlamaCppPool]:
+    """The pools started so far."""
+    with _pools_lock:
+        return list(_pools.values())
+
+
+def shutdown_llamacpp_pool() -> None:
+    """Stop every pool that was started."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.stop()
+
+
+class ChatLlamaCppPool(BaseChatModel):
+    """Chat model dispatching to the llama.cpp worker pool."""
+
+    model_path: str
+    temperature: float = 0.1
+    max_tokens: int = 1024
+
+    @property
+    def _llm_type(self) -> str:
+        return "llamacpp-pool"
+
+    @property
+    def _identifying_params(self) -> dict:
+        return {
+            "model_path": self.model_path,
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+        }
+
+    def _submit(self, messages: List[BaseMessage], stop: Optional[List[str]]) -> Future:
+        params = {"temperature": self.temperature, "max_tokens": self.max_tokens}
+        if stop:
+            params["stop"] = stop
+        return get_llamacpp_pool(self.model_path).submit(convert_to_openai_messages(messages), params)
+
+    @staticmethod
+    def _result(response: dict) -> ChatResult:
+        usage = response["usage"]
+        message = AIMessage(
+            content=response["content"],
+            usage_metadata={
+                "input_tokens": usage.get("prompt_tokens", 0),
+                "output_tokens": usage.get("completion_tokens", 0),
+                "total_tokens": usage.get("total_tokens", 0),
+            }
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        return self._result(self._submit(messages, stop).result())
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        return self._result(await asyncio.wrap_future(self._submit(messages, stop)))
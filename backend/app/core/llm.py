@@ -1,29 +1,132 @@
 """LLM provider configuration."""
 
 from functools import lru_cache
+from typing import List, Optional
+
+import httpx
+from langchain_core.exceptions import OutputParserException
 from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.utils.json import parse_json_markdown
+
 from app.core.config import settings
+from app.core.llm_cache import SQLiteLLMCache
+from app.core.llm_gateway import LLMGateway, LLMRoute
+
+
+def _is_json_response(text: str) -> bool:
+    """All agents expect JSON, so only cache responses that parse."""
+    try:
+        parse_json_markdown(text)
+    except (OutputParserException, ValueError):
+        return False
+    return True
 
 
 @lru_cache()
-def get_llm() -> BaseChatModel:
-    provider = settings.llm_provider.lower()
+def get_llm_cache() -> Optional[SQLiteLLMCache]:
+    if not settings.llm_cache_enabled:
+        return None
+    return SQLiteLLMCache(
+        path=settings.llm_cache_path,
+        ttl_seconds=settings.llm_cache_ttl_seconds,
+        max_entries=settings.llm_cache_max_entries,
+        should_cache=_is_json_response
+    )
+
+
+def _route_limits(name: str, provider: str) -> dict:
+    """Default route limits overridden by LLM_ROUTE_LIMITS[provider] and [name]."""
+    limits = {
+        "max_in_flight": settings.llm_max_in_flight,
+        "requests_per_second": settings.llm_requests_per_second,
+        "timeout": settings.llm_timeout,
+        "max_retries": settings.llm_max_retries,
+        "backoff": settings.llm_retry_backoff,
+        "cooldown": settings.llm_failover_cooldown,
+    }
+    limits.update(settings.llm_route_limits.get(provider, {}))
+    if name != provider:
+        limits.update(settings.llm_route_limits.get(name, {}))
+    return limits
+
+
+def _http_clients(max_connections: int, timeout: float) -> dict:
+    """Pooled keep-alive HTTP clients for OpenAI-compatible routes."""
+    limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+    return {
+        "http_client": httpx.Client(limits=limits, timeout=timeout),
+        "http_async_client": httpx.AsyncClient(limits=limits, timeout=timeout),
+    }
+
+
+def build_chat_model(provider: str, model: Optional[str] = None, limits: Optional[dict] = None) -> BaseChatModel:
+    """Create the client for one route.
+
+    Retries are left to the gateway, so the clients' own retries are off.
+    Ollama is reached through its OpenAI-compatible endpoint so it gets
+    the same pooled connections.
+    """
+    limits = limits or _route_limits(provider, provider)
 
     if provider == "openai":
         from langchain_openai import ChatOpenAI
-        return ChatOpenAI(api_key=settings.openai_api_key, model=settings.openai_model, temperature=0.1)
+        return ChatOpenAI(
+            api_key=settings.openai_api_key,
+            model=model or settings.openai_model,
+            temperature=0.1,
+            max_retries=0,
+            **_http_clients(limits["max_in_flight"], limits["timeout"])
+        )
 
     elif provider == "anthropic":
         from langchain_anthropic import ChatAnthropic
-        return ChatAnthropic(api_key=settings.anthropic_api_key, model=settings.anthropic_model, temperature=0.1)
+        # The SDK client keeps its own httpx connection pool.
+        return ChatAnthropic(
+            api_key=settings.anthropic_api_key,
+            model=model or settings.anthropic_model,
+            temperature=0.1,
+            max_retries=0,
+            timeout=limits["timeout"]
+        )
 
     elif provider == "ollama":
-        from langchain_community.chat_models import ChatOllama
-        return ChatOllama(base_url=settings.ollama_base_url, model=settings.ollama_model, temperature=0.1)
+        from langchain_openai import ChatOpenAI
+        return ChatOpenAI(
+            base_url=settings.ollama_base_url.rstrip("/") + "/v1",
+            api_key="ollama",
+            model=model or settings.ollama_model,
+            temperature=0.1,
+            max_retries=0,
+            **_http_clients(limits["max_in_flight"], limits["timeout"])
+        )
 
     elif provider == "llamacpp":
-        from langchain_community.chat_models import ChatLlamaCpp
-        return ChatLlamaCpp(model_path=settings.llamacpp_model_path, n_ctx=settings.llamacpp_n_ctx, temperature=0.1)
+        from app.core.llamacpp_pool import ChatLlamaCppPool, get_llamacpp_pool
+        # Start the model's worker processes now so it loads during startup.
+        model_path = get_llamacpp_pool(model).model_path
+        return ChatLlamaCppPool(
+            model_path=model_path,
+            temperature=0.1,
+            max_tokens=settings.llamacpp_max_tokens
+        )
 
     else:
         raise ValueError(f"Unsupported LLM provider: {provider}")
+
+
+def route_names() -> List[str]:
+    """Configured routes in failover order ("provider" or "provider:model")."""
+    names = [name.strip() for name in settings.llm_routes.split(",") if name.strip()]
+    return names or [settings.llm_provider.lower()]
+
+
+@lru_cache()
+def get_llm() -> LLMGateway:
+    """The shared LLM gateway used by all agents."""
+    routes = []
+    for name in route_names():
+        provider, _, model = name.partition(":")
+        provider = provider.lower()
+        limits = _route_limits(name, provider)
+        routes.append(LLMRoute(name, build_chat_model(provider, model or None, limits), **limits))
+    return LLMGateway(routes=routes, cache=get_llm_cache())
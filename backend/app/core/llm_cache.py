@@ -0,0 +1,142 @@
+"""Persistent LLM response cache."""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Callable, Optional
+
+from langchain_core.caches import BaseCache, RETURN_VAL_TYPE
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, Generation
+
+
+class SQLiteLLMCache(BaseCache):
+    """Content-addressed LLM response cache stored in SQLite.
+
+    Entries are keyed by a hash of the LangChain llm_string (which carries
+    the provider type, model and temperature) and the fully rendered prompt.
+    Entries older than `ttl_seconds` are treated as misses, and the least
+    recently used entries are evicted once `max_entries` is exceeded.
+    Generations whose generation_info sets `no_cache` are not stored.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: int = 0,
+        max_entries: int = 0,
+        should_cache: Optional[Callable[[str], bool]] = None
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.should_cache = should_cache
+
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self.skipped = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_accessed_at ON llm_cache (accessed_at)")
+        self._size = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(json.dumps([llm_string, prompt]).encode()).hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        key = self._key(prompt, llm_string)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            value, created_at = row
+            if self.ttl_seconds and now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._size -= 1
+                self.expired += 1
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+
+        return [
+            ChatGeneration(message=AIMessage(content=text)) if is_chat else Generation(text=text)
+            for text, is_chat in json.loads(value)
+        ]
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        if any((generation.generation_info or {}).get("no_cache") for generation in return_val):
+            self.skipped += 1
+            return
+        texts = [generation.text for generation in return_val]
+        if self.should_cache and not all(self.should_cache(text) for text in texts):
+            return
+
+        value = json.dumps([
+            [generation.text, isinstance(generation, ChatGeneration)]
+            for generation in return_val
+        ])
+        key = self._key(prompt, llm_string)
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO llm_cache (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now)
+            )
+            if cursor.rowcount:
+                self._size += 1
+            else:
+                self._conn.execute(
+                    "UPDATE llm_cache SET value = ?, created_at = ?, accessed_at = ? WHERE key = ?",
+                    (value, now, now, key)
+                )
+
+            if self.max_entries and self._size > self.max_entries:
+                self._evict()
+
+    def _evict(self) -> None:
+        # Trim a little below the limit so eviction does not run on every insert.
+        target = max(0, int(self.max_entries * 0.9))
+        cursor = self._conn.execute(
+            "DELETE FROM llm_cache WHERE key IN ("
+            "SELECT key FROM llm_cache ORDER BY accessed_at ASC LIMIT ?)",
+            (self._size - target,)
+        )
+        self.evictions += cursor.rowcount
+        self._size -= cursor.rowcount
+
+    def clear(self, **kwargs) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._size = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": self._size,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "skipped": self.skipped
+        }
@@ -0,0 +1,247 @@
+"""LLM gateway with per-route limits, retries and failover.
+
+A route is one configured provider/model client. Each route has its own
+max-in-flight semaphore, token-bucket rate limiter, per-call timeout and
+retry-with-backoff policy for transient errors (timeouts, connection
+errors, 429 and 5xx). The gateway tries routes in the configured order and
+fails over to the next one when a route gives up; a route that failed is
+skipped for a cool-down period while other routes are available.
+
+The gateway is itself a chat model, so agents use it like any other LLM
+and the response cache sits in front of all routes.
+"""
+
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Any, Deque, List, Optional
+
+import httpx
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.rate_limiters import InMemoryRateLimiter
+from pydantic import ConfigDict
+
+RETRYABLE_STATUS_CODES = {408, 409, 425, 429, 500, 502, 503, 504, 529}
+# Window of the per-route call rate, used to keep background work within
+# a calls-per-minute budget.
+RECENT_CALLS_WINDOW = 60.0
+# Route models are called inside the gateway's own run; an empty callback
+# list keeps them from inheriting the caller's callbacks, which would
+# report every provider call a second time.
+ROUTE_CONFIG = {"callbacks": []}
+
+RETRYABLE_NAME_PARTS = ("Timeout", "Connection", "RateLimit", "Overloaded", "InternalServer", "ServiceUnavailable")
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether an LLM call error is transient and worth retrying."""
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError, httpx.TransportError)):
+        return True
+    status_code = getattr(error, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(error, "response", None), "status_code", None)
+    if status_code is not None:
+        return status_code in RETRYABLE_STATUS_CODES
+    return any(part in type(error).__name__ for part in RETRYABLE_NAME_PARTS)
+
+
+class LLMRoute:
+    """One provider/model client with its own limits and retry policy."""
+
+    def __init__(
+        self,
+        name: str,
+        model: BaseChatModel,
+        max_in_flight: int = 8,
+        requests_per_second: float = 0,
+        timeout: float = 60,
+        max_retries: int = 2,
+        backoff: float = 1.0,
+        cooldown: float = 30
+    ):
+        self.name = name
+        self.model = model
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.cooldown = cooldown
+        self.semaphore = asyncio.Semaphore(max_in_flight)
+        self.rate_limiter = (
+            InMemoryRateLimiter(
+                requests_per_second=requests_per_second,
+                check_every_n_seconds=min(0.1, 1 / requests_per_second),
+                max_bucket_size=max(1, requests_per_second)
+            )
+            if requests_per_second else None
+        )
+        self.unavailable_until = 0.0
+
+        self.in_flight = 0
+        self.calls = 0
+        self._call_times: Deque[float] = deque()
+        self.failures = 0
+        self.retries = 0
+        self.timeouts = 0
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self.unavailable_until
+
+    def _delay(self, attempt: int) -> float:
+        # Exponential backoff with jitter.
+        return self.backoff * (2 ** attempt) * (0.5 + random.random() / 2)
+
+    def _record_call(self) -> None:
+        self.calls += 1
+        self._call_times.append(time.monotonic())
+
+    def recent_calls(self) -> int:
+        """Provider calls, retries included, in the last RECENT_CALLS_WINDOW seconds."""
+        cutoff = time.monotonic() - RECENT_CALLS_WINDOW
+        while self._call_times and self._call_times[0] < cutoff:
+            self._call_times.popleft()
+        return len(self._call_times)
+
+    def _failed(self) -> None:
+        self.failures += 1
+        self.unavailable_until = time.monotonic() + self.cooldown
+
+    async def ainvoke(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, **kwargs: Any) -> BaseMessage:
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter:
+                await self.rate_limiter.aacquire()
+            async with self.semaphore:
+                self.in_flight += 1
+                self._record_call()
+                try:
+                    return await asyncio.wait_for(
+                        self.model.ainvoke(messages, stop=stop, config=ROUTE_CONFIG, **kwargs),
+                        self.timeout
+                    )
+                except Exception as e:
+                    if isinstance(e, asyncio.TimeoutError):
+                        self.timeouts += 1
+                    if attempt >= self.max_retries or not is_retryable(e):
+                        self._failed()
+                        raise
+                finally:
+                    self.in_flight -= 1
+            self.retries += 1
+            await asyncio.sleep(self._delay(attempt))
+
+    def invoke(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, **kwargs: Any) -> BaseMessage:
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            self._record_call()
+            try:
+                return self.model.invoke(messages, stop=stop, config=ROUTE_CONFIG, **kwargs)
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    self._failed()
+                    raise
+            self.retries += 1
+            time.sleep(self._delay(attempt))
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "available": self.available,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "calls": self.calls,
+            "calls_last_minute": self.recent_calls(),
+            "retries": self.retries,
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+        }
+
+
+class LLMGateway(BaseChatModel):
+    """Chat model that dispatches to routes in failover order."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    routes: List[Any]
+    failovers: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "llm-gateway"
+
+    @property
+    def _identifying_params(self) -> dict:
+        # Only the primary route identifies responses, so cached answers
+        # survive changes to the fallback routes; answers from fallback
+        # routes are never cached (see _result).
+        primary = self.routes[0]
+        return {"primary": primary.name, **primary.model._identifying_params}
+
+    def _ordered_routes(self) -> List[LLMRoute]:
+        available = [route for route in self.routes if route.available]
+        cooling = [route for route in self.routes if not route.available]
+        return available + cooling
+
+    def _result(self, message: BaseMessage, route: LLMRoute) -> ChatResult:
+        # A fallback answer comes from another provider or model than the
+        # cache key names, so it is marked to keep it out of the cache.
+        info = {"route": route.name}
+        if route is not self.routes[0]:
+            info["no_cache"] = True
+        return ChatResult(
+            generations=[ChatGeneration(message=message, generation_info=info)],
+            llm_output={"route": route.name}
+        )
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        last_error = None
+        for index, route in enumerate(self._ordered_routes()):
+            if index:
+                self.failovers += 1
+            try:
+                return self._result(await route.ainvoke(messages, stop=stop, **kwargs), route)
+            except Exception as e:
+                last_error = e
+        raise last_error
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        last_error = None
+        for index, route in enumerate(self._ordered_routes()):
+            if index:
+                self.failovers += 1
+            try:
+                return self._result(route.invoke(messages, stop=stop, **kwargs), route)
+            except Exception as e:
+                last_error = e
+        raise last_error
+
+    def recent_calls(self) -> int:
+        """Provider calls over all routes in the last RECENT_CALLS_WINDOW seconds.
+
+        Cache hits never reach a route, so they are not counted.
+        """
+        return sum(route.recent_calls() for route in self.routes)
+
+    def stats(self) -> dict:
+        return {
+            "failovers": self.failovers,
+            "calls_last_minute": self.recent_calls(),
+            "routes": [route.stats() for route in self.routes],
+        }
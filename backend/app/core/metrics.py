@@ -0,0 +1,221 @@
+"""Prometheus metrics.
+
+Request latency and in-flight counts come from an ASGI middleware, LLM
+latency, token usage and parse failures from a LangChain callback handler
+attached to each agent's chains, and DB query time from engine cursor
+events. Everything is exposed in the Prometheus text format at /metrics.
+"""
+
+import math
+import time
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from prometheus_client import Counter, Gauge, Histogram
+from prometheus_client.core import GaugeMetricFamily, REGISTRY
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+LLM_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+TOKEN_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "route", "status"]
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests being served")
+
+LLM_CALL_DURATION = Histogram(
+    "llm_call_duration_seconds", "LLM call latency", ["agent", "provider", "outcome"], buckets=LLM_BUCKETS
+)
+LLM_CALLS_IN_FLIGHT = Gauge("llm_calls_in_flight", "LLM calls awaiting a response", ["agent"])
+LLM_PROMPT_TOKENS = Histogram(
+    "llm_prompt_tokens", "Prompt tokens per LLM call", ["agent"], buckets=TOKEN_BUCKETS
+)
+LLM_TOKENS = Counter("llm_tokens", "LLM tokens used", ["agent", "provider", "kind"])
+LLM_PARSE_FAILURES = Counter("llm_parse_failures", "LLM responses the output parser rejected", ["agent"])
+LLM_OUTPUTS = Counter(
+    "llm_outputs", "Agent LLM outputs by parse outcome (parsed, repaired, reprompted, failed)", ["agent", "outcome"]
+)
+
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds", "Database statement execution time", ["operation"], buckets=DB_BUCKETS
+)
+
+DB_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE"}
+
+
+def _route_template(scope) -> str:
+    """Full route template of the matched route, e.g. /api/leads/{lead_id}.
+
+    Depending on the FastAPI version the matched route's path may be
+    relative to its router prefix; the prefix is then taken from the
+    leading segments of the request path.
+    """
+    template = getattr(scope.get("route"), "path", None)
+    if template is None:
+        return "unmatched"
+    path = scope.get("path", "").rstrip("/")
+    depth = len([segment for segment in template.split("/") if segment])
+    segments = path.split("/")
+    return "/".join(segments[:len(segments) - depth]) + template
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency per route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            # Label by route template, not raw path, to bound cardinality.
+            HTTP_REQUEST_DURATION.labels(scope["method"], _route_template(scope), str(status["code"])).observe(
+                time.perf_counter() - start
+            )
+
+
+def _provider(response: LLMResult) -> str:
+    # The gateway reports the route that answered; cached answers have none.
+    route = (response.llm_output or {}).get("route")
+    return route.split(":", 1)[0] if route else "cache"
+
+
+def _token_usage(response: LLMResult) -> Dict[str, int]:
+    usage = {"prompt": 0, "completion": 0}
+    for generations in response.generations:
+        for generation in generations:
+            metadata = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+            usage["prompt"] += metadata.get("input_tokens", 0)
+            usage["completion"] += metadata.get("output_tokens", 0)
+    return usage
+
+
+class AgentMetricsHandler(BaseCallbackHandler):
+    """Records LLM latency, tokens and parse failures for one agent."""
+
+    run_inline = True
+
+    def __init__(self, agent: str):
+        self.agent = agent
+        self._started: Dict[UUID, tuple] = {}
+        self._parsers = set()
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[list], *, run_id: UUID, **kwargs: Any) -> None:
+        # Prompt size estimate (~4 characters per token) for responses
+        # without usage data, e.g. cached ones.
+        chars = sum(len(str(message.content)) for batch in messages for message in batch)
+        self._started[run_id] = (time.perf_counter(), math.ceil(chars / 4))
+        LLM_CALLS_IN_FLIGHT.labels(self.agent).inc()
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        started = self._started.pop(run_id, None)
+        if started is None:
+            return
+        start, estimated_prompt_tokens = started
+        LLM_CALLS_IN_FLIGHT.labels(self.agent).dec()
+        provider = _provider(response)
+        LLM_CALL_DURATION.labels(self.agent, provider, "success").observe(time.perf_counter() - start)
+        usage = _token_usage(response)
+        LLM_PROMPT_TOKENS.labels(self.agent).observe(usage["prompt"] or estimated_prompt_tokens)
+        for kind, count in usage.items():
+            if count:
+                LLM_TOKENS.labels(self.agent, provider, kind).inc(count)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        started = self._started.pop(run_id, None)
+        if started is None:
+            return
+        LLM_CALLS_IN_FLIGHT.labels(self.agent).dec()
+        LLM_CALL_DURATION.labels(self.agent, "none", "error").observe(time.perf_counter() - started[0])
+
+    def on_chain_start(self, serialized: Optional[Dict[str, Any]], inputs: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        if kwargs.get("run_type") == "parser":
+            self._parsers.add(run_id)
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._parsers.discard(run_id)
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        if run_id in self._parsers:
+            self._parsers.discard(run_id)
+            LLM_PARSE_FAILURES.labels(self.agent).inc()
+
+
+_agent_handlers: Dict[str, AgentMetricsHandler] = {}
+
+
+def agent_callbacks(agent: str) -> list:
+    """Callbacks to attach to an agent's chains."""
+    if not settings.metrics_enabled:
+        return []
+    if agent not in _agent_handlers:
+        _agent_handlers[agent] = AgentMetricsHandler(agent)
+    return [_agent_handlers[agent]]
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Time every statement executed on a (sync) engine."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("query_start")
+        if not starts:
+            return
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+        DB_QUERY_DURATION.labels(operation if operation in DB_OPERATIONS else "OTHER").observe(
+            time.perf_counter() - starts.pop()
+        )
+
+
+class LLMRouteCollector:
+    """Per-route gateway gauges, read at scrape time."""
+
+    @staticmethod
+    def _families():
+        return (
+            GaugeMetricFamily("llm_route_in_flight", "LLM calls in flight per gateway route", labels=["route"]),
+            GaugeMetricFamily("llm_route_available", "1 if the route is not cooling down", labels=["route"]),
+        )
+
+    def describe(self):
+        # Keeps registration from building the gateway.
+        return list(self._families())
+
+    def collect(self):
+        from app.core.llm import get_llm
+
+        in_flight, available = self._families()
+        stats = getattr(get_llm(), "stats", None)
+        for route in stats()["routes"] if stats else []:
+            in_flight.add_metric([route["name"]], route["in_flight"])
+            available.add_metric([route["name"]], 1 if route["available"] else 0)
+        yield in_flight
+        yield available
+
+
+REGISTRY.register(LLMRouteCollector())
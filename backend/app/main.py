@@ -1,18 +1,40 @@
 """FastAPI application entry point."""
 
+import asyncio
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
+from app.agents.registry import agent_registry
 from app.core.config import settings
-from app.core.database import init_db
-from app.api import leads, scoring, enrichment, analytics
+from app.core.database import engine, write_engine, init_db, async_session_maker
+from app.core.llamacpp_pool import shutdown_llamacpp_pool
+from app.core.metrics import MetricsMiddleware, instrument_engine
+from app.api import leads, scoring, enrichment, analytics, events, jobs, pipeline, system
+from app.services.duplicates import duplicate_index
+from app.services.jobs import worker_pool
+from app.services.scheduler import reanalysis_scheduler
+from app.services.stats import ensure_stats
+from app.services.write_behind import lead_writer
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_db()
+    async with async_session_maker() as db:
+        await ensure_stats(db)
+        await duplicate_index.load(db)
+    await asyncio.to_thread(agent_registry.build)
+    if settings.llm_warmup:
+        await agent_registry.warm_up()
+    await worker_pool.start()
+    await reanalysis_scheduler.start()
     yield
+    await reanalysis_scheduler.stop()
+    await worker_pool.stop()
+    await lead_writer.stop()
+    await asyncio.to_thread(shutdown_llamacpp_pool)
 
 
 app = FastAPI(
@@ -28,12 +50,29 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Possible-Duplicates"],
 )
 
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+    instrument_engine(engine.sync_engine)
+    if write_engine is not engine:
+        instrument_engine(write_engine.sync_engine)
+
 app.include_router(leads.router, prefix="/api/leads", tags=["leads"])
 app.include_router(scoring.router, prefix="/api/scoring", tags=["scoring"])
 app.include_router(enrichment.router, prefix="/api/enrichment", tags=["enrichment"])
 app.include_router(analytics.router, prefix="/api/analytics", tags=["analytics"])
+app.include_router(pipeline.router, prefix="/api/pipeline", tags=["pipeline"])
+app.include_router(jobs.router, prefix="/api/jobs", tags=["jobs"])
+app.include_router(events.router, prefix="/api/events", tags=["events"])
+app.include_router(system.router, prefix="/api/system", tags=["system"])
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics."""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
 
 
 @app.get("/health")
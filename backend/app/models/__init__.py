@@ -2,3 +2,7 @@
 
 from app.models.lead import Lead, LeadCreate, LeadResponse, LeadScore
 from app.models.enrichment import EnrichmentData, CompanyData, ContactData
+from app.models.job import Job, JobItem, JobCreate, JobResponse
+from app.models.company import Company
+from app.models.stats import LeadStat
+from app.models.event import LeadEvent, LeadActivity
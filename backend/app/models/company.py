@@ -0,0 +1,20 @@
+"""Company models."""
+
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, JSON
+
+from app.core.database import Base
+
+
+class Company(Base):
+    """Company-level enrichment shared by all leads on the same domain."""
+
+    __tablename__ = "companies"
+
+    domain = Column(String, primary_key=True)
+    name = Column(String)
+    data = Column(JSON, default=dict)
+    enriched_at = Column(DateTime)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,81 @@
+"""Behaviour event models."""
+
+from datetime import datetime
+from typing import Dict, List, Optional
+from enum import Enum
+from pydantic import BaseModel, Field
+from sqlalchemy import Column, String, DateTime, JSON, Integer, Float, Index, Enum as SQLEnum
+
+from app.core.database import Base
+
+
+class EventType(str, Enum):
+    PAGE_VIEW = "page_view"
+    PRICING_VISIT = "pricing_visit"
+    EMAIL_OPEN = "email_open"
+    EMAIL_CLICK = "email_click"
+    CONTENT_DOWNLOAD = "content_download"
+    FORM_SUBMIT = "form_submit"
+    DEMO_REQUEST = "demo_request"
+    MEETING_BOOKED = "meeting_booked"
+
+
+class LeadEvent(Base):
+    """Append-only behaviour event log."""
+
+    __tablename__ = "lead_events"
+    __table_args__ = (
+        Index("ix_lead_events_lead_id_occurred_at", "lead_id", "occurred_at"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    lead_id = Column(String, nullable=False)
+    event_type = Column(SQLEnum(EventType), nullable=False)
+    occurred_at = Column(DateTime, nullable=False)
+    properties = Column(JSON)  # only stored when the event has any
+
+
+class LeadActivity(Base):
+    """Per-lead aggregates of the event log, updated on ingest.
+
+    activity_score is an exponentially decayed, weighted event count as of
+    activity_at; decay it to the read time before use.
+    """
+
+    __tablename__ = "lead_activity"
+
+    lead_id = Column(String, primary_key=True)
+    counts = Column(JSON, default=dict)  # event type -> count
+    total_events = Column(Integer, nullable=False, default=0)
+    first_event_at = Column(DateTime)
+    last_event_at = Column(DateTime)
+    last_event_type = Column(String)
+    activity_score = Column(Float, nullable=False, default=0.0)
+    activity_at = Column(DateTime)
+
+
+class EventIn(BaseModel):
+    lead_id: str
+    type: EventType
+    occurred_at: Optional[datetime] = None  # defaults to ingest time
+    properties: Dict[str, object] = {}
+
+
+class EventBatch(BaseModel):
+    events: List[EventIn] = Field(min_length=1)
+
+
+class EventIngestResult(BaseModel):
+    accepted: int
+    rejected: int
+    unknown_leads: List[str] = []
+
+
+class LeadActivityResponse(BaseModel):
+    lead_id: str
+    counts: Dict[str, int] = {}
+    total_events: int = 0
+    first_event_at: Optional[datetime] = None
+    last_event_at: Optional[datetime] = None
+    last_event_type: Optional[str] = None
+    activity_score: float = 0.0  # decayed to the time of the request
@@ -0,0 +1,91 @@
+"""Background job models."""
+
+from datetime import datetime
+from typing import Optional, List
+from enum import Enum
+from pydantic import BaseModel
+from sqlalchemy import Column, String, DateTime, Text, JSON, Integer, ForeignKey, Index, Enum as SQLEnum
+import uuid
+
+from app.core.database import Base
+
+
+class JobKind(str, Enum):
+    SCORE = "score"
+    ENRICH = "enrich"
+    INTENT = "intent"
+    PIPELINE = "pipeline"
+
+
+class JobStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    kind = Column(SQLEnum(JobKind), nullable=False)
+    status = Column(SQLEnum(JobStatus), default=JobStatus.PENDING, index=True)
+    params = Column(JSON, default=dict)
+
+    total = Column(Integer, default=0)
+    completed = Column(Integer, default=0)
+    failed = Column(Integer, default=0)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = Column(DateTime)
+
+
+class JobItem(Base):
+    __tablename__ = "job_items"
+    __table_args__ = (
+        Index("ix_job_items_status_id", "status", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(String, ForeignKey("jobs.id", ondelete="CASCADE"), nullable=False, index=True)
+    lead_id = Column(String, nullable=False)
+    status = Column(SQLEnum(JobStatus), default=JobStatus.PENDING)
+    result = Column(JSON)
+    error = Column(Text)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class JobCreate(BaseModel):
+    kind: JobKind
+    lead_ids: List[str]
+    params: dict = {}
+
+
+class JobItemResponse(BaseModel):
+    lead_id: str
+    status: JobStatus
+    result: Optional[dict] = None
+    error: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
+class JobResponse(BaseModel):
+    id: str
+    kind: JobKind
+    status: JobStatus
+    total: int
+    completed: int
+    failed: int
+    pending: int = 0
+    cancelled: int = 0
+    created_at: datetime
+    updated_at: datetime
+    finished_at: Optional[datetime] = None
+    items: Optional[List[JobItemResponse]] = None
+
+    class Config:
+        from_attributes = True
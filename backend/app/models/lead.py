@@ -4,7 +4,7 @@ from datetime import datetime
 from typing import Optional, List
 from enum import Enum
 from pydantic import BaseModel, Field, EmailStr
-from sqlalchemy import Column, String, DateTime, Text, JSON, Float, Integer, Enum as SQLEnum
+from sqlalchemy import Column, String, DateTime, Text, JSON, Float, Integer, Index, Enum as SQLEnum
 import uuid
 
 from app.core.database import Base
@@ -32,6 +32,16 @@ class LeadSource(str, Enum):
 
 class Lead(Base):
     __tablename__ = "leads"
+    __table_args__ = (
+        # (score, id) is the keyset used by list pagination; the composite
+        # indexes serve the same ordering under each supported filter.
+        Index("ix_leads_score_id", "score", "id"),
+        Index("ix_leads_status_score_id", "status", "score", "id"),
+        Index("ix_leads_source_score_id", "source", "score", "id"),
+        Index("ix_leads_tier_score_id", "score_tier", "score", "id"),
+        Index("ix_leads_created_at", "created_at"),
+        Index("ix_leads_updated_at_id", "updated_at", "id"),
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     email = Column(String, nullable=False, unique=True)
@@ -50,6 +60,7 @@ class Lead(Base):
     score_breakdown = Column(JSON, default=dict)
     score_tier = Column(String)  # hot, warm, cold
     last_scored_at = Column(DateTime)
+    score_fingerprint = Column(String)  # hash of the inputs used at last_scored_at
     
     # Enrichment
     enrichment_data = Column(JSON, default=dict)
@@ -93,6 +104,11 @@ class LeadScore(BaseModel):
     recommendations: List[str] = []
 
 
+class BatchItemError(BaseModel):
+    lead_id: str
+    error: str
+
+
 class LeadResponse(BaseModel):
     id: str
     email: str
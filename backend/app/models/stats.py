@@ -0,0 +1,16 @@
+"""Materialized lead statistics."""
+
+from sqlalchemy import Column, String, Integer, Float
+
+from app.core.database import Base
+
+
+class LeadStat(Base):
+    """One aggregate counter, e.g. dimension="tier", key="hot"."""
+
+    __tablename__ = "lead_stats"
+
+    dimension = Column(String, primary_key=True)
+    key = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    score_sum = Column(Float, nullable=False, default=0.0)
@@ -0,0 +1,94 @@
+"""Company-level enrichment shared across leads.
+
+Company data is keyed by normalized domain and stored once in the
+companies table. Concurrent requests for the same domain are collapsed
+into a single LLM call.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy.exc import IntegrityError
+
+from app.agents.enrichment_agent import EnrichmentAgent
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.models.company import Company
+from app.models.enrichment import CompanyData
+
+
+class CompanyEnrichmentCache:
+    """Single-flight, database-backed company enrichment."""
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.llm_calls = 0
+        self.reused = 0
+
+    async def get(
+        self,
+        domain: str,
+        enricher: EnrichmentAgent,
+        company: str = "",
+        website: str = ""
+    ) -> CompanyData:
+        """Return company data for a domain, enriching it at most once."""
+        inflight = self._inflight.get(domain)
+        if inflight is not None:
+            self.reused += 1
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[domain] = future
+        try:
+            company_data = await self._load(domain)
+            if company_data is None:
+                self.llm_calls += 1
+                company_data = await enricher.enrich_company(domain, company=company, website=website)
+                await self._store(domain, company_data)
+            else:
+                self.reused += 1
+            future.set_result(company_data)
+            return company_data
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters see the exception; mark it retrieved for the owner.
+            future.exception()
+            raise
+        finally:
+            del self._inflight[domain]
+
+    @staticmethod
+    async def _load(domain: str) -> Optional[CompanyData]:
+        async with async_session_maker() as db:
+            company = await db.get(Company, domain)
+        if company is None or company.enriched_at is None:
+            return None
+        max_age = timedelta(days=settings.company_enrichment_ttl_days)
+        if datetime.utcnow() - company.enriched_at > max_age:
+            return None
+        return CompanyData(**(company.data or {}))
+
+    @staticmethod
+    async def _store(domain: str, company_data: CompanyData) -> None:
+        async with async_session_maker() as db:
+            company = await db.get(Company, domain) or Company(domain=domain)
+            company.name = company_data.name
+            company.data = company_data.model_dump()
+            company.enriched_at = datetime.utcnow()
+            db.add(company)
+            try:
+                await db.commit()
+            except IntegrityError:
+                # Stored concurrently by another process; keep theirs.
+                await db.rollback()
+
+    def stats(self) -> dict:
+        return {"llm_calls": self.llm_calls, "reused": self.reused, "inflight": len(self._inflight)}
+
+
+company_cache = CompanyEnrichmentCache()
@@ -0,0 +1,270 @@
+"""Fuzzy duplicate detection with an in-memory blocking index.
+
+Each lead is reduced to organization keys (normalized company name and the
+company domain's main label, so "Acme Inc.", "ACME" and acme.com all become
+"acme") and name tokens (from the name fields and the email local part,
+plus joined forms such as "jdoe" and "johndoe"). Every organization key is
+combined with every name token into a block; leads sharing a block are
+candidates and are ranked by name token overlap.
+
+The index lives in process memory. It is loaded at startup and kept up to
+date by a session after_flush hook and by the bulk importer; lookups only
+touch the few blocks of the probe lead, so they stay well under a
+millisecond regardless of table size. Oversized blocks (a very common name
+at a large company) are skipped rather than scanned.
+"""
+
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+from pydantic import BaseModel
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.domains import company_domain
+from app.models.lead import Lead
+from app.services.loading import load_leads
+
+KEY_FIELDS = ("email", "first_name", "last_name", "company", "website")
+
+COMPANY_SUFFIXES = frozenset({
+    "inc", "incorporated", "llc", "llp", "ltd", "limited", "corp", "corporation",
+    "co", "company", "gmbh", "ag", "sa", "sas", "srl", "bv", "nv", "plc", "pty",
+    "oy", "ab", "as", "kg", "group", "holdings", "the",
+})
+
+SECOND_LEVEL_SUFFIXES = frozenset({"co", "com", "org", "net", "ac", "gov", "edu", "ltd"})
+
+# Shared mailboxes say nothing about the person behind them.
+ROLE_MAILBOXES = frozenset({
+    "info", "sales", "contact", "hello", "admin", "support", "office", "team",
+    "marketing", "hr", "jobs", "careers", "billing", "noreply", "mail",
+})
+
+# Weight of the organization match; the rest comes from name overlap.
+ORG_WEIGHT = 0.4
+
+LeadKeys = Tuple[FrozenSet[str], FrozenSet[str]]
+
+
+def normalize_company(name: Optional[str]) -> str:
+    words = re.findall(r"[a-z0-9]+", (name or "").lower().replace("&", " and "))
+    while words and words[-1] in COMPANY_SUFFIXES:
+        words.pop()
+    while words and words[0] == "the":
+        words.pop(0)
+    return "".join(words)
+
+
+def _domain_label(domain: str) -> str:
+    labels = domain.split(".")
+    if len(labels) >= 3 and labels[-2] in SECOND_LEVEL_SUFFIXES:
+        return labels[-3]
+    return labels[-2] if len(labels) >= 2 else ""
+
+
+def _words(value: Optional[str]) -> List[str]:
+    return re.findall(r"[a-z]+", (value or "").lower())
+
+
+def lead_keys(
+    email: Optional[str],
+    first_name: Optional[str] = None,
+    last_name: Optional[str] = None,
+    company: Optional[str] = None,
+    website: Optional[str] = None
+) -> LeadKeys:
+    """Return the (organization keys, name tokens) of a lead."""
+    orgs = {normalize_company(company)}
+    domain = company_domain(website or "", email or "")
+    if domain:
+        orgs.add(_domain_label(domain))
+    orgs.discard("")
+
+    tokens = set()
+    first, last = _words(first_name), _words(last_name)
+    tokens.update(first + last)
+    if first and last:
+        tokens.add(first[0][0] + last[-1])
+        tokens.add(first[0] + last[-1])
+
+    local = (email or "").split("@", 1)[0].lower()
+    if local not in ROLE_MAILBOXES:
+        parts = _words(local)
+        tokens.update(parts)
+        if len(parts) > 1:
+            tokens.add("".join(parts))
+
+    return frozenset(orgs), frozenset(token for token in tokens if len(token) > 1)
+
+
+def _blocks(keys: LeadKeys) -> Set[str]:
+    orgs, tokens = keys
+    return {f"{org}|{token}" for org in orgs for token in tokens}
+
+
+def similarity(a: LeadKeys, b: LeadKeys) -> float:
+    """Organization match plus overlap coefficient of the name tokens."""
+    org = 1.0 if a[0] & b[0] else 0.0
+    if not a[1] or not b[1]:
+        return round(ORG_WEIGHT * org, 4)
+    overlap = len(a[1] & b[1]) / min(len(a[1]), len(b[1]))
+    return round(ORG_WEIGHT * org + (1 - ORG_WEIGHT) * overlap, 4)
+
+
+class DuplicateIndex:
+    """Block key -> lead ids, maintained incrementally."""
+
+    def __init__(self, max_block_size: Optional[int] = None):
+        self.max_block_size = max_block_size or settings.duplicate_max_block_size
+        self._blocks: Dict[str, Set[str]] = defaultdict(set)
+        self._keys: Dict[str, LeadKeys] = {}
+        self._lock = threading.Lock()
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, lead_id: str, **fields) -> None:
+        """Index or re-index a lead from its KEY_FIELDS values."""
+        keys = lead_keys(**{field: fields.get(field) for field in KEY_FIELDS})
+        with self._lock:
+            self._discard(lead_id)
+            self._keys[lead_id] = keys
+            for block in _blocks(keys):
+                self._blocks[block].add(lead_id)
+
+    def remove(self, lead_id: str) -> None:
+        with self._lock:
+            self._discard(lead_id)
+
+    def _discard(self, lead_id: str) -> None:
+        keys = self._keys.pop(lead_id, None)
+        if keys is None:
+            return
+        for block in _blocks(keys):
+            members = self._blocks.get(block)
+            if members is not None:
+                members.discard(lead_id)
+                if not members:
+                    del self._blocks[block]
+
+    def candidates(
+        self,
+        exclude_id: Optional[str] = None,
+        threshold: Optional[float] = None,
+        limit: int = 10,
+        **fields
+    ) -> List[Tuple[str, float]]:
+        """Return (lead id, similarity) pairs at or above the threshold, best first."""
+        threshold = settings.duplicate_threshold if threshold is None else threshold
+        keys = lead_keys(**{field: fields.get(field) for field in KEY_FIELDS})
+
+        with self._lock:
+            seen = set()
+            for block in _blocks(keys):
+                members = self._blocks.get(block)
+                if members and len(members) <= self.max_block_size:
+                    seen.update(members)
+            seen.discard(exclude_id)
+            scored = [(lead_id, similarity(keys, self._keys[lead_id])) for lead_id in seen]
+
+        matches = sorted((m for m in scored if m[1] >= threshold), key=lambda m: (-m[1], m[0]))
+        return matches[:limit]
+
+    async def load(self, db: AsyncSession) -> int:
+        """Rebuild the index from the leads table; returns the lead count."""
+        with self._lock:
+            self._blocks.clear()
+            self._keys.clear()
+
+        columns = [getattr(Lead, field) for field in KEY_FIELDS]
+        result = await db.stream(
+            select(Lead.id, *columns).execution_options(yield_per=settings.export_batch_size)
+        )
+        async for row in result.mappings():
+            self.add(row["id"], **row)
+
+        self.loaded = True
+        return len(self)
+
+    def stats(self) -> dict:
+        with self._lock:
+            sizes = [len(members) for members in self._blocks.values()]
+        return {
+            "loaded": self.loaded,
+            "leads": len(self._keys),
+            "blocks": len(sizes),
+            "largest_block": max(sizes, default=0),
+            "oversized_blocks": sum(1 for size in sizes if size > self.max_block_size),
+        }
+
+
+duplicate_index = DuplicateIndex()
+
+
+class DuplicateCandidate(BaseModel):
+    lead_id: str
+    similarity: float
+    email: str
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    company: Optional[str] = None
+
+
+async def find_duplicates(
+    db: AsyncSession,
+    exclude_id: Optional[str] = None,
+    limit: int = 10,
+    **fields
+) -> List[DuplicateCandidate]:
+    """Look up likely duplicates of a lead and load them.
+
+    Index entries whose lead no longer exists (e.g. written by a rolled
+    back transaction) are dropped on the way.
+    """
+    matches = duplicate_index.candidates(exclude_id=exclude_id, limit=limit, **fields)
+    if not matches:
+        return []
+
+    leads, missing = await load_leads(db, [lead_id for lead_id, _ in matches])
+    for lead_id in missing:
+        duplicate_index.remove(lead_id)
+
+    similarities = dict(matches)
+    return [
+        DuplicateCandidate(
+            lead_id=lead.id,
+            similarity=similarities[lead.id],
+            email=lead.email,
+            first_name=lead.first_name,
+            last_name=lead.last_name,
+            company=lead.company
+        )
+        for lead in leads
+    ]
+
+
+@event.listens_for(Session, "after_flush")
+def _track_duplicate_keys(session: Session, flush_context) -> None:
+    if not duplicate_index.loaded:
+        return
+
+    for obj in session.new:
+        if isinstance(obj, Lead):
+            duplicate_index.add(obj.id, **{field: getattr(obj, field) for field in KEY_FIELDS})
+
+    for obj in session.deleted:
+        if isinstance(obj, Lead):
+            duplicate_index.remove(obj.id)
+
+    for obj in session.dirty:
+        if not isinstance(obj, Lead) or obj in session.deleted:
+            continue
+        state = inspect(obj)
+        if any(state.attrs[field].history.has_changes() for field in KEY_FIELDS):
+            duplicate_index.add(obj.id, **{field: getattr(obj, field) for field in KEY_FIELDS})
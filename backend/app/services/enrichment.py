@@ -0,0 +1,86 @@
+"""Lead enrichment service."""
+
+import asyncio
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from app.agents.enrichment_agent import EnrichmentAgent
+from app.agents.registry import agent_registry
+from app.core.concurrency import gather_bounded
+from app.core.config import settings
+from app.core.domains import company_domain
+from app.models.enrichment import EnrichmentData
+from app.models.lead import Lead, BatchItemError
+from app.services.companies import company_cache
+
+
+def enrichment_inputs(lead: Lead) -> dict:
+    """Build the EnrichmentAgent.enrich arguments for a lead."""
+    return {
+        "email": lead.email,
+        "first_name": lead.first_name or "",
+        "last_name": lead.last_name or "",
+        "company": lead.company or "",
+        "job_title": lead.job_title or "",
+        "website": lead.website or "",
+        "linkedin_url": lead.linkedin_url or ""
+    }
+
+
+def apply_enrichment(lead: Lead, enrichment: EnrichmentData) -> None:
+    """Copy an enrichment result onto a lead."""
+    lead.enrichment_data = enrichment.model_dump()
+    lead.enriched_at = datetime.utcnow()
+
+
+async def enrich_lead(lead: Lead, enricher: Optional[EnrichmentAgent] = None) -> EnrichmentData:
+    """Enrich a lead, reusing company data shared by its domain.
+
+    Only the contact part needs a per-lead inference; leads without a
+    company domain (e.g. free mail and no website) get a full enrichment.
+    """
+    enricher = enricher or agent_registry.enricher
+    domain = company_domain(lead.website or "", lead.email)
+    if not domain:
+        return await enricher.enrich(**enrichment_inputs(lead))
+
+    company_data, contact_data = await asyncio.gather(
+        company_cache.get(domain, enricher, company=lead.company or "", website=lead.website or ""),
+        enricher.enrich_contact(
+            email=lead.email,
+            first_name=lead.first_name or "",
+            last_name=lead.last_name or "",
+            company=lead.company or "",
+            job_title=lead.job_title or "",
+            linkedin_url=lead.linkedin_url or ""
+        )
+    )
+    return EnrichmentData(company=company_data, contact=contact_data, source="ai_enrichment")
+
+
+async def enrich_leads(
+    leads: List[Lead],
+    enricher: Optional[EnrichmentAgent] = None
+) -> Tuple[List[Lead], List[BatchItemError]]:
+    """Enrich leads concurrently and apply the results.
+
+    Changes are applied to the lead objects only; committing is left to the
+    caller so a whole batch is persisted at once.
+    """
+    enricher = enricher or agent_registry.enricher
+    results = await gather_bounded(
+        lambda lead: enrich_lead(lead, enricher),
+        leads,
+        settings.batch_concurrency
+    )
+
+    enriched = []
+    errors = []
+    for lead, result in zip(leads, results):
+        if isinstance(result, Exception):
+            errors.append(BatchItemError(lead_id=lead.id, error=str(result) or type(result).__name__))
+            continue
+        apply_enrichment(lead, result)
+        enriched.append(lead)
+
+    return enriched, errors
@@ -0,0 +1,245 @@
+"""Behaviour event ingestion and per-lead activity aggregates.
+
+Events are appended to the lead_events log in one multi-row insert per
+batch, and the lead_activity row of every lead in the batch is updated in
+the same transaction: counts per event type, first/last event and an
+exponentially decayed activity score (each event adds its type's weight,
+halving every ACTIVITY_HALF_LIFE_HOURS). The agents read these aggregates
+instead of replaying raw event lists.
+"""
+
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import insert, select, desc
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.models.event import EventIn, EventIngestResult, EventType, LeadActivity, LeadActivityResponse, LeadEvent
+from app.models.lead import Lead
+
+logger = logging.getLogger(__name__)
+
+# Contribution of one event to the activity score, roughly by buying intent.
+EVENT_WEIGHTS = {
+    EventType.PAGE_VIEW: 1.0,
+    EventType.EMAIL_OPEN: 0.5,
+    EventType.EMAIL_CLICK: 1.5,
+    EventType.CONTENT_DOWNLOAD: 2.0,
+    EventType.PRICING_VISIT: 3.0,
+    EventType.FORM_SUBMIT: 4.0,
+    EventType.DEMO_REQUEST: 6.0,
+    EventType.MEETING_BOOKED: 8.0,
+}
+
+LOOKUP_CHUNK = 500
+
+
+def _chunks(items: list, size: int = LOOKUP_CHUNK) -> Iterable[list]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    # Timestamps are stored as naive UTC like the rest of the schema.
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def decay(seconds: float) -> float:
+    """Decay factor after `seconds` with the configured half-life."""
+    return 0.5 ** (max(0.0, seconds) / (settings.activity_half_life_hours * 3600))
+
+
+def current_score(activity: LeadActivity, now: Optional[datetime] = None) -> float:
+    """Activity score decayed to `now`."""
+    if not activity.activity_at:
+        return 0.0
+    now = now or datetime.utcnow()
+    return activity.activity_score * decay((now - activity.activity_at).total_seconds())
+
+
+def apply_events(activity: LeadActivity, rows: List[dict]) -> None:
+    """Fold new event rows into a lead's aggregates."""
+    counts = dict(activity.counts or {})
+    score = activity.activity_score or 0.0
+    score_at = activity.activity_at
+
+    for row in sorted(rows, key=lambda row: row["occurred_at"]):
+        occurred_at, event_type = row["occurred_at"], row["event_type"]
+        counts[event_type.value] = counts.get(event_type.value, 0) + 1
+        weight = EVENT_WEIGHTS.get(event_type, 1.0)
+        if score_at is None or occurred_at >= score_at:
+            score = score * decay((occurred_at - score_at).total_seconds()) if score_at else 0.0
+            score += weight
+            score_at = occurred_at
+        else:
+            # Late event: add its weight as already decayed to score_at.
+            score += weight * decay((score_at - occurred_at).total_seconds())
+
+        if activity.first_event_at is None or occurred_at < activity.first_event_at:
+            activity.first_event_at = occurred_at
+        if activity.last_event_at is None or occurred_at >= activity.last_event_at:
+            activity.last_event_at = occurred_at
+            activity.last_event_type = event_type.value
+
+    activity.counts = counts
+    activity.total_events = (activity.total_events or 0) + len(rows)
+    activity.activity_score = score
+    activity.activity_at = score_at
+
+
+def activity_summary(activity: Optional[LeadActivity], now: Optional[datetime] = None) -> dict:
+    """Prompt-ready view of a lead's aggregates ({} without events).
+
+    Recency is given in whole days and the score rounded, so the prompt
+    (and its LLM cache key) only changes when the activity does.
+    """
+    if activity is None or not activity.total_events:
+        return {}
+    now = now or datetime.utcnow()
+    counts = sorted((activity.counts or {}).items(), key=lambda item: -item[1])
+    return {
+        "events": activity.total_events,
+        "by_type": dict(counts),
+        "last_event": activity.last_event_type,
+        "days_since_last_event": max(0, (now - activity.last_event_at).days) if activity.last_event_at else None,
+        "days_since_first_event": max(0, (now - activity.first_event_at).days) if activity.first_event_at else None,
+        "activity_score": round(current_score(activity, now), 1),
+    }
+
+
+class EventIngestor:
+    """Appends event batches and keeps lead_activity up to date."""
+
+    def __init__(self):
+        # Serializes the read-modify-write of activity rows; SQLite runs one
+        # writer at a time anyway.
+        self._lock = asyncio.Lock()
+        self.batches = 0
+        self.accepted = 0
+        self.rejected = 0
+        self._seconds = 0.0
+
+    async def ingest(self, db: AsyncSession, events: List[EventIn]) -> EventIngestResult:
+        start = time.perf_counter()
+        now = datetime.utcnow()
+
+        lead_ids = list({event.lead_id for event in events})
+        known = set()
+        for chunk in _chunks(lead_ids):
+            result = await db.execute(select(Lead.id).where(Lead.id.in_(chunk)))
+            known.update(result.scalars())
+
+        rows = [
+            {
+                "lead_id": event.lead_id,
+                "event_type": event.type,
+                "occurred_at": _utc(event.occurred_at) or now,
+                "properties": event.properties or None,
+            }
+            for event in events
+            if event.lead_id in known
+        ]
+
+        if rows:
+            async with self._lock:
+                await db.execute(insert(LeadEvent), rows)
+                await self._update_activity(db, rows)
+                await db.commit()
+
+        self.batches += 1
+        self.accepted += len(rows)
+        self.rejected += len(events) - len(rows)
+        self._seconds += time.perf_counter() - start
+        return EventIngestResult(
+            accepted=len(rows),
+            rejected=len(events) - len(rows),
+            unknown_leads=sorted(set(lead_ids) - known)
+        )
+
+    async def _update_activity(self, db: AsyncSession, rows: List[dict]) -> None:
+        by_lead: Dict[str, List[dict]] = defaultdict(list)
+        for row in rows:
+            by_lead[row["lead_id"]].append(row)
+
+        existing = {}
+        for chunk in _chunks(list(by_lead)):
+            result = await db.execute(select(LeadActivity).where(LeadActivity.lead_id.in_(chunk)))
+            existing.update({activity.lead_id: activity for activity in result.scalars()})
+
+        for lead_id, lead_rows in by_lead.items():
+            activity = existing.get(lead_id)
+            if activity is None:
+                activity = LeadActivity(lead_id=lead_id, counts={}, total_events=0, activity_score=0.0)
+                db.add(activity)
+            apply_events(activity, lead_rows)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "events_per_second": round(self.accepted / self._seconds, 1) if self._seconds else None,
+            "avg_batch_ms": round(self._seconds / self.batches * 1000, 2) if self.batches else None,
+        }
+
+
+event_ingestor = EventIngestor()
+
+
+async def get_activity(db: AsyncSession, lead_id: str) -> LeadActivityResponse:
+    activity = await db.get(LeadActivity, lead_id)
+    if activity is None:
+        return LeadActivityResponse(lead_id=lead_id)
+    return LeadActivityResponse(
+        lead_id=lead_id,
+        counts=activity.counts or {},
+        total_events=activity.total_events,
+        first_event_at=activity.first_event_at,
+        last_event_at=activity.last_event_at,
+        last_event_type=activity.last_event_type,
+        activity_score=round(current_score(activity), 3)
+    )
+
+
+async def recent_events(db: AsyncSession, lead_id: str, limit: int = 50) -> List[dict]:
+    result = await db.execute(
+        select(LeadEvent.event_type, LeadEvent.occurred_at, LeadEvent.properties)
+        .where(LeadEvent.lead_id == lead_id)
+        .order_by(desc(LeadEvent.occurred_at))
+        .limit(limit)
+    )
+    return [
+        {"type": event_type.value, "occurred_at": occurred_at, **({"properties": properties} if properties else {})}
+        for event_type, occurred_at, properties in result.all()
+    ]
+
+
+async def load_activity_summaries(lead_ids: List[str]) -> Dict[str, dict]:
+    """Activity summaries for the leads that have events.
+
+    Uses its own session so agent callers need none; lookup failures are
+    logged and treated as no activity.
+    """
+    summaries = {}
+    if not lead_ids:
+        return summaries
+    try:
+        now = datetime.utcnow()
+        async with async_session_maker() as db:
+            for chunk in _chunks(list(lead_ids)):
+                result = await db.execute(select(LeadActivity).where(LeadActivity.lead_id.in_(chunk)))
+                for activity in result.scalars():
+                    summary = activity_summary(activity, now)
+                    if summary:
+                        summaries[activity.lead_id] = summary
+    except Exception:
+        logger.exception("Loading lead activity failed")
+    return summaries
@@ -0,0 +1,86 @@
+"""Streaming lead export.
+
+Walks the leads table with a server-side cursor and encodes rows into
+NDJSON or CSV as they arrive, so memory stays flat regardless of table
+size.
+"""
+
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
+from typing import AsyncIterator, Optional
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.models.lead import Lead, LeadStatus, LeadSource
+from app.services.loading import filter_leads
+
+EXPORT_COLUMNS = list(Lead.__table__.columns)
+EXPORT_FIELDS = [column.name for column in EXPORT_COLUMNS]
+JSON_FIELDS = {column.name for column in EXPORT_COLUMNS if column.type.__class__.__name__ == "JSON"}
+
+
+def _plain(value):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _ndjson_lines(rows) -> str:
+    return "".join(
+        json.dumps({name: _plain(value) for name, value in zip(EXPORT_FIELDS, row)}, default=str) + "\n"
+        for row in rows
+    )
+
+
+def _csv_lines(rows, header: bool = False) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        writer.writerow([
+            json.dumps(value, default=str) if name in JSON_FIELDS and value is not None else _plain(value)
+            for name, value in zip(EXPORT_FIELDS, row)
+        ])
+    return buffer.getvalue()
+
+
+async def stream_leads(
+    format: str = "ndjson",
+    status: Optional[LeadStatus] = None,
+    source: Optional[LeadSource] = None,
+    tier: Optional[str] = None,
+    min_score: Optional[float] = None,
+    updated_since: Optional[datetime] = None
+) -> AsyncIterator[bytes]:
+    """Yield encoded export chunks, one per fetched partition.
+
+    Rows are ordered by (updated_at, id) and `updated_since` is inclusive.
+    updated_at is set when a change is flushed, not when it commits, so a
+    row can become visible with an updated_at older than the newest one an
+    earlier pull saw. Incremental clients should pass their last watermark
+    minus a lookback (longer than the slowest write transaction) and drop
+    rows they already have by id.
+    """
+    query = filter_leads(select(*EXPORT_COLUMNS), status, source, tier, min_score)
+    if updated_since is not None:
+        query = query.where(Lead.updated_at >= updated_since)
+    query = query.order_by(Lead.updated_at, Lead.id).execution_options(
+        yield_per=settings.export_batch_size
+    )
+
+    # The request's session is closed before a streaming body is sent, so
+    # the export holds its own session for as long as it streams.
+    async with async_session_maker() as db:
+        result = await db.stream(query)
+        if format == "csv":
+            yield _csv_lines([], header=True).encode()
+        async for rows in result.partitions():
+            yield (_csv_lines(rows) if format == "csv" else _ndjson_lines(rows)).encode()
@@ -0,0 +1,60 @@
+"""Sparse fieldsets for lead list responses.
+
+`fields=id,email,score` selects only those columns in SQL and returns plain
+row mappings serialized with orjson, skipping ORM hydration and response
+model validation. Missing values get the same defaults as LeadResponse.
+"""
+
+from typing import List, Sequence
+
+import orjson
+from sqlalchemy import Select, select
+from sqlalchemy.engine import RowMapping
+
+from app.models.lead import Lead, LeadResponse
+
+LEAD_FIELDS = tuple(LeadResponse.model_fields)
+
+# Needed to build the next-page cursor even when not requested.
+KEYSET_FIELDS = ("score", "id")
+
+
+def parse_fields(value: str) -> List[str]:
+    """Parse a comma-separated fieldset; raises ValueError on unknown names."""
+    fields = list(dict.fromkeys(name.strip() for name in value.split(",") if name.strip()))
+    unknown = [name for name in fields if name not in LEAD_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    if not fields:
+        raise ValueError("No fields requested")
+    if "id" not in fields:
+        fields.insert(0, "id")
+    return fields
+
+
+def select_fields(fields: Sequence[str]) -> Select:
+    """Select the requested lead columns plus the keyset columns."""
+    names = list(dict.fromkeys([*fields, *KEYSET_FIELDS]))
+    return select(*[getattr(Lead, name) for name in names])
+
+
+def _defaults(fields: Sequence[str]) -> dict:
+    defaults = {}
+    for name in fields:
+        field = LeadResponse.model_fields[name]
+        if not field.is_required() and field.default is not None:
+            defaults[name] = field.default
+    return defaults
+
+
+def render_rows(rows: Sequence[RowMapping], fields: Sequence[str]) -> bytes:
+    """Serialize projected rows to a JSON array."""
+    defaults = _defaults(fields)
+    items = []
+    for row in rows:
+        item = {}
+        for name in fields:
+            value = row[name]
+            item[name] = defaults.get(name) if value is None and name in defaults else value
+        items.append(item)
+    return orjson.dumps(items)
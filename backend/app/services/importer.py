@@ -0,0 +1,272 @@
+"""Streaming bulk lead import.
+
+Reads CSV or NDJSON from an async byte stream line by line, validates rows
+against LeadCreate in chunks and inserts each chunk with one executemany.
+Duplicate emails are dropped within the file and against the database
+with one set-based query per chunk. Rows that are fuzzy duplicates of
+existing leads (see app.services.duplicates) are reported, and skipped on
+request.
+"""
+
+import asyncio
+import codecs
+import csv
+import json
+import uuid
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.lead import Lead, LeadCreate, LeadStatus
+from app.services.duplicates import KEY_FIELDS, duplicate_index
+from app.services.stats import new_deltas, add_contribution, row_contribution, apply_deltas
+
+MAX_ERROR_SAMPLES = 20
+LIST_FIELDS = {"tags"}
+
+
+class ImportRowError(BaseModel):
+    row: int
+    error: str
+
+
+class ImportPossibleDuplicate(BaseModel):
+    row: int
+    email: str
+    candidates: List[str]
+
+
+class ImportResult(BaseModel):
+    inserted: int = 0
+    skipped_duplicate: int = 0
+    invalid: int = 0
+    possible_duplicates: int = 0
+    skipped_possible_duplicate: int = 0
+    errors: List[ImportRowError] = []
+    duplicates: List[ImportPossibleDuplicate] = []
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode a byte stream into lines without buffering the whole body."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+async def iter_ndjson(lines: AsyncIterator[str]) -> AsyncIterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """Yield (row number, record, error) for each NDJSON line."""
+    row = 0
+    async for line in lines:
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield row, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield row, None, "Expected a JSON object"
+            continue
+        yield row, record, None
+
+
+async def iter_csv(lines: AsyncIterator[str]) -> AsyncIterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """Yield (row number, record, error) for each CSV record after the header."""
+    header = None
+    buffered = ""
+    row = 0
+    async for line in lines:
+        # A quoted field may contain newlines; keep reading until quotes balance.
+        buffered = f"{buffered}\n{line}" if buffered else line
+        if buffered.count('"') % 2:
+            continue
+        text, buffered = buffered, ""
+        if not text.strip():
+            continue
+
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip().lower() for name in values]
+            continue
+
+        row += 1
+        if len(values) > len(header):
+            yield row, None, "Too many columns"
+            continue
+        record = {}
+        for name, value in zip(header, values):
+            value = value.strip()
+            if not value:
+                continue
+            if name in LIST_FIELDS:
+                value = [item.strip() for item in value.replace(",", ";").split(";") if item.strip()]
+            record[name] = value
+        yield row, record, None
+
+    if buffered:
+        row += 1
+        yield row, None, "Unterminated quoted field"
+
+
+def _lead_row(lead_data: LeadCreate) -> dict:
+    return {
+        # Generated here so the id is known for the duplicate index.
+        "id": str(uuid.uuid4()),
+        "email": lead_data.email,
+        "first_name": lead_data.first_name,
+        "last_name": lead_data.last_name,
+        "company": lead_data.company,
+        "job_title": lead_data.job_title,
+        "phone": lead_data.phone,
+        "website": lead_data.website,
+        "linkedin_url": lead_data.linkedin_url,
+        "source": lead_data.source,
+        "status": LeadStatus.NEW,
+        "tags": lead_data.tags,
+        "notes": lead_data.notes
+    }
+
+
+# Dialects whose INSERT can skip conflicting emails.
+CONFLICT_DIALECTS = ("sqlite", "postgresql")
+
+
+def _insert_statement(dialect_name: str):
+    """INSERT that ignores emails inserted concurrently by someone else.
+
+    Where conflicts are ignored, the statement returns the ids of the rows
+    it actually inserted.
+    """
+    if dialect_name not in CONFLICT_DIALECTS:
+        return insert(Lead)
+    if dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    return dialect_insert(Lead).on_conflict_do_nothing(index_elements=["email"]).returning(Lead.id)
+
+
+class LeadImporter:
+    """Validates, deduplicates and inserts lead records chunk by chunk."""
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        chunk_size: Optional[int] = None,
+        skip_possible_duplicates: bool = False
+    ):
+        self.db = db
+        self.chunk_size = chunk_size or settings.import_chunk_size
+        self.skip_possible_duplicates = skip_possible_duplicates
+        self.result = ImportResult()
+        self._seen_emails = set()
+
+    def _invalid(self, row: int, error: str) -> None:
+        self.result.invalid += 1
+        if len(self.result.errors) < MAX_ERROR_SAMPLES:
+            self.result.errors.append(ImportRowError(row=row, error=error))
+
+    async def run(self, records: AsyncIterator[Tuple[int, Optional[dict], Optional[str]]]) -> ImportResult:
+        chunk: List[Tuple[int, dict]] = []
+        async for row, record, error in records:
+            if error:
+                self._invalid(row, error)
+                continue
+            chunk.append((row, record))
+            if len(chunk) >= self.chunk_size:
+                await self._flush(chunk)
+                chunk = []
+        if chunk:
+            await self._flush(chunk)
+        return self.result
+
+    def _possible_duplicate(self, row: int, lead_row: dict) -> bool:
+        """Record fuzzy matches of a row; True when the row should be skipped."""
+        fields = {field: lead_row[field] for field in KEY_FIELDS}
+        matches = duplicate_index.candidates(**fields)
+        if matches:
+            self.result.possible_duplicates += 1
+            if len(self.result.duplicates) < MAX_ERROR_SAMPLES:
+                self.result.duplicates.append(ImportPossibleDuplicate(
+                    row=row, email=lead_row["email"], candidates=[lead_id for lead_id, _ in matches]
+                ))
+            if self.skip_possible_duplicates:
+                self.result.skipped_possible_duplicate += 1
+                return True
+
+        # Index right away so later rows of the same file are matched too.
+        if duplicate_index.loaded:
+            duplicate_index.add(lead_row["id"], **fields)
+        return False
+
+    def _validate(self, chunk: List[Tuple[int, dict]]) -> Dict[str, Tuple[int, LeadCreate]]:
+        candidates: Dict[str, Tuple[int, LeadCreate]] = {}
+        for row, record in chunk:
+            try:
+                lead_data = LeadCreate.model_validate(record)
+            except ValidationError as e:
+                first = e.errors()[0]
+                field = ".".join(str(part) for part in first["loc"])
+                self._invalid(row, f"{field}: {first['msg']}")
+                continue
+            if lead_data.email in self._seen_emails:
+                self.result.skipped_duplicate += 1
+                continue
+            self._seen_emails.add(lead_data.email)
+            candidates[lead_data.email] = (row, lead_data)
+        return candidates
+
+    async def _flush(self, chunk: List[Tuple[int, dict]]) -> None:
+        # Email validation is CPU heavy; keep it off the event loop.
+        candidates = await asyncio.to_thread(self._validate, chunk)
+
+        if not candidates:
+            return
+
+        existing = await self.db.execute(select(Lead.email).where(Lead.email.in_(list(candidates))))
+        for email in existing.scalars().all():
+            del candidates[email]
+            self.result.skipped_duplicate += 1
+
+        if not candidates:
+            return
+
+        rows = []
+        for row, lead_data in candidates.values():
+            lead_row = _lead_row(lead_data)
+            if not self._possible_duplicate(row, lead_row):
+                rows.append(lead_row)
+
+        if not rows:
+            return
+
+        dialect_name = self.db.bind.dialect.name
+        inserted = await self.db.execute(_insert_statement(dialect_name), rows)
+        if dialect_name in CONFLICT_DIALECTS:
+            inserted_ids = set(inserted.scalars().all())
+            for row in rows:
+                if row["id"] not in inserted_ids:
+                    # Inserted concurrently by someone else since the lookup.
+                    duplicate_index.remove(row["id"])
+                    self.result.skipped_duplicate += 1
+            rows = [row for row in rows if row["id"] in inserted_ids]
+
+        # Core inserts bypass the ORM flush hook that maintains lead_stats.
+        deltas = new_deltas()
+        for row in rows:
+            add_contribution(deltas, row_contribution(row), 1)
+        await self.db.run_sync(lambda session: apply_deltas(session.connection(), deltas))
+
+        await self.db.commit()
+        self.result.inserted += len(rows)
@@ -0,0 +1,40 @@
+"""Intent analysis service."""
+
+from typing import Optional
+
+from app.agents.intent_analyzer import IntentAnalysisResult
+from app.agents.registry import agent_registry
+from app.models.lead import Lead
+from app.services.events import load_activity_summaries
+
+
+def intent_lead_info(lead: Lead) -> dict:
+    """Build the lead_info argument for IntentAnalyzerAgent.analyze."""
+    return {
+        "email": lead.email,
+        "company": lead.company,
+        "job_title": lead.job_title,
+        "source": lead.source.value if lead.source else None,
+        "status": lead.status.value if lead.status else None
+    }
+
+
+def apply_intent(lead: Lead, intent_result: IntentAnalysisResult) -> None:
+    """Copy an intent analysis result onto a lead."""
+    lead.intent_signals = [s.model_dump() for s in intent_result.signals]
+    lead.intent_score = intent_result.overall_intent_score
+
+
+async def analyze_intent(
+    lead: Lead,
+    behavior_data: Optional[list] = None,
+    engagement_history: Optional[list] = None
+) -> IntentAnalysisResult:
+    """Analyze a lead's intent from its stored activity plus any raw events."""
+    activities = await load_activity_summaries([lead.id])
+    return await agent_registry.intent_analyzer.analyze(
+        lead_info=intent_lead_info(lead),
+        behavior_data=behavior_data or [],
+        engagement_history=engagement_history or [],
+        activity=activities.get(lead.id)
+    )
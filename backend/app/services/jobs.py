@@ -0,0 +1,249 @@
+"""Persistent background job queue.
+
+Jobs and their per-lead items are stored in the application database, so
+they survive restarts. An in-process pool of worker tasks claims pending
+items one at a time, runs the matching agent and commits the lead update
+together with the item result, so finished items are never redone.
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.models.job import Job, JobItem, JobKind, JobStatus, JobResponse, JobItemResponse
+from app.models.lead import Lead
+from app.services import scoring
+from app.services.enrichment import enrich_lead, apply_enrichment
+from app.services.intent import analyze_intent, apply_intent
+from app.services.pipeline import run_pipeline
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = (JobStatus.PENDING, JobStatus.RUNNING)
+
+
+async def submit_job(
+    db: AsyncSession,
+    kind: JobKind,
+    lead_ids: List[str],
+    params: Optional[dict] = None
+) -> Job:
+    """Persist a job with one item per lead and wake the workers."""
+    unique_ids = list(dict.fromkeys(lead_ids))
+    job = Job(kind=kind, params=params or {}, total=len(unique_ids))
+    if not unique_ids:
+        job.status = JobStatus.COMPLETED
+        job.finished_at = datetime.utcnow()
+    db.add(job)
+    await db.flush()
+
+    db.add_all([JobItem(job_id=job.id, lead_id=lead_id) for lead_id in unique_ids])
+    await db.commit()
+    await db.refresh(job)
+
+    worker_pool.notify()
+    return job
+
+
+async def job_response(db: AsyncSession, job: Job, include_items: bool = False) -> JobResponse:
+    """Build the API representation of a job."""
+    response = JobResponse.model_validate(job)
+    if job.status == JobStatus.CANCELLED:
+        # Only cancellation leaves items that will never run.
+        result = await db.execute(
+            select(func.count(JobItem.id)).where(JobItem.job_id == job.id, JobItem.status == JobStatus.CANCELLED)
+        )
+        response.cancelled = result.scalar_one()
+    response.pending = max(0, job.total - job.completed - job.failed - response.cancelled)
+    if include_items:
+        result = await db.execute(
+            select(JobItem).where(JobItem.job_id == job.id).order_by(JobItem.id)
+        )
+        response.items = [JobItemResponse.model_validate(item) for item in result.scalars().all()]
+    return response
+
+
+async def cancel_job(db: AsyncSession, job: Job) -> Job:
+    """Cancel a job; items already running are allowed to finish."""
+    if job.status in ACTIVE_STATUSES:
+        await db.execute(
+            update(JobItem)
+            .where(JobItem.job_id == job.id, JobItem.status == JobStatus.PENDING)
+            .values(status=JobStatus.CANCELLED)
+        )
+        job.status = JobStatus.CANCELLED
+        job.finished_at = datetime.utcnow()
+        await db.commit()
+        await db.refresh(job)
+    return job
+
+
+def _lead_events(params: dict, key: str, lead_id: str) -> list:
+    """Raw events for one lead from job params.
+
+    Multi-lead jobs map lead ids to lists; a plain list (single-lead
+    requests) applies to the job's lead.
+    """
+    events = params.get(key) or []
+    if isinstance(events, dict):
+        return events.get(lead_id) or []
+    return events
+
+
+async def _run_item(job: Job, lead: Lead) -> dict:
+    """Run the job's agent for one lead and return the item result."""
+    if job.kind == JobKind.SCORE:
+        params = job.params or {}
+        if params.get("only_changed") and lead.score_fingerprint == await scoring.lead_fingerprint(lead):
+            return {"score": lead.score, "tier": lead.score_tier, "skipped": "unchanged"}
+        await scoring.score_lead(lead)
+        return {"score": lead.score, "tier": lead.score_tier}
+
+    if job.kind == JobKind.ENRICH:
+        enrichment = await enrich_lead(lead)
+        apply_enrichment(lead, enrichment)
+        return {"enriched_at": lead.enriched_at.isoformat()}
+
+    if job.kind == JobKind.INTENT:
+        params = job.params or {}
+        intent_result = await analyze_intent(
+            lead,
+            behavior_data=_lead_events(params, "behavior_data", lead.id),
+            engagement_history=_lead_events(params, "engagement_history", lead.id)
+        )
+        apply_intent(lead, intent_result)
+        return {"intent_score": lead.intent_score, "buying_stage": intent_result.buying_stage}
+
+    if job.kind == JobKind.PIPELINE:
+        params = job.params or {}
+        timings = await run_pipeline(
+            lead,
+            behavior_data=_lead_events(params, "behavior_data", lead.id),
+            engagement_history=_lead_events(params, "engagement_history", lead.id)
+        )
+        return {"score": lead.score, "tier": lead.score_tier, "timings": timings}
+
+    raise ValueError(f"Unsupported job kind: {job.kind}")
+
+
+class JobWorkerPool:
+    """Pool of asyncio worker tasks draining the job queue."""
+
+    def __init__(self):
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self, workers: Optional[int] = None) -> None:
+        """Requeue items interrupted by a restart and start the workers."""
+        async with async_session_maker() as db:
+            await db.execute(
+                update(JobItem)
+                .where(JobItem.status == JobStatus.RUNNING)
+                .values(status=JobStatus.PENDING)
+            )
+            await db.commit()
+
+        self._wakeup = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._worker())
+            for _ in range(workers or settings.job_workers)
+        ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self) -> None:
+        """Wake idle workers after new work was submitted."""
+        self._wakeup.set()
+
+    async def _worker(self) -> None:
+        while True:
+            try:
+                item_id = await self._claim()
+                if item_id is None:
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), settings.job_poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                await self._process(item_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Job worker error")
+                await asyncio.sleep(settings.job_poll_interval)
+
+    async def _claim(self) -> Optional[int]:
+        """Atomically move the oldest pending item to running."""
+        async with async_session_maker() as db:
+            while True:
+                result = await db.execute(
+                    select(JobItem.id, JobItem.job_id)
+                    .join(Job, Job.id == JobItem.job_id)
+                    .where(JobItem.status == JobStatus.PENDING, Job.status.in_(ACTIVE_STATUSES))
+                    .order_by(JobItem.id)
+                    .limit(1)
+                )
+                row = result.first()
+                if row is None:
+                    return None
+
+                claimed = await db.execute(
+                    update(JobItem)
+                    .where(JobItem.id == row.id, JobItem.status == JobStatus.PENDING)
+                    .values(status=JobStatus.RUNNING)
+                )
+                if claimed.rowcount:
+                    await db.execute(
+                        update(Job)
+                        .where(Job.id == row.job_id, Job.status == JobStatus.PENDING)
+                        .values(status=JobStatus.RUNNING)
+                    )
+                    await db.commit()
+                    return row.id
+                # Another worker won the race; try the next item.
+                await db.rollback()
+
+    async def _process(self, item_id: int) -> None:
+        async with async_session_maker() as db:
+            item = await db.get(JobItem, item_id)
+            job = await db.get(Job, item.job_id)
+            lead = await db.get(Lead, item.lead_id)
+
+            try:
+                if lead is None:
+                    raise LookupError("Lead not found")
+                item.result = await _run_item(job, lead)
+                item.status = JobStatus.COMPLETED
+                counter = {"completed": Job.completed + 1}
+            except Exception as e:
+                # Discard partial lead changes but keep the item outcome.
+                await db.rollback()
+                item = await db.get(JobItem, item_id)
+                item.status = JobStatus.FAILED
+                item.error = str(e) or type(e).__name__
+                counter = {"failed": Job.failed + 1}
+
+            await db.execute(update(Job).where(Job.id == item.job_id).values(**counter))
+            job = await db.get(Job, item.job_id, populate_existing=True)
+            if job.status == JobStatus.RUNNING and job.completed + job.failed >= job.total:
+                job.status = JobStatus.COMPLETED if job.completed else JobStatus.FAILED
+                job.finished_at = datetime.utcnow()
+            await db.commit()
+
+
+worker_pool = JobWorkerPool()
@@ -0,0 +1,44 @@
+"""Lead loading helpers."""
+
+from typing import List, Optional, Tuple
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.lead import Lead, LeadStatus, LeadSource
+
+
+async def load_leads(db: AsyncSession, lead_ids: List[str]) -> Tuple[List[Lead], List[str]]:
+    """Load leads with a single IN query.
+
+    Returns the leads in request order (duplicates removed) and the ids that
+    were not found.
+    """
+    unique_ids = list(dict.fromkeys(lead_ids))
+    if not unique_ids:
+        return [], []
+
+    result = await db.execute(select(Lead).where(Lead.id.in_(unique_ids)))
+    by_id = {lead.id: lead for lead in result.scalars().all()}
+
+    leads = [by_id[lead_id] for lead_id in unique_ids if lead_id in by_id]
+    missing = [lead_id for lead_id in unique_ids if lead_id not in by_id]
+    return leads, missing
+
+
+def filter_leads(
+    query: Select,
+    status: Optional[LeadStatus] = None,
+    source: Optional[LeadSource] = None,
+    tier: Optional[str] = None,
+    min_score: Optional[float] = None
+) -> Select:
+    """Apply the standard lead list filters to a query."""
+    if status:
+        query = query.where(Lead.status == status)
+    if source:
+        query = query.where(Lead.source == source)
+    if tier:
+        query = query.where(Lead.score_tier == tier)
+    if min_score is not None:
+        query = query.where(Lead.score >= min_score)
+    return query
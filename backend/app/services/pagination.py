@@ -0,0 +1,39 @@
+"""Keyset (cursor) pagination for lead lists."""
+
+import base64
+import json
+from typing import Tuple
+
+from sqlalchemy import Select, and_, or_
+
+from app.models.lead import Lead
+
+
+def encode_cursor(score: float, lead_id: str) -> str:
+    """Encode the (score, id) position of the last row on a page."""
+    raw = json.dumps([score or 0.0, lead_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[float, str]:
+    """Decode a cursor; raises ValueError if it is malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        score, lead_id = json.loads(base64.urlsafe_b64decode(padded))
+        return float(score), str(lead_id)
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def order_by_keyset(query: Select) -> Select:
+    """Order leads by the stable (score, id) keyset, highest score first."""
+    return query.order_by(Lead.score.desc(), Lead.id.desc())
+
+
+def after_cursor(query: Select, cursor: str) -> Select:
+    """Restrict a keyset-ordered query to rows after the cursor."""
+    score, lead_id = decode_cursor(cursor)
+    return query.where(or_(
+        Lead.score < score,
+        and_(Lead.score == score, Lead.id < lead_id)
+    ))
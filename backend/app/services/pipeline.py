@@ -0,0 +1,151 @@
+"""Enrich, intent and score pipeline.
+
+A LangGraph graph runs EnrichmentAgent and IntentAnalyzerAgent concurrently
+(they do not depend on each other), then feeds both outputs into the
+scoring stage in memory. Nothing is written until the whole graph has
+succeeded, so callers persist a lead's enrichment, intent and score in a
+single commit.
+"""
+
+import time
+from typing import Annotated, Dict, List, Optional, Tuple, TypedDict
+
+from langgraph.graph import StateGraph, START, END
+
+from app.agents.intent_analyzer import IntentAnalysisResult
+from app.core.concurrency import gather_bounded
+from app.core.config import settings
+from app.models.enrichment import EnrichmentData
+from app.models.lead import Lead, BatchItemError
+from app.services import scoring
+from app.services.enrichment import enrich_lead, apply_enrichment
+from app.services.intent import analyze_intent, apply_intent
+
+STAGES = ("enrich", "intent", "score")
+UPSTREAM_FIELDS = ("enrichment_data", "enriched_at", "intent_signals", "intent_score")
+
+
+def _merge(left: Optional[dict], right: Optional[dict]) -> dict:
+    return {**(left or {}), **(right or {})}
+
+
+class PipelineState(TypedDict, total=False):
+    lead: Lead
+    behavior_data: list
+    engagement_history: list
+    enrichment: EnrichmentData
+    intent: IntentAnalysisResult
+    timings: Annotated[Dict[str, float], _merge]
+
+
+def _elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 2)
+
+
+async def _enrich(state: PipelineState) -> dict:
+    start = time.perf_counter()
+    enrichment = await enrich_lead(state["lead"])
+    return {"enrichment": enrichment, "timings": {"enrich": _elapsed_ms(start)}}
+
+
+async def _intent(state: PipelineState) -> dict:
+    start = time.perf_counter()
+    intent = await analyze_intent(
+        state["lead"],
+        behavior_data=state.get("behavior_data"),
+        engagement_history=state.get("engagement_history")
+    )
+    return {"intent": intent, "timings": {"intent": _elapsed_ms(start)}}
+
+
+async def _score(state: PipelineState) -> dict:
+    start = time.perf_counter()
+    lead = state["lead"]
+    previous = {attr: getattr(lead, attr) for attr in UPSTREAM_FIELDS}
+    apply_enrichment(lead, state["enrichment"])
+    apply_intent(lead, state["intent"])
+    try:
+        await scoring.score_lead(lead)
+    except Exception:
+        for attr, value in previous.items():
+            setattr(lead, attr, value)
+        raise
+    return {"timings": {"score": _elapsed_ms(start)}}
+
+
+def _build_graph():
+    graph = StateGraph(PipelineState)
+    graph.add_node("enrich", _enrich)
+    graph.add_node("intent", _intent)
+    graph.add_node("score", _score)
+    graph.add_edge(START, "enrich")
+    graph.add_edge(START, "intent")
+    graph.add_edge(["enrich", "intent"], "score")
+    graph.add_edge("score", END)
+    return graph.compile()
+
+
+pipeline_graph = _build_graph()
+
+
+async def run_pipeline(
+    lead: Lead,
+    behavior_data: Optional[list] = None,
+    engagement_history: Optional[list] = None
+) -> Dict[str, float]:
+    """Run all stages for one lead and apply the results to it.
+
+    Returns per-stage latencies in ms (plus "total"). The lead is only
+    modified once every stage succeeded; committing is left to the caller.
+    """
+    start = time.perf_counter()
+    state = await pipeline_graph.ainvoke({
+        "lead": lead,
+        "behavior_data": behavior_data or [],
+        "engagement_history": engagement_history or []
+    })
+    return {**state["timings"], "total": _elapsed_ms(start)}
+
+
+def summarize_timings(timings: List[Dict[str, float]]) -> Dict[str, dict]:
+    """Aggregate per-lead stage timings into avg/max per stage."""
+    summary = {}
+    for stage in STAGES + ("total",):
+        values = [t[stage] for t in timings if stage in t]
+        if values:
+            summary[stage] = {
+                "avg_ms": round(sum(values) / len(values), 2),
+                "max_ms": max(values)
+            }
+    return summary
+
+
+async def run_pipeline_batch(
+    leads: List[Lead],
+    behavior_data: Optional[Dict[str, list]] = None,
+    engagement_history: Optional[Dict[str, list]] = None
+) -> Tuple[List[Lead], List[BatchItemError], List[Dict[str, float]]]:
+    """Run the pipeline over many leads concurrently.
+
+    behavior_data and engagement_history map lead ids to that lead's raw
+    events. Returns the processed leads, per-lead errors and per-lead
+    timings.
+    """
+    behavior_data = behavior_data or {}
+    engagement_history = engagement_history or {}
+    results = await gather_bounded(
+        lambda lead: run_pipeline(lead, behavior_data.get(lead.id), engagement_history.get(lead.id)),
+        leads,
+        settings.batch_concurrency
+    )
+
+    processed = []
+    errors = []
+    timings = []
+    for lead, result in zip(leads, results):
+        if isinstance(result, Exception):
+            errors.append(BatchItemError(lead_id=lead.id, error=str(result) or type(result).__name__))
+            continue
+        processed.append(lead)
+        timings.append(result)
+    return processed, errors, timings
@@ -0,0 +1,75 @@
+"""Incremental re-scoring based on input fingerprints."""
+
+from typing import List, Optional
+
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.event import LeadActivity
+from app.models.job import JobKind, JobResponse
+from app.models.lead import Lead
+from app.services.jobs import submit_job, job_response
+from app.services.scoring import FINGERPRINT_FIELDS, activity_digest, input_fingerprint
+
+FINGERPRINT_COLUMNS = [getattr(Lead, field) for field in FINGERPRINT_FIELDS]
+
+
+class SweepResult(BaseModel):
+    scanned: int
+    stale: int
+    job: Optional[JobResponse] = None
+
+
+async def find_stale_leads(db: AsyncSession, force: bool = False, chunk_size: Optional[int] = None) -> tuple:
+    """Scan all leads by id in bounded chunks.
+
+    Returns (scanned count, ids whose current fingerprint differs from the
+    one recorded when they were last scored). With force, every lead is
+    returned. Only the fingerprint columns and the activity digest are read.
+    """
+    chunk_size = chunk_size or settings.rescore_chunk_size
+    scanned = 0
+    stale: List[str] = []
+    last_id = None
+
+    while True:
+        query = (
+            select(
+                Lead.id, Lead.score_fingerprint, *FINGERPRINT_COLUMNS,
+                LeadActivity.total_events, LeadActivity.last_event_type
+            )
+            .outerjoin(LeadActivity, LeadActivity.lead_id == Lead.id)
+            .order_by(Lead.id)
+            .limit(chunk_size)
+        )
+        if last_id is not None:
+            query = query.where(Lead.id > last_id)
+        rows = (await db.execute(query)).mappings().all()
+        if not rows:
+            break
+
+        for row in rows:
+            activity = activity_digest(row["total_events"], row["last_event_type"])
+            if force or row["score_fingerprint"] != input_fingerprint(row, activity):
+                stale.append(row["id"])
+        scanned += len(rows)
+        last_id = rows[-1]["id"]
+
+    return scanned, stale
+
+
+async def rescore_sweep(db: AsyncSession, force: bool = False) -> SweepResult:
+    """Queue a scoring job for every lead whose inputs changed.
+
+    Scoring runs on the persistent job queue, so a sweep resumes after a
+    restart without redoing finished leads. Unless forced, workers re-check
+    each fingerprint and skip leads that were re-scored in the meantime.
+    """
+    scanned, stale = await find_stale_leads(db, force=force)
+    if not stale:
+        return SweepResult(scanned=scanned, stale=0)
+
+    job = await submit_job(db, JobKind.SCORE, stale, {"only_changed": not force})
+    return SweepResult(scanned=scanned, stale=len(stale), job=await job_response(db, job))
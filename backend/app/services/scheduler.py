@@ -0,0 +1,313 @@
+"""Event-driven, debounced re-analysis of changed leads.
+
+A session after_flush hook watches the changes that make a lead's intent or
+score stale and turns them into re-analysis signals:
+
+- new enrichment and material intent changes -> re-score
+- status changes and new behaviour events -> re-analyze intent (whose
+  result, if it moves enough, in turn triggers a re-score)
+
+Each signal carries a materiality relative to its threshold; signals for a
+lead add up until they reach 1, so small drifts and a trickle of page views
+do not cost an inference. A material lead is then debounced: it waits until
+no new signal arrived for REANALYSIS_DEBOUNCE_SECONDS (at most
+REANALYSIS_MAX_DELAY_SECONDS), so a burst of events causes one re-analysis.
+Ready leads are queued as jobs on the persistent job queue, most material
+first, within a global budget of LLM calls per minute: the budget is
+checked against every provider call the LLM gateway made in the last
+minute (interactive requests, batches and job workers alike) plus the job
+items still waiting to run, so background re-analysis only uses the
+headroom the rest of the app leaves. Other traffic itself is not held
+back by the budget. Won and lost leads are not re-analyzed.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.core.llm import get_llm
+from app.models.event import EventType, LeadActivity
+from app.models.job import Job, JobItem, JobKind
+from app.models.lead import Lead, LeadStatus
+from app.services.events import EVENT_WEIGHTS
+from app.services.jobs import ACTIVE_STATUSES, submit_job
+
+logger = logging.getLogger(__name__)
+
+TICK_SECONDS = 1.0
+STALENESS_SAMPLES = 1000
+LOOKUP_CHUNK = 500
+
+CLOSED_STATUSES = (LeadStatus.WON, LeadStatus.LOST)
+
+# Job params per re-analysis kind; score jobs skip leads that were
+# re-scored with the same inputs in the meantime.
+JOB_PARAMS = {
+    JobKind.SCORE: {"only_changed": True, "scheduled": True},
+    JobKind.INTENT: {"scheduled": True},
+}
+
+PendingKey = Tuple[str, JobKind]
+
+
+class _Pending:
+    __slots__ = ("materiality", "last_seen", "material_at")
+
+    def __init__(self, now: float):
+        self.materiality = 0.0
+        self.last_seen = now
+        self.material_at: Optional[float] = None
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(q * len(values)))], 2)
+
+
+class ReanalysisScheduler:
+    """Debounces lead change signals and queues re-analysis jobs."""
+
+    def __init__(self):
+        self._pending: Dict[PendingKey, _Pending] = {}
+        self._staleness: Deque[float] = deque(maxlen=STALENESS_SAMPLES)
+        self._task: Optional[asyncio.Task] = None
+
+        self.signals: Dict[str, int] = {}
+        self.coalesced = 0
+        self.dispatched = 0
+        self.dropped = 0
+        self.errors = 0
+        self.ready = 0
+        self.outstanding = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        if settings.reanalysis_enabled and not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    def record(self, lead_id: str, kind: JobKind, materiality: float, reason: str) -> None:
+        """Add a change signal; materiality is relative to its threshold."""
+        if materiality <= 0:
+            return
+        now = time.monotonic()
+        self.signals[reason] = self.signals.get(reason, 0) + 1
+        pending = self._pending.get((lead_id, kind))
+        if pending is None:
+            pending = self._pending[(lead_id, kind)] = _Pending(now)
+        elif pending.material_at is not None:
+            self.coalesced += 1
+        pending.materiality += materiality
+        pending.last_seen = now
+        if pending.material_at is None and pending.materiality >= 1:
+            pending.material_at = now
+
+    def discard(self, lead_id: str) -> None:
+        """Forget pending signals of a closed or deleted lead."""
+        for kind in JOB_PARAMS:
+            if self._pending.pop((lead_id, kind), None) is not None:
+                self.dropped += 1
+
+    @staticmethod
+    async def _outstanding_items(db) -> int:
+        # Queued job items will each make an LLM call that the gateway has
+        # not seen yet.
+        result = await db.execute(
+            select(func.count(JobItem.id))
+            .join(Job, Job.id == JobItem.job_id)
+            .where(JobItem.status.in_(ACTIVE_STATUSES), Job.status.in_(ACTIVE_STATUSES))
+        )
+        return result.scalar_one()
+
+    def _due(self, now: float) -> List[Tuple[PendingKey, _Pending]]:
+        debounce, max_delay = settings.reanalysis_debounce_seconds, settings.reanalysis_max_delay_seconds
+        due = [
+            (key, pending) for key, pending in self._pending.items()
+            if pending.material_at is not None
+            and (now - pending.last_seen >= debounce or now - pending.material_at >= max_delay)
+        ]
+        due.sort(key=lambda item: -item[1].materiality)
+        return due
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(TICK_SECONDS)
+            try:
+                await self.dispatch()
+            except Exception:
+                self.errors += 1
+                logger.exception("Re-analysis dispatch failed")
+
+    async def dispatch(self) -> int:
+        """Queue jobs for the leads that are due, within the LLM budget."""
+        now = time.monotonic()
+        due = self._due(now)
+        self.ready = len(due)
+        if not due:
+            return 0
+
+        async with async_session_maker() as db:
+            # Activity signals do not know the lead's status; leads closed or
+            # deleted since their last signal are dropped here.
+            lead_ids = list({lead_id for (lead_id, _), _ in due})
+            open_ids = set()
+            for i in range(0, len(lead_ids), LOOKUP_CHUNK):
+                result = await db.execute(
+                    select(Lead.id).where(Lead.id.in_(lead_ids[i:i + LOOKUP_CHUNK]), Lead.status.notin_(CLOSED_STATUSES))
+                )
+                open_ids.update(result.scalars())
+            for lead_id in set(lead_ids) - open_ids:
+                self.discard(lead_id)
+            due = [item for item in due if item[0][0] in open_ids]
+            self.ready = len(due)
+
+            budget = settings.reanalysis_llm_calls_per_minute
+            if budget:
+                self.outstanding = await self._outstanding_items(db)
+                used = get_llm().recent_calls() + self.outstanding
+                due = due[:max(0, budget - used)]
+
+            # Leads closed or deleted during the lookups above were
+            # discarded by the flush hook in the meantime (and may have
+            # started accumulating anew).
+            due = [(key, pending) for key, pending in due if self._pending.get(key) is pending]
+            for key, _ in due:
+                del self._pending[key]
+            batches: Dict[JobKind, List[str]] = {}
+            for (lead_id, kind), pending in due:
+                batches.setdefault(kind, []).append(lead_id)
+            try:
+                for kind, batch in batches.items():
+                    await submit_job(db, kind, batch, dict(JOB_PARAMS[kind]))
+            except Exception:
+                # Keep the leads for the next tick; new signals merge in.
+                for key, pending in due:
+                    self._pending.setdefault(key, pending)
+                raise
+
+        for (lead_id, kind), pending in due:
+            self._staleness.append(now - pending.material_at)
+            if kind == JobKind.INTENT:
+                # Give the intent result a chance to join a pending re-score.
+                score = self._pending.get((lead_id, JobKind.SCORE))
+                if score is not None:
+                    score.last_seen = now
+        self.dispatched += len(due)
+        self.ready -= len(due)
+        return len(due)
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        material = [pending for pending in self._pending.values() if pending.material_at is not None]
+        staleness = list(self._staleness)
+        return {
+            "enabled": settings.reanalysis_enabled,
+            "running": self.running,
+            "queue_depth": len(material),
+            "ready": self.ready,
+            "accumulating": len(self._pending) - len(material),
+            "signals": dict(self.signals),
+            "coalesced": self.coalesced,
+            "dispatched": self.dispatched,
+            "debounce_savings": (
+                round(self.coalesced / (self.coalesced + self.dispatched), 4)
+                if self.coalesced + self.dispatched else 0.0
+            ),
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "llm_calls_per_minute": settings.reanalysis_llm_calls_per_minute,
+            "llm_calls_last_minute": get_llm().recent_calls(),
+            "outstanding_job_items": self.outstanding,
+            "oldest_pending_seconds": (
+                round(max(now - pending.material_at for pending in material), 2) if material else None
+            ),
+            "staleness_seconds": {
+                "p50": _percentile(staleness, 0.5),
+                "p90": _percentile(staleness, 0.9),
+                "p99": _percentile(staleness, 0.99),
+            },
+        }
+
+
+reanalysis_scheduler = ReanalysisScheduler()
+
+
+def _history(state, attr: str):
+    history = state.attrs[attr].history
+    old = history.deleted[0] if history.deleted else history.unchanged[0] if history.unchanged else None
+    new = history.added[0] if history.added else history.unchanged[0] if history.unchanged else None
+    return old, new
+
+
+def _signal_types(signals) -> set:
+    return {signal.get("signal_type") for signal in signals or [] if isinstance(signal, dict)}
+
+
+def _lead_signals(lead: Lead) -> None:
+    state = inspect(lead)
+    if lead.status in CLOSED_STATUSES:
+        reanalysis_scheduler.discard(lead.id)
+        return
+
+    if state.attrs.enriched_at.history.added and lead.enriched_at is not None:
+        reanalysis_scheduler.record(lead.id, JobKind.SCORE, 1.0, "enrichment")
+
+    old_status, new_status = _history(state, "status")
+    if state.attrs.status.history.added and old_status != new_status:
+        reanalysis_scheduler.record(lead.id, JobKind.INTENT, 1.0, "status")
+
+    if state.attrs.intent_score.history.added or state.attrs.intent_signals.history.added:
+        old_score, new_score = _history(state, "intent_score")
+        materiality = abs((new_score or 0.0) - (old_score or 0.0)) / settings.reanalysis_intent_delta
+        old_signals, new_signals = _history(state, "intent_signals")
+        if _signal_types(new_signals) - _signal_types(old_signals):
+            materiality = max(materiality, 1.0)
+        reanalysis_scheduler.record(lead.id, JobKind.SCORE, materiality, "intent")
+
+
+def _activity_signals(activity: LeadActivity) -> None:
+    old_counts, new_counts = _history(inspect(activity), "counts")
+    old_counts, new_counts = old_counts or {}, new_counts or {}
+    weight = sum(
+        EVENT_WEIGHTS.get(EventType(name), 1.0) * (count - old_counts.get(name, 0))
+        for name, count in new_counts.items()
+    )
+    reanalysis_scheduler.record(
+        activity.lead_id, JobKind.INTENT, weight / settings.reanalysis_activity_threshold, "activity"
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _track_reanalysis_signals(session: Session, flush_context) -> None:
+    if not reanalysis_scheduler.running:
+        return
+
+    for obj in session.deleted:
+        if isinstance(obj, Lead):
+            reanalysis_scheduler.discard(obj.id)
+
+    for obj in list(session.new) + list(session.dirty):
+        if obj in session.deleted:
+            continue
+        if isinstance(obj, LeadActivity):
+            _activity_signals(obj)
+        elif isinstance(obj, Lead) and obj not in session.new:
+            _lead_signals(obj)
@@ -0,0 +1,285 @@
+"""Lead scoring service."""
+
+import hashlib
+import json
+import logging
+from datetime import datetime
+from enum import Enum
+from typing import List, Optional, Tuple, Union
+
+from app.agents.lead_scorer import LeadScorerAgent
+from app.agents.registry import agent_registry
+from app.core.concurrency import gather_bounded
+from app.core.config import settings
+from app.models.lead import Lead, LeadScore, BatchItemError
+from app.services.events import load_activity_summaries
+from app.services.prescoring import RuleBasedScorer
+from app.services.similarity import neighbour_scorer
+
+logger = logging.getLogger(__name__)
+
+
+def score_inputs(lead: Lead) -> dict:
+    """Build the LeadScorerAgent.score arguments for a lead."""
+    return {
+        "email": lead.email,
+        "first_name": lead.first_name or "",
+        "last_name": lead.last_name or "",
+        "job_title": lead.job_title or "",
+        "company": lead.company or "",
+        "source": lead.source.value if lead.source else "",
+        "enrichment_data": lead.enrichment_data,
+        "intent_signals": lead.intent_signals
+    }
+
+
+# Every lead field the scoring path reads, including the rule pre-scorer.
+FINGERPRINT_FIELDS = (
+    "email", "first_name", "last_name", "job_title", "company", "source",
+    "phone", "linkedin_url", "enrichment_data", "intent_signals", "intent_score"
+)
+
+
+def activity_digest(events: Optional[int], last_event: Optional[str]) -> Optional[dict]:
+    """Coarse activity part of the fingerprint: event count and last type.
+
+    The decayed score and recency the prompt also shows are left out, so
+    leads do not turn stale just because time passes.
+    """
+    return {"events": events, "last_event": last_event} if events else None
+
+
+def summary_digest(summary: Optional[dict]) -> Optional[dict]:
+    """activity_digest of an activity summary (see events.activity_summary)."""
+    summary = summary or {}
+    return activity_digest(summary.get("events"), summary.get("last_event"))
+
+
+def input_fingerprint(lead: Union[Lead, dict], activity: Optional[dict] = None) -> str:
+    """Hash the scoring inputs of a lead (ORM object or column mapping).
+
+    `activity` is the lead's activity_digest. Empty values are normalized so
+    e.g. None and "" hash the same, since they render the same prompt.
+    """
+    get = lead.get if isinstance(lead, dict) else lambda field: getattr(lead, field)
+    payload = {}
+    for field in FINGERPRINT_FIELDS:
+        value = get(field)
+        if isinstance(value, Enum):
+            value = value.value
+        payload[field] = value or None
+    # Only present with events, so fingerprints of leads without any stay
+    # what they were before activity was an input.
+    if activity:
+        payload["activity"] = activity
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def apply_score(
+    lead: Lead,
+    score_result: LeadScore,
+    method: str = "llm",
+    neighbours: Optional[List[dict]] = None,
+    activity: Optional[dict] = None
+) -> None:
+    """Copy a scoring result onto a lead.
+
+    `neighbours` records the provenance of an interpolated score and
+    `activity` is the activity summary the score was made with.
+    """
+    lead.score = score_result.overall_score
+    lead.score_tier = score_result.tier
+    lead.score_breakdown = {
+        "firmographic": score_result.firmographic_score,
+        "behavioral": score_result.behavioral_score,
+        "engagement": score_result.engagement_score,
+        "fit": score_result.fit_score,
+        "reasoning": score_result.reasoning,
+        "recommendations": score_result.recommendations,
+        "method": method
+    }
+    if neighbours is not None:
+        lead.score_breakdown["neighbours"] = neighbours
+    lead.last_scored_at = datetime.utcnow()
+    lead.score_fingerprint = input_fingerprint(lead, summary_digest(activity))
+
+
+async def lead_fingerprint(lead: Lead) -> str:
+    """Current input fingerprint of a lead, including its stored activity."""
+    activities = await load_activity_summaries([lead.id])
+    return input_fingerprint(lead, summary_digest(activities.get(lead.id)))
+
+
+def has_material_activity(summary: Optional[dict]) -> bool:
+    """Whether a lead's activity is enough that only the LLM may score it.
+
+    The rule pre-scorer and neighbour reuse do not look at activity.
+    """
+    return bool(summary) and summary["activity_score"] >= settings.activity_llm_threshold
+
+
+def prescore_leads(leads: List[Lead], activities: Optional[dict] = None) -> List[Lead]:
+    """Apply rule-based scores to clear-cut leads.
+
+    Returns the leads that still need LLM scoring.
+    """
+    if not settings.prescore_enabled:
+        return leads
+
+    activities = activities or {}
+    decided, ambiguous = RuleBasedScorer().prefilter(leads)
+    for lead in leads:
+        if lead.id in decided:
+            apply_score(lead, decided[lead.id], method="rules", activity=activities.get(lead.id))
+    return ambiguous
+
+
+async def neighbour_prescore_leads(
+    leads: List[Lead],
+    activities: Optional[dict] = None
+) -> Tuple[List[Lead], dict, dict]:
+    """Apply interpolated scores from near-identical, already scored leads.
+
+    Returns the leads that still need LLM scoring, few-shot reference text
+    per lead id and the shadow predictions to pass to remember_scores().
+    Lookup failures fall through to the LLM.
+    """
+    if not settings.neighbour_scoring_enabled or not leads:
+        return leads, {}, {}
+
+    try:
+        lookup = await neighbour_scorer.prefilter(leads)
+    except Exception:
+        logger.exception("Neighbour score lookup failed")
+        return leads, {}, {}
+
+    for lead in leads:
+        if lead.id in lookup.decided:
+            score_result, provenance = lookup.decided[lead.id]
+            apply_score(
+                lead, score_result, method="neighbours", neighbours=provenance,
+                activity=(activities or {}).get(lead.id)
+            )
+    return lookup.remaining, lookup.examples, lookup.shadow
+
+
+async def _prescore(leads: List[Lead], activities: dict) -> Tuple[List[Lead], dict, dict]:
+    """Rule and neighbour short-circuits, skipped by leads with material activity.
+
+    Returns the leads that need the LLM, their few-shot examples and the
+    shadow predictions.
+    """
+    active = [lead for lead in leads if has_material_activity(activities.get(lead.id))]
+    active_ids = {lead.id for lead in active}
+    quiet = [lead for lead in leads if lead.id not in active_ids]
+    pending, examples, shadow = await neighbour_prescore_leads(prescore_leads(quiet, activities), activities)
+    return pending + active, examples, shadow
+
+
+def remember_scores(leads: List[Lead], shadow: Optional[dict] = None) -> None:
+    """Add LLM-scored leads to the neighbour store once they are committed."""
+    if not settings.neighbour_scoring_enabled or not leads:
+        return
+
+    try:
+        neighbour_scorer.remember(leads, shadow)
+    except Exception:
+        logger.exception("Storing scored leads for neighbour reuse failed")
+
+
+def _neighbour_candidates(leads: List[Lead], activities: dict) -> List[Lead]:
+    # Scores driven by material activity would leak into quiet neighbours,
+    # whose embedding does not include activity.
+    return [lead for lead in leads if not has_material_activity(activities.get(lead.id))]
+
+
+def _llm_inputs(lead: Lead, examples: dict, activities: dict) -> dict:
+    inputs = score_inputs(lead)
+    if lead.id in examples:
+        inputs["additional_context"] = examples[lead.id]
+    if lead.id in activities:
+        inputs["activity"] = activities[lead.id]
+    return inputs
+
+
+async def score_lead(lead: Lead, scorer: Optional[LeadScorerAgent] = None) -> None:
+    """Score a single lead and apply the result."""
+    activities = await load_activity_summaries([lead.id])
+    pending, examples, shadow = await _prescore([lead], activities)
+    if not pending:
+        return
+
+    scorer = scorer or agent_registry.scorer
+    apply_score(
+        lead, await scorer.score(**_llm_inputs(lead, examples, activities)), activity=activities.get(lead.id)
+    )
+    remember_scores(_neighbour_candidates([lead], activities), shadow)
+
+
+async def _score_packed(scorer: LeadScorerAgent, leads: List[Lead], examples: dict, activities: dict) -> dict:
+    """Score leads in packs of score_pack_size; returns lead id -> LeadScore.
+
+    Leads from failed packs, or missing or invalid in a pack's response, are
+    simply absent from the result.
+    """
+    size = settings.score_pack_size
+    packs = [leads[i:i + size] for i in range(0, len(leads), size)]
+    results = await gather_bounded(
+        lambda pack: scorer.score_many({lead.id: _llm_inputs(lead, examples, activities) for lead in pack}),
+        packs,
+        settings.batch_concurrency
+    )
+
+    scores = {}
+    for result in results:
+        if not isinstance(result, Exception):
+            scores.update(result)
+    return scores
+
+
+async def score_leads(
+    leads: List[Lead],
+    scorer: Optional[LeadScorerAgent] = None
+) -> Tuple[List[Lead], List[BatchItemError]]:
+    """Score leads concurrently and apply the results.
+
+    Clear-cut leads are scored by rules and near-duplicates of scored leads
+    by neighbour interpolation, unless their activity is material; the rest
+    go to the LLM, packed several per
+    prompt when SCORE_PACK_SIZE > 1, with any lead the packed call did not
+    return retried through the single-lead path.
+    Changes are applied to the lead objects only; committing is left to the
+    caller so a whole batch is persisted at once.
+    """
+    activities = await load_activity_summaries([lead.id for lead in leads])
+    pending, examples, shadow = await _prescore(leads, activities)
+    pending_ids = {lead.id for lead in pending}
+    scored = [lead for lead in leads if lead.id not in pending_ids]
+    llm_scored = []
+
+    scorer = scorer or agent_registry.scorer
+    if settings.score_pack_size > 1 and len(pending) > 1:
+        packed = await _score_packed(scorer, pending, examples, activities)
+        for lead in pending:
+            if lead.id in packed:
+                apply_score(lead, packed[lead.id], activity=activities.get(lead.id))
+                llm_scored.append(lead)
+        pending = [lead for lead in pending if lead.id not in packed]
+
+    results = await gather_bounded(
+        lambda lead: scorer.score(**_llm_inputs(lead, examples, activities)),
+        pending,
+        settings.batch_concurrency
+    )
+
+    errors = []
+    for lead, result in zip(pending, results):
+        if isinstance(result, Exception):
+            errors.append(BatchItemError(lead_id=lead.id, error=str(result) or type(result).__name__))
+            continue
+        apply_score(lead, result, activity=activities.get(lead.id))
+        llm_scored.append(lead)
+
+    remember_scores(_neighbour_candidates(llm_scored, activities), shadow)
+    return scored + llm_scored, errors
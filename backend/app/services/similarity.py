@@ -0,0 +1,374 @@
+"""Nearest-neighbour score reuse backed by the Chroma store.
+
+Leads scored by the LLM are embedded with a local feature-hashing embedding
+of their firmographic, contact and intent features (CPU only, no model
+download) and stored in a persistent Chroma collection. Before a lead goes
+to the LLM its nearest scored neighbours are looked up: when all of them are
+close and agree on tier their scores are interpolated instead, otherwise
+they are passed to the scorer as reference examples.
+
+A fraction of reusable leads is still sent to the LLM (shadow sampling) so
+the hit rate and the interpolation error can be tracked; those calls get no
+reference examples, so the shadow score stays independent of the neighbours.
+
+LLM scores are staged when they are produced and only written to Chroma by
+a session hook once the lead update carrying them has been committed, so a
+failed or rolled-back write never becomes a reusable neighbour.
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.lead import Lead, LeadScore
+from app.services.prescoring import FEATURES, lead_features
+
+logger = logging.getLogger(__name__)
+
+COLLECTION_NAME = "scored_leads"
+HASH_DIMENSIONS = 128
+
+# Share of the squared distance given to the numeric scoring features; the
+# rest goes to the hashed categorical tokens.
+NUMERIC_WEIGHT = 0.7
+
+# Scored leads waiting for their commit; the oldest are dropped beyond this.
+MAX_STAGED = 10000
+
+
+def _tokens(lead: Lead) -> List[str]:
+    enrichment = lead.enrichment_data or {}
+    company = enrichment.get("company") or {}
+    contact = enrichment.get("contact") or {}
+
+    tokens = [
+        f"source:{lead.source.value if lead.source else ''}",
+        f"industry:{company.get('industry') or ''}",
+        f"size:{company.get('employee_range') or ''}",
+        f"country:{company.get('country') or ''}",
+        f"funding:{company.get('funding_stage') or ''}",
+        f"seniority:{contact.get('seniority') or ''}",
+        f"department:{contact.get('department') or ''}",
+    ]
+    title = lead.job_title or contact.get("job_title") or ""
+    tokens += [f"title:{word}" for word in re.findall(r"[a-z]+", title.lower())]
+    tokens += [f"tech:{tech}" for tech in company.get("technologies") or []]
+    for signal in lead.intent_signals or []:
+        if isinstance(signal, dict):
+            tokens.append(f"signal:{signal.get('signal_type') or ''}")
+            tokens.append(f"stage:{signal.get('buying_stage') or ''}")
+    return [token.lower() for token in tokens if not token.endswith(":")]
+
+
+def lead_embedding(lead: Lead) -> List[float]:
+    """Embed a lead so that squared L2 distances fall in [0, 1].
+
+    The numeric block is the rule pre-scorer's feature vector; the
+    categorical block is a signed feature-hashing vector of enrichment,
+    title and intent tokens, normalized to unit length.
+    """
+    hashed = np.zeros(HASH_DIMENSIONS)
+    for token in _tokens(lead):
+        digest = hashlib.blake2b(token.encode(), digest_size=8).digest()
+        index = int.from_bytes(digest[:4], "little") % HASH_DIMENSIONS
+        hashed[index] += 1.0 if digest[4] & 1 else -1.0
+    norm = np.linalg.norm(hashed)
+    if norm:
+        hashed /= norm
+
+    numeric = np.array(lead_features(lead)) / math.sqrt(len(FEATURES))
+    return np.concatenate([
+        numeric * math.sqrt(NUMERIC_WEIGHT),
+        hashed * math.sqrt(1 - NUMERIC_WEIGHT) / 2
+    ]).tolist()
+
+
+def lead_summary(lead: Lead) -> str:
+    """One-line description of a lead for few-shot examples."""
+    company = (lead.enrichment_data or {}).get("company") or {}
+    parts = [
+        f"{lead.job_title or 'Unknown title'} at {lead.company or company.get('name') or 'unknown company'}",
+        f"industry {company.get('industry') or 'unknown'}",
+        f"size {company.get('employee_range') or 'unknown'}",
+        f"source {lead.source.value if lead.source else 'unknown'}",
+        f"intent {float(lead.intent_score or 0):.2f}",
+    ]
+    return ", ".join(parts)
+
+
+class NeighbourLookup(NamedTuple):
+    decided: Dict[str, Tuple[LeadScore, List[dict]]]
+    remaining: List[Lead]
+    examples: Dict[str, str]
+    shadow: Dict[str, LeadScore]
+
+
+class NeighbourScorer:
+    """Reuses scores of near-identical leads from the Chroma collection."""
+
+    def __init__(
+        self,
+        k: Optional[int] = None,
+        threshold: Optional[float] = None,
+        shadow_rate: Optional[float] = None
+    ):
+        self.k = k or settings.neighbour_k
+        self.threshold = settings.neighbour_similarity_threshold if threshold is None else threshold
+        self.shadow_rate = settings.neighbour_shadow_rate if shadow_rate is None else shadow_rate
+        self._collection = None
+        self._lock = threading.Lock()
+        # lead id -> (last_scored_at, embedding, metadata)
+        self._staged: "OrderedDict[str, tuple]" = OrderedDict()
+        self._stores: set = set()
+
+        self.lookups = 0
+        self.hits = 0
+        self.reused = 0
+        self.shadow_samples = 0
+        self.shadow_tier_matches = 0
+        self._shadow_abs_error = 0.0
+
+    def _get_collection(self):
+        with self._lock:
+            if self._collection is None:
+                import chromadb
+                from chromadb.config import Settings as ChromaSettings
+
+                client = chromadb.PersistentClient(
+                    path=settings.chroma_persist_dir,
+                    settings=ChromaSettings(anonymized_telemetry=False)
+                )
+                self._collection = client.get_or_create_collection(
+                    COLLECTION_NAME,
+                    metadata={"hnsw:space": "l2"},
+                    embedding_function=None
+                )
+            return self._collection
+
+    def _query(self, leads: List[Lead]) -> List[List[dict]]:
+        collection = self._get_collection()
+        count = collection.count()
+        if not count:
+            return [[] for _ in leads]
+
+        # One extra result in case the lead itself is already stored.
+        result = collection.query(
+            query_embeddings=[lead_embedding(lead) for lead in leads],
+            n_results=min(self.k + 1, count),
+            include=["metadatas", "distances"]
+        )
+
+        neighbours = []
+        for lead, ids, distances, metadatas in zip(
+            leads, result["ids"], result["distances"], result["metadatas"]
+        ):
+            rows = [
+                {"lead_id": neighbour_id, "similarity": round(1 - math.sqrt(max(distance, 0.0)), 4), **metadata}
+                for neighbour_id, distance, metadata in zip(ids, distances, metadatas)
+                if neighbour_id != lead.id
+            ]
+            neighbours.append(rows[:self.k])
+        return neighbours
+
+    def _upsert(self, entries: Dict[str, tuple]) -> None:
+        self._get_collection().upsert(
+            ids=list(entries),
+            embeddings=[embedding for embedding, _ in entries.values()],
+            metadatas=[metadata for _, metadata in entries.values()]
+        )
+
+    @staticmethod
+    def _metadata(lead: Lead) -> dict:
+        breakdown = lead.score_breakdown or {}
+        return {
+            "score": float(lead.score or 0),
+            "tier": lead.score_tier or "cold",
+            "firmographic": float(breakdown.get("firmographic") or 0),
+            "behavioral": float(breakdown.get("behavioral") or 0),
+            "engagement": float(breakdown.get("engagement") or 0),
+            "fit": float(breakdown.get("fit") or 0),
+            "recommendations": json.dumps(breakdown.get("recommendations") or []),
+            "summary": lead_summary(lead),
+        }
+
+    def interpolate(self, neighbours: List[dict]) -> Optional[LeadScore]:
+        """Similarity-weighted score of k close neighbours that agree on tier."""
+        if len(neighbours) < self.k:
+            return None
+        if any(neighbour["similarity"] < self.threshold for neighbour in neighbours):
+            return None
+        tiers = {neighbour["tier"] for neighbour in neighbours}
+        if len(tiers) != 1:
+            return None
+
+        weights = [neighbour["similarity"] for neighbour in neighbours]
+
+        def average(key: str) -> float:
+            return round(float(np.average([n[key] for n in neighbours], weights=weights)), 1)
+
+        return LeadScore(
+            overall_score=average("score"),
+            tier=tiers.pop(),
+            firmographic_score=average("firmographic"),
+            behavioral_score=average("behavioral"),
+            engagement_score=average("engagement"),
+            fit_score=average("fit"),
+            reasoning=(
+                f"Interpolated from the {len(neighbours)} most similar LLM-scored leads "
+                f"(similarity >= {self.threshold}); LLM scoring was skipped."
+            ),
+            recommendations=json.loads(neighbours[0]["recommendations"])
+        )
+
+    @staticmethod
+    def format_examples(neighbours: List[dict]) -> str:
+        lines = ["Reference leads already scored (most similar first):"]
+        for neighbour in neighbours:
+            lines.append(
+                f"- {neighbour['summary']}: overall {neighbour['score']} ({neighbour['tier']}); "
+                f"firmographic {neighbour['firmographic']}, behavioral {neighbour['behavioral']}, "
+                f"engagement {neighbour['engagement']}, fit {neighbour['fit']}"
+            )
+        return "\n".join(lines)
+
+    async def prefilter(self, leads: List[Lead]) -> NeighbourLookup:
+        """Look up the nearest scored neighbours of each lead.
+
+        Returns interpolated scores with their provenance for reusable
+        leads, the leads that still need the LLM, few-shot reference text
+        for those leads (except shadow-sampled ones, so their LLM score is
+        independent) and the interpolated predictions of shadow-sampled
+        leads, which should be passed back to remember().
+        """
+        if not leads:
+            return NeighbourLookup({}, [], {}, {})
+
+        neighbours = await asyncio.to_thread(self._query, leads)
+
+        lookup = NeighbourLookup({}, [], {}, {})
+        for lead, rows in zip(leads, neighbours):
+            self.lookups += 1
+            interpolated = self.interpolate(rows)
+            if interpolated is not None:
+                self.hits += 1
+                if random.random() >= self.shadow_rate:
+                    self.reused += 1
+                    provenance = [
+                        {"lead_id": row["lead_id"], "similarity": row["similarity"], "score": row["score"]}
+                        for row in rows
+                    ]
+                    lookup.decided[lead.id] = (interpolated, provenance)
+                    continue
+                lookup.shadow[lead.id] = interpolated
+                lookup.remaining.append(lead)
+                continue
+            if rows:
+                lookup.examples[lead.id] = self.format_examples(rows)
+            lookup.remaining.append(lead)
+        return lookup
+
+    def remember(self, leads: List[Lead], shadow: Optional[Dict[str, LeadScore]] = None) -> None:
+        """Stage LLM-scored leads and compare them with shadow predictions.
+
+        Staged leads are stored once the update setting their score is
+        committed (see _track_scored_leads).
+        """
+        for lead in leads:
+            predicted = (shadow or {}).get(lead.id)
+            if predicted is not None:
+                self.shadow_samples += 1
+                self._shadow_abs_error += abs(predicted.overall_score - float(lead.score or 0))
+                self.shadow_tier_matches += predicted.tier == lead.score_tier
+
+            self._staged.pop(lead.id, None)
+            self._staged[lead.id] = (lead.last_scored_at, lead_embedding(lead), self._metadata(lead))
+            if len(self._staged) > MAX_STAGED:
+                self._staged.popitem(last=False)
+
+    def staged_for(self, lead: Lead) -> bool:
+        """Whether the lead's current score is a staged LLM score."""
+        staged = self._staged.get(lead.id)
+        return staged is not None and staged[0] == lead.last_scored_at
+
+    def store(self, lead_ids: List[str]) -> None:
+        """Write staged leads to the collection off the event loop."""
+        entries = {
+            lead_id: staged[1:] for lead_id in lead_ids
+            if (staged := self._staged.pop(lead_id, None)) is not None
+        }
+        if not entries:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._upsert(entries)
+            return
+        task = loop.create_task(asyncio.to_thread(self._upsert, entries))
+        self._stores.add(task)
+        task.add_done_callback(self._stored)
+
+    def _stored(self, task: asyncio.Task) -> None:
+        self._stores.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Storing scored leads for neighbour reuse failed", exc_info=task.exception())
+
+    def stats(self) -> dict:
+        return {
+            "k": self.k,
+            "threshold": self.threshold,
+            "shadow_rate": self.shadow_rate,
+            "stored": self._collection.count() if self._collection is not None else None,
+            "staged": len(self._staged),
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "reused": self.reused,
+            "hit_rate": round(self.hits / self.lookups, 4) if self.lookups else 0.0,
+            "shadow_samples": self.shadow_samples,
+            "shadow_mean_abs_error": (
+                round(self._shadow_abs_error / self.shadow_samples, 2) if self.shadow_samples else None
+            ),
+            "shadow_tier_agreement": (
+                round(self.shadow_tier_matches / self.shadow_samples, 4) if self.shadow_samples else None
+            ),
+        }
+
+
+neighbour_scorer = NeighbourScorer()
+
+
+@event.listens_for(Session, "after_flush")
+def _track_scored_leads(session: Session, flush_context) -> None:
+    if not neighbour_scorer._staged:
+        return
+    for obj in list(session.new) + list(session.dirty):
+        if (
+            isinstance(obj, Lead)
+            and inspect(obj).attrs.last_scored_at.history.added
+            and neighbour_scorer.staged_for(obj)
+        ):
+            session.info.setdefault("scored_lead_ids", set()).add(obj.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _store_scored_leads(session: Session) -> None:
+    lead_ids = session.info.pop("scored_lead_ids", None)
+    if lead_ids:
+        neighbour_scorer.store(list(lead_ids))
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_scored_leads(session: Session) -> None:
+    # The scores stay staged; a later commit of the same score stores them.
+    session.info.pop("scored_lead_ids", None)
@@ -0,0 +1,205 @@
+"""Incrementally maintained lead aggregates.
+
+Counts by tier, status, source and score bucket, plus enrichment counts and
+score sums, live in the lead_stats table. A session after_flush hook turns
+every lead insert, update and delete into counter deltas applied in the
+same transaction, so the dashboard endpoints read a handful of rows instead
+of scanning the leads table. Run `python -m app.services.stats` (or POST
+/api/analytics/rebuild) to recompute everything from scratch.
+"""
+
+import asyncio
+from collections import defaultdict
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import event, inspect, select, update, insert, delete, func
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.lead import Lead, LeadStatus, LeadSource
+from app.models.stats import LeadStat
+
+SCORE_RANGES = [
+    ("0-20", 0, 20),
+    ("21-40", 21, 40),
+    ("41-60", 41, 60),
+    ("61-80", 61, 80),
+    ("81-100", 81, 100)
+]
+TIERS = ["hot", "warm", "cold", "unscored"]
+
+StatKey = Tuple[str, str]
+Deltas = Dict[StatKey, list]
+
+
+def _enum_value(value) -> str:
+    if value is None:
+        return "unknown"
+    return value.value if hasattr(value, "value") else str(value)
+
+
+def lead_contribution(
+    score: Optional[float],
+    tier: Optional[str],
+    status,
+    source,
+    enriched: bool
+) -> Dict[StatKey, Tuple[int, float]]:
+    """Return the (count, score_sum) a single lead adds to each counter."""
+    score = score or 0.0
+    contribution = {
+        ("total", "all"): (1, score),
+        ("tier", tier or "unscored"): (1, score),
+        ("status", _enum_value(status)): (1, score),
+        ("source", _enum_value(source)): (1, score),
+    }
+    if score > 0:
+        contribution[("scored", "positive")] = (1, score)
+    if enriched:
+        contribution[("enriched", "yes")] = (1, score)
+    for label, min_s, max_s in SCORE_RANGES:
+        if min_s <= score <= max_s:
+            contribution[("bucket", label)] = (1, score)
+    return contribution
+
+
+def add_contribution(deltas: Deltas, contribution: Dict[StatKey, Tuple[int, float]], sign: int) -> None:
+    for stat_key, (count, score_sum) in contribution.items():
+        deltas[stat_key][0] += sign * count
+        deltas[stat_key][1] += sign * score_sum
+
+
+def new_deltas() -> Deltas:
+    return defaultdict(lambda: [0, 0.0])
+
+
+def row_contribution(row) -> Dict[StatKey, Tuple[int, float]]:
+    """Contribution of a lead given as a mapping of column values."""
+    return lead_contribution(
+        row.get("score"),
+        row.get("score_tier"),
+        row.get("status") or LeadStatus.NEW,
+        row.get("source") or LeadSource.WEBSITE,
+        row.get("enriched_at") is not None
+    )
+
+
+def apply_deltas(connection: Connection, deltas: Deltas) -> None:
+    """Apply counter deltas on the given connection (sync)."""
+    for (dimension, key), (count, score_sum) in deltas.items():
+        if not count and not score_sum:
+            continue
+        result = connection.execute(
+            update(LeadStat)
+            .where(LeadStat.dimension == dimension, LeadStat.key == key)
+            .values(count=LeadStat.count + count, score_sum=LeadStat.score_sum + score_sum)
+        )
+        if not result.rowcount:
+            connection.execute(
+                insert(LeadStat).values(dimension=dimension, key=key, count=count, score_sum=score_sum)
+            )
+
+
+def _old_and_new(state, attr: str):
+    history = state.attrs[attr].history
+    old = history.deleted[0] if history.deleted else history.unchanged[0] if history.unchanged else None
+    new = history.added[0] if history.added else history.unchanged[0] if history.unchanged else None
+    return old, new
+
+
+TRACKED = ("score", "score_tier", "status", "source", "enriched_at")
+
+
+@event.listens_for(Session, "after_flush")
+def _track_lead_changes(session: Session, flush_context) -> None:
+    deltas = new_deltas()
+
+    for obj in session.new:
+        if isinstance(obj, Lead):
+            add_contribution(deltas, row_contribution(inspect(obj).dict), 1)
+
+    for obj in session.deleted:
+        if isinstance(obj, Lead):
+            state = inspect(obj)
+            old = {attr: _old_and_new(state, attr)[0] for attr in TRACKED}
+            add_contribution(deltas, row_contribution(old), -1)
+
+    for obj in session.dirty:
+        if not isinstance(obj, Lead) or obj in session.deleted:
+            continue
+        state = inspect(obj)
+        values = {attr: _old_and_new(state, attr) for attr in TRACKED}
+        if all(old == new for old, new in values.values()):
+            continue
+        add_contribution(deltas, row_contribution({a: v[0] for a, v in values.items()}), -1)
+        add_contribution(deltas, row_contribution({a: v[1] for a, v in values.items()}), 1)
+
+    if deltas:
+        apply_deltas(session.connection(), deltas)
+
+
+async def read_stats(db: AsyncSession) -> Dict[StatKey, Tuple[int, float]]:
+    """Load every counter as {(dimension, key): (count, score_sum)}."""
+    result = await db.execute(select(LeadStat))
+    return {(s.dimension, s.key): (s.count, s.score_sum) for s in result.scalars().all()}
+
+
+def dimension_counts(stats: Dict[StatKey, Tuple[int, float]], dimension: str) -> Dict[str, int]:
+    return {key: count for (dim, key), (count, _) in stats.items() if dim == dimension}
+
+
+async def rebuild_stats(db: AsyncSession) -> int:
+    """Recompute all counters from the leads table; returns the lead count."""
+    deltas = new_deltas()
+    columns = [Lead.score, Lead.score_tier, Lead.status, Lead.source, Lead.enriched_at.isnot(None)]
+    result = await db.execute(
+        select(*columns, func.count(Lead.id), func.coalesce(func.sum(Lead.score), 0.0))
+        .group_by(*columns)
+    )
+    total = 0
+    for score, tier, status, source, enriched, count, score_sum in result.all():
+        for stat_key in lead_contribution(score, tier, status, source, enriched):
+            deltas[stat_key][0] += count
+            deltas[stat_key][1] += score_sum
+        total += count
+
+    # Seed every known counter so later updates rarely need an insert.
+    for key in [("total", "all"), ("scored", "positive"), ("enriched", "yes")]:
+        deltas[key]
+    for tier in TIERS:
+        deltas[("tier", tier)]
+    for status in LeadStatus:
+        deltas[("status", status.value)]
+    for source in LeadSource:
+        deltas[("source", source.value)]
+    for label, _, _ in SCORE_RANGES:
+        deltas[("bucket", label)]
+
+    await db.execute(delete(LeadStat))
+    await db.execute(insert(LeadStat), [
+        {"dimension": dimension, "key": key, "count": count, "score_sum": score_sum}
+        for (dimension, key), (count, score_sum) in deltas.items()
+    ])
+    await db.commit()
+    return total
+
+
+async def ensure_stats(db: AsyncSession) -> None:
+    """Build the counters on first start, e.g. after upgrading."""
+    has_stats = await db.execute(select(LeadStat.key).limit(1))
+    if has_stats.first() is None:
+        await rebuild_stats(db)
+
+
+async def _main() -> None:
+    from app.core.database import async_session_maker, init_db
+
+    await init_db()
+    async with async_session_maker() as db:
+        total = await rebuild_stats(db)
+    print(f"Rebuilt lead statistics for {total} leads")
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
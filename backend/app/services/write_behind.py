@@ -0,0 +1,199 @@
+"""Write-behind for lead updates.
+
+Scoring, enrichment and intent results used to be committed by each
+request on its own, so concurrent requests queued on SQLite's single write
+lock. LeadWriter collects the changed fields per lead instead, merging
+updates to the same lead, and commits everything pending in one
+transaction every few milliseconds or as soon as `max_batch` leads are
+waiting. Callers await the commit of their update.
+
+Changes are applied to ORM instances loaded in the flush session, so the
+stats and duplicate-index after_flush hooks see them like any other
+update.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import inspect, select
+
+from app.core.config import settings
+from app.core.database import write_session_maker
+from app.models.lead import Lead
+
+logger = logging.getLogger(__name__)
+
+
+def pending_changes(lead: Lead) -> dict:
+    """Fields of a lead changed since it was loaded."""
+    state = inspect(lead)
+    return {attr.key: attr.value for attr in state.attrs if attr.history.has_changes()}
+
+
+class _Pending:
+    __slots__ = ("fields", "waiters")
+
+    def __init__(self):
+        self.fields: dict = {}
+        self.waiters: List[asyncio.Future] = []
+
+
+class LeadWriter:
+    """Coalesces lead field updates and commits them in groups."""
+
+    def __init__(self, delay_ms: Optional[float] = None, max_batch: Optional[int] = None):
+        self._delay_ms = delay_ms
+        self._max_batch = max_batch
+        self._pending: Dict[str, _Pending] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._full: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+        self.updates = 0
+        self.coalesced = 0
+        self.flushes = 0
+        self.leads_written = 0
+        self.errors = 0
+        self._flush_seconds = 0.0
+        self._started_at = time.monotonic()
+
+    @property
+    def delay(self) -> float:
+        return (self._delay_ms if self._delay_ms is not None else settings.write_behind_delay_ms) / 1000
+
+    @property
+    def max_batch(self) -> int:
+        return self._max_batch or settings.write_behind_max_batch
+
+    def _ensure_running(self) -> None:
+        if self._task is None or self._task.done():
+            self._stopping = False
+            self._wakeup = asyncio.Event()
+            self._full = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    def submit(self, lead_id: str, fields: dict) -> asyncio.Future:
+        """Queue an update; the future resolves to the committed lead.
+
+        The result is None if the lead no longer exists.
+        """
+        self._ensure_running()
+        future = asyncio.get_running_loop().create_future()
+        pending = self._pending.get(lead_id)
+        if pending is None:
+            pending = self._pending[lead_id] = _Pending()
+        else:
+            self.coalesced += 1
+        pending.fields.update(fields)
+        pending.waiters.append(future)
+        self.updates += 1
+
+        self._wakeup.set()
+        if len(self._pending) >= self.max_batch:
+            self._full.set()
+        return future
+
+    async def write(self, lead_id: str, fields: dict) -> Optional[Lead]:
+        """Update a lead and wait until the change is committed."""
+        if not settings.write_behind_enabled:
+            return (await self._commit({lead_id: fields})).get(lead_id)
+        return await self.submit(lead_id, fields)
+
+    async def write_lead(self, lead: Lead) -> Optional[Lead]:
+        """Persist the pending changes of an ORM lead loaded elsewhere.
+
+        Returns the committed lead, or None if it was deleted meanwhile.
+        """
+        return await self.write(lead.id, pending_changes(lead))
+
+    async def write_leads(self, leads: Iterable[Lead]) -> None:
+        """Persist the pending changes of ORM leads loaded elsewhere."""
+        updates = {lead.id: pending_changes(lead) for lead in leads}
+        updates = {lead_id: fields for lead_id, fields in updates.items() if fields}
+        if not updates:
+            return
+        if not settings.write_behind_enabled:
+            await self._commit(updates)
+            return
+        await asyncio.gather(*[self.submit(lead_id, fields) for lead_id, fields in updates.items()])
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            # Give concurrent writers a moment to join the batch.
+            try:
+                await asyncio.wait_for(self._full.wait(), self.delay)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            self._full.clear()
+            await self._flush()
+            if self._stopping and not self._pending:
+                return
+
+    async def _flush(self) -> None:
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        try:
+            written = await self._commit({lead_id: pending.fields for lead_id, pending in batch.items()})
+        except Exception as e:
+            self.errors += 1
+            logger.exception("Lead write-behind flush failed")
+            for pending in batch.values():
+                for future in pending.waiters:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+        for lead_id, pending in batch.items():
+            for future in pending.waiters:
+                if not future.done():
+                    future.set_result(written.get(lead_id))
+
+    async def _commit(self, updates: Dict[str, dict]) -> Dict[str, Lead]:
+        start = time.perf_counter()
+        async with write_session_maker() as db:
+            result = await db.execute(select(Lead).where(Lead.id.in_(list(updates))))
+            leads = {lead.id: lead for lead in result.scalars()}
+            for lead_id, fields in updates.items():
+                lead = leads.get(lead_id)
+                if lead is None:
+                    continue
+                for field, value in fields.items():
+                    setattr(lead, field, value)
+            await db.commit()
+        self.flushes += 1
+        self.leads_written += len(leads)
+        self._flush_seconds += time.perf_counter() - start
+        return leads
+
+    async def stop(self) -> None:
+        """Flush what is pending and stop the flush task."""
+        if self._task is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        self._full.set()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    def stats(self) -> dict:
+        elapsed = time.monotonic() - self._started_at
+        return {
+            "enabled": settings.write_behind_enabled,
+            "pending": len(self._pending),
+            "updates": self.updates,
+            "coalesced": self.coalesced,
+            "commits": self.flushes,
+            "leads_written": self.leads_written,
+            "errors": self.errors,
+            "avg_batch": round(self.leads_written / self.flushes, 2) if self.flushes else 0.0,
+            "avg_commit_ms": round(self._flush_seconds / self.flushes * 1000, 2) if self.flushes else None,
+            "commits_per_second": round(self.flushes / elapsed, 2) if elapsed else 0.0,
+        }
+
+
+lead_writer = LeadWriter()
@@ -0,0 +1 @@
+"""Offline benchmarks that run the service against a fake LLM."""
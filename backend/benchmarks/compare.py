@@ -0,0 +1,53 @@
+"""Compare two benchmark result files.
+
+    python -m benchmarks.compare baseline.json candidate.json --threshold 0.2
+
+Prints p50/p95/p99 and throughput changes per benchmark and exits with
+status 1 when any p95 latency got worse by more than the threshold.
+"""
+
+import argparse
+import json
+import sys
+
+
+def _change(old: float, new: float) -> float:
+    return (new - old) / old if old else 0.0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed relative p95 regression")
+    args = parser.parse_args(argv)
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    print(f"baseline {baseline['meta']['commit']} -> candidate {candidate['meta']['commit']}")
+    header = f"{'benchmark':<16}{'p50':>10}{'p95':>10}{'p99':>10}{'rps':>10}"
+    print(header)
+    print("-" * len(header))
+
+    regressions = []
+    for name, new in candidate["results"].items():
+        old = baseline["results"].get(name)
+        if old is None:
+            print(f"{name:<16}{'(new)':>10}")
+            continue
+        changes = [_change(old[key], new[key]) for key in ("p50_ms", "p95_ms", "p99_ms", "throughput_rps")]
+        print(f"{name:<16}" + "".join(f"{change:>+10.1%}" for change in changes))
+        if changes[1] > args.threshold:
+            regressions.append(name)
+
+    if regressions:
+        print(f"\np95 regressions over {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+"""Deterministic fake chat model for benchmarks.
+
+Recognizes each agent prompt and answers with valid JSON for its schema
+after a simulated latency. Latency distributions are given as specs:
+
+    fixed:50             always 50 ms
+    uniform:20:80        uniform between 20 and 80 ms
+    normal:50:10         normal with mean 50 ms and stddev 10 ms (>= 0)
+    lognormal:50:0.5     lognormal with median 50 ms and sigma 0.5
+
+`failure_rate` makes that share of calls raise a simulated 503.
+"""
+
+import asyncio
+import json
+import random
+import re
+import time
+from typing import Any, Callable, List, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import PrivateAttr
+
+TIERS = ((70, "hot"), (40, "warm"), (0, "cold"))
+
+
+class FakeLLMError(Exception):
+    """Simulated transient provider error."""
+
+    status_code = 503
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """Turn a latency spec into a sampler returning seconds."""
+    kind, *params = spec.split(":")
+    values = [float(p) for p in params]
+    if kind == "fixed":
+        return lambda rng: values[0] / 1000
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1]) / 1000
+    if kind == "normal":
+        return lambda rng: max(0.0, rng.gauss(values[0], values[1])) / 1000
+    if kind == "lognormal":
+        import math
+        return lambda rng: rng.lognormvariate(math.log(values[0]), values[1]) / 1000
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+def _tier(score: float) -> str:
+    return next(tier for minimum, tier in TIERS if score >= minimum)
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model answering every agent prompt with schema-valid JSON."""
+
+    latency: str = "fixed:0"
+    failure_rate: float = 0.0
+    seed: int = 0
+
+    _rng: random.Random = PrivateAttr()
+    _sample: Callable[[random.Random], float] = PrivateAttr()
+    calls: int = 0
+    failures: int = 0
+
+    def model_post_init(self, __context: Any) -> None:
+        self._rng = random.Random(self.seed)
+        self._sample = parse_latency(self.latency)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-benchmark"
+
+    def _lead_score(self) -> dict:
+        subs = [round(self._rng.uniform(10, 95), 1) for _ in range(4)]
+        overall = round(subs[0] * 0.25 + subs[1] * 0.30 + subs[2] * 0.25 + subs[3] * 0.20, 1)
+        return {
+            "overall_score": overall,
+            "tier": _tier(overall),
+            "firmographic_score": subs[0],
+            "behavioral_score": subs[1],
+            "engagement_score": subs[2],
+            "fit_score": subs[3],
+            "reasoning": "Synthetic benchmark score.",
+            "recommendations": ["Follow up within a week"]
+        }
+
+    def _company(self) -> dict:
+        return {
+            "name": "Synthetic Co",
+            "industry": self._rng.choice(["software", "finance", "healthcare", "retail"]),
+            "employee_range": self._rng.choice(["1-10", "11-50", "51-200", "201-500", "1000+"]),
+            "location": "Remote",
+            "technologies": ["python", "postgres"]
+        }
+
+    def _contact(self) -> dict:
+        return {
+            "seniority": self._rng.choice(["entry", "mid", "senior", "executive", "c-level"]),
+            "department": self._rng.choice(["sales", "marketing", "engineering", "product"])
+        }
+
+    def _intent(self) -> dict:
+        score = round(self._rng.random(), 2)
+        return {
+            "signals": [{
+                "signal_type": "website",
+                "description": "Visited the pricing page",
+                "strength": score,
+                "buying_stage": "consideration"
+            }],
+            "overall_intent_score": score,
+            "buying_stage": "consideration",
+            "recommended_action": "Send a case study",
+            "urgency": "medium"
+        }
+
+    def respond(self, text: str) -> dict:
+        """Build the JSON answer for a rendered prompt."""
+        if "Score these leads" in text:
+            lead_ids = re.findall(r"### lead_id: (\S+)", text)
+            return {"scores": [{"lead_id": lead_id, **self._lead_score()} for lead_id in lead_ids]}
+        if "Score this lead" in text:
+            return self._lead_score()
+        if "Enrich this company" in text:
+            return self._company()
+        if "Enrich this contact" in text:
+            return self._contact()
+        if "Enrich this lead" in text:
+            return {"company": self._company(), "contact": self._contact()}
+        if "Analyze intent" in text:
+            return self._intent()
+        return {}
+
+    def _call(self, messages: List[BaseMessage]) -> ChatResult:
+        self.calls += 1
+        if self._rng.random() < self.failure_rate:
+            self.failures += 1
+            raise FakeLLMError("Simulated provider failure")
+        text = "\n".join(str(message.content) for message in messages)
+        message = AIMessage(content=json.dumps(self.respond(text)))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        time.sleep(self._sample(self._rng))
+        return self._call(messages)
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        await asyncio.sleep(self._sample(self._rng))
+        return self._call(messages)
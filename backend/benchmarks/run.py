@@ -0,0 +1,312 @@
+"""Run the offline benchmark suite.
+
+Seeds a throwaway SQLite database with synthetic leads, replaces the LLM
+with benchmarks.fake_llm.FakeChatModel and measures the agents and the main
+API endpoints in-process. Results are printed and written as JSON:
+
+    python -m benchmarks.run --leads 5000 --latency lognormal:200:0.4 \\
+        --failure-rate 0.02 --output bench.json
+    python -m benchmarks.compare before.json bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, List
+
+FIRST_NAMES = ["Ava", "Ben", "Chloe", "Dev", "Elena", "Farid", "Grace", "Hiro", "Ines", "Jonas"]
+LAST_NAMES = ["Adams", "Brown", "Chen", "Diaz", "Evans", "Fischer", "Garcia", "Haddad", "Ito", "Jones"]
+TITLES = ["CEO", "VP Sales", "Head of Marketing", "Engineering Manager", "Analyst", "Director of Ops", None]
+INDUSTRIES = ["software", "finance", "healthcare", "retail", "manufacturing"]
+SIZES = ["1-10", "11-50", "51-200", "201-500", "501-1000", "1000+"]
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--leads", type=int, default=2000, help="synthetic leads to seed")
+    parser.add_argument("--requests", type=int, default=200, help="requests per single-lead benchmark")
+    parser.add_argument("--batch-requests", type=int, default=20, help="requests per batch benchmark")
+    parser.add_argument("--batch-size", type=int, default=20, help="leads per batch request")
+    parser.add_argument("--agent-calls", type=int, default=100, help="calls per agent benchmark")
+    parser.add_argument("--concurrency", type=int, default=8, help="requests in flight")
+    parser.add_argument("--latency", default="lognormal:50:0.5", help="fake LLM latency distribution")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="share of fake LLM calls that fail")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--cache", action="store_true", help="keep the LLM response cache enabled")
+    parser.add_argument("--only", default="", help="comma-separated benchmark names to run")
+    parser.add_argument("--output", default="benchmark-results.json")
+    return parser.parse_args(argv)
+
+
+def configure_environment(workdir: str, args: argparse.Namespace) -> None:
+    """Point all storage at the scratch directory before the app is imported."""
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{workdir}/bench.db"
+    os.environ["LLM_CACHE_ENABLED"] = "true" if args.cache else "false"
+    os.environ["LLM_CACHE_PATH"] = f"{workdir}/llm_cache.db"
+    os.environ["CHROMA_PERSIST_DIR"] = f"{workdir}/chroma"
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    if not values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(values) + 0.5)))
+    return values[min(rank, len(values)) - 1]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float, items_per_call: int = 1) -> dict:
+    latencies = sorted(latencies)
+    ms = [value * 1000 for value in latencies]
+    calls = len(latencies) + errors
+    return {
+        "calls": calls,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 4),
+        "throughput_rps": round(calls / elapsed, 2) if elapsed else 0.0,
+        "items_per_s": round(calls * items_per_call / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(ms) / len(ms), 3) if ms else 0.0,
+        "p50_ms": round(percentile(ms, 50), 3),
+        "p95_ms": round(percentile(ms, 95), 3),
+        "p99_ms": round(percentile(ms, 99), 3),
+        "max_ms": round(ms[-1], 3) if ms else 0.0,
+    }
+
+
+async def measure(
+    func: Callable[[int], Awaitable],
+    count: int,
+    concurrency: int,
+    items_per_call: int = 1
+) -> dict:
+    """Call func(0..count-1) with bounded concurrency and summarize latencies."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def one(index: int) -> None:
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await func(index)
+            except Exception:
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(count)))
+    return summarize(latencies, errors, time.perf_counter() - start, items_per_call)
+
+
+def synthetic_lead(index: int, rng: random.Random) -> dict:
+    from app.models.lead import LeadSource, LeadStatus
+
+    first = rng.choice(FIRST_NAMES)
+    last = rng.choice(LAST_NAMES)
+    company_id = index // 5
+    row = {
+        "id": f"bench-{index:08d}",
+        "email": f"{first.lower()}.{last.lower()}.{index}@company{company_id}.example",
+        "first_name": first,
+        "last_name": f"{last}{index}",
+        "company": f"Company {company_id}",
+        "job_title": rng.choice(TITLES),
+        "website": f"https://company{company_id}.example",
+        "source": rng.choice(list(LeadSource)),
+        "status": rng.choice(list(LeadStatus)),
+        "score": 0.0,
+        "tags": [],
+    }
+    if rng.random() < 0.4:
+        row["enrichment_data"] = {
+            "company": {"industry": rng.choice(INDUSTRIES), "employee_range": rng.choice(SIZES)},
+            "contact": {"seniority": rng.choice(["entry", "mid", "senior", "executive"])},
+        }
+    if rng.random() < 0.5:
+        score = round(rng.uniform(0, 100), 1)
+        row["score"] = score
+        row["score_tier"] = "hot" if score >= 70 else "warm" if score >= 40 else "cold"
+    return row
+
+
+async def seed_database(count: int, rng: random.Random) -> List[str]:
+    from sqlalchemy import insert
+
+    from app.core.database import async_session_maker, init_db
+    from app.models.lead import Lead
+    from app.services.stats import rebuild_stats
+
+    await init_db()
+    rows = [synthetic_lead(index, rng) for index in range(count)]
+    async with async_session_maker() as db:
+        for start in range(0, len(rows), 1000):
+            await db.execute(insert(Lead), rows[start:start + 1000])
+        await rebuild_stats(db)
+        await db.commit()
+    return [row["id"] for row in rows]
+
+
+def install_fake_llm(fake):
+    """Route every get_llm() caller to the fake behind the real gateway."""
+    from app.core import llm as llm_module
+    from app.core.config import settings
+    from app.core.llm_gateway import LLMGateway, LLMRoute
+
+    gateway = LLMGateway(
+        routes=[LLMRoute(
+            "fake",
+            fake,
+            max_in_flight=settings.llm_max_in_flight,
+            timeout=settings.llm_timeout,
+            max_retries=settings.llm_max_retries,
+            backoff=settings.llm_retry_backoff,
+        )],
+        cache=llm_module.get_llm_cache()
+    )
+    original = llm_module.get_llm
+    for name, module in list(sys.modules.items()):
+        if name.startswith("app") and getattr(module, "get_llm", None) is original:
+            module.get_llm = lambda: gateway
+    return gateway
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+async def run(args: argparse.Namespace) -> dict:
+    import httpx
+
+    import app.main
+    from app.agents.registry import agent_registry
+    from app.core.database import async_session_maker
+    from app.services.enrichment import enrichment_inputs
+    from app.services.intent import intent_lead_info
+    from app.services.loading import load_leads
+    from app.services.scoring import score_inputs
+    from benchmarks.fake_llm import FakeChatModel
+
+    rng = random.Random(args.seed)
+    fake = FakeChatModel(latency=args.latency, failure_rate=args.failure_rate, seed=args.seed)
+    install_fake_llm(fake)
+
+    lead_ids = await seed_database(args.leads, rng)
+    only = {name.strip() for name in args.only.split(",") if name.strip()}
+    results = {}
+
+    def wanted(name: str) -> bool:
+        return not only or name in only
+
+    def pick(index: int) -> str:
+        return lead_ids[(index * 7919) % len(lead_ids)]
+
+    def batch(index: int) -> List[str]:
+        start = (index * args.batch_size * 13) % len(lead_ids)
+        return [lead_ids[(start + offset) % len(lead_ids)] for offset in range(args.batch_size)]
+
+    async with app.main.lifespan(app.main.app):
+        async with async_session_maker() as db:
+            sample, _ = await load_leads(db, [pick(index) for index in range(args.agent_calls)])
+
+        if wanted("agent_scorer"):
+            results["agent_scorer"] = await measure(
+                lambda i: agent_registry.scorer.score(**score_inputs(sample[i % len(sample)])),
+                args.agent_calls, args.concurrency
+            )
+        if wanted("agent_enricher"):
+            results["agent_enricher"] = await measure(
+                lambda i: agent_registry.enricher.enrich(**enrichment_inputs(sample[i % len(sample)])),
+                args.agent_calls, args.concurrency
+            )
+        if wanted("agent_intent"):
+            results["agent_intent"] = await measure(
+                lambda i: agent_registry.intent_analyzer.analyze(intent_lead_info(sample[i % len(sample)])),
+                args.agent_calls, args.concurrency
+            )
+
+        transport = httpx.ASGITransport(app=app.main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+
+            async def request(method: str, url: str, **kwargs) -> None:
+                response = await client.request(method, url, **kwargs)
+                response.raise_for_status()
+
+            endpoints = {
+                "create": (lambda i: request("POST", "/api/leads", json={
+                    "email": f"new{i}@newco{i}.example",
+                    "first_name": f"Newfirst{i}",
+                    "last_name": f"Newlast{i}",
+                    "company": f"Newco {i}",
+                }), args.requests, 1),
+                "list": (lambda i: request("GET", "/api/leads", params={"limit": 50}), args.requests, 1),
+                "list_fields": (lambda i: request("GET", "/api/leads", params={
+                    "limit": 50, "fields": "email,first_name,last_name,company,status,score,score_tier,created_at"
+                }), args.requests, 1),
+                "score": (lambda i: request("POST", f"/api/leads/{pick(i)}/score"), args.requests, 1),
+                "batch_score": (lambda i: request(
+                    "POST", "/api/scoring/batch", json={"lead_ids": batch(i)}
+                ), args.batch_requests, args.batch_size),
+                "batch_enrich": (lambda i: request(
+                    "POST", "/api/enrichment/batch", json={"lead_ids": batch(i)}
+                ), args.batch_requests, args.batch_size),
+                "stats": (lambda i: request("GET", "/api/analytics/stats"), args.requests, 1),
+                "analytics": (lambda i: request("GET", "/api/analytics"), args.requests, 1),
+            }
+            for name, (func, count, items) in endpoints.items():
+                if wanted(name):
+                    results[name] = await measure(func, count, args.concurrency, items)
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": vars(args),
+        },
+        "llm": {"calls": fake.calls, "failures": fake.failures},
+        "results": results,
+    }
+
+
+def print_report(report: dict) -> None:
+    header = f"{'benchmark':<16}{'calls':>7}{'errors':>8}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    print(header)
+    print("-" * len(header))
+    for name, result in report["results"].items():
+        print(
+            f"{name:<16}{result['calls']:>7}{result['errors']:>8}{result['throughput_rps']:>10}"
+            f"{result['p50_ms']:>10}{result['p95_ms']:>10}{result['p99_ms']:>10}"
+        )
+    print(f"\nfake LLM calls: {report['llm']['calls']} (failed {report['llm']['failures']})")
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    output = os.path.abspath(args.output)
+    with tempfile.TemporaryDirectory(prefix="lead-bench-") as workdir:
+        configure_environment(workdir, args)
+        report = asyncio.run(run(args))
+
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print_report(report)
+    print(f"results written to {output}")
+
+
+if __name__ == "__main__":
+    main()